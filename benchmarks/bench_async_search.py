@@ -0,0 +1,67 @@
+"""Benchmark: threaded `YouTubeManager` vs. `AsyncVideoSearcher` searches.
+
+Runs `--queries` single-result searches against `benchmarks/fake_youtube.py`
+with `--latency` seconds per round trip. The threaded manager runs them on
+`--workers` threads (one `httplib2` transport each). The async searcher
+runs them on one event loop with `--concurrency` requests in flight over a
+pooled `httpx` client.
+
+    python -m benchmarks.bench_async_search --queries 1000 --latency 0.05
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from google.oauth2.credentials import Credentials
+
+from benchmarks.fake_youtube import FakeYouTube
+from src.youtube.async_searcher import AsyncVideoSearcher
+from src.youtube.youtube_manager import YouTubeManager
+
+
+def _time(search: Callable[[List[str]], List[Any]], queries: List[str],
+          fake: FakeYouTube) -> Dict[str, Any]:
+    before = fake.stats()["http_requests"]
+    start = time.perf_counter()
+    results = search(queries)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "searches_per_second": round(len(queries) / seconds, 1),
+        "found": sum(1 for r in results if r),
+        "http_requests": fake.stats()["http_requests"] - before,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per round trip")
+    parser.add_argument("--workers", type=int, default=8, help="threads for YouTubeManager")
+    parser.add_argument("--concurrency", type=int, default=32, help="requests in flight (async)")
+    args = parser.parse_args()
+
+    queries = [f"song {i} artist {i % 97}" for i in range(args.queries)]
+    creds = Credentials(token="benchmark")
+    rows = {}
+    with FakeYouTube(latency=args.latency) as fake:
+        manager = YouTubeManager(credentials=creds, api_endpoint=fake.url)
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            rows[f"threaded ({args.workers} workers)"] = _time(
+                lambda qs: list(pool.map(manager.search_video, qs)), queries, fake)
+
+        searcher = AsyncVideoSearcher(credentials=creds, api_endpoint=fake.url,
+                                      concurrency=args.concurrency, token_file=None)
+        rows[f"async ({args.concurrency} in flight)"] = _time(searcher.search_many, queries, fake)
+        searcher.close()
+
+    print(f"{'client':<28}{'seconds':>10}{'searches/s':>12}{'found':>8}{'http':>8}")
+    for name, row in rows.items():
+        print(f"{name:<28}{row['seconds']:>10.2f}{row['searches_per_second']:>12.1f}"
+              f"{row['found']:>8}{row['http_requests']:>8}")
+
+
+if __name__ == "__main__":
+    main()
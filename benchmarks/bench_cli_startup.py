@@ -0,0 +1,67 @@
+"""Benchmark: start-up latency of `sync_cli.py` commands.
+
+Runs each command `--runs` times in a fresh interpreter and prints the
+median and best wall time next to a bare `python -c pass` baseline, plus the
+modules each command ends up importing. `clean` talks to FalkorDB, so its
+time includes the FalkorDB/redis client import and one round-trip (or a
+refused connection when no server is running).
+
+    python -m benchmarks.bench_cli_startup --runs 10
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+CLI = str(ROOT / "sync_cli.py")
+
+COMMANDS = {
+    "python -c pass": [sys.executable, "-c", "pass"],
+    "--help": [sys.executable, CLI, "--help"],
+    "clean --help": [sys.executable, CLI, "clean", "--help"],
+    "--json clean --yes": [sys.executable, CLI, "--json", "clean", "--yes"],
+}
+
+# Modules whose presence shows a command paid for a heavy import.
+HEAVY = ("falkordb", "googleapiclient", "scrapy", "playwright")
+
+
+def _time(command: Sequence[str], runs: int) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, capture_output=True, check=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _heavy_imports(command: Sequence[str]) -> List[str]:
+    if "-c" in command:
+        return []
+    completed = subprocess.run([sys.executable, "-X", "importtime", *command[1:]],
+                               cwd=ROOT, capture_output=True, text=True, check=False)
+    imported = {line.rsplit("|", 1)[-1].strip() for line in completed.stderr.splitlines()}
+    return [name for name in HEAVY if name in imported]
+
+
+def main() -> None:
+    """Times every command and prints a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'command':<22} {'median ms':>10} {'best ms':>8}  heavy imports")
+    for label, command in COMMANDS.items():
+        samples = _time(command, args.runs)
+        heavy = ", ".join(_heavy_imports(command)) or "-"
+        print(f"{label:<22} {statistics.median(samples):>10.0f} {min(samples):>8.0f}  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark: memory footprint of track records per 100k tracks.
+
+Measures with `tracemalloc` how much the per-track containers cost, before
+and after the switch to compact records. Title and artist strings are
+created up front and shared, so only the record overhead is counted:
+
+- spider DOM rows: JS objects (dicts) vs. `[title, artist, index]` arrays
+- network rows: dicts vs. `TrackRow` tuples
+- scraped songs: `SongInfo` with vs. without `__slots__`
+- pending tracks read from the graph: dicts vs. `PendingSong` tuples
+
+    python -m benchmarks.bench_memory --tracks 100000
+"""
+
+import argparse
+import tracemalloc
+from dataclasses import make_dataclass
+from typing import Any, Callable, List, Tuple
+
+from src.models.data_classes import PendingSong, SongInfo
+from src.scraper.spotify_api import TrackRow
+
+# SongInfo as it was: a frozen dataclass with a per-instance __dict__
+DictSongInfo = make_dataclass(
+    "DictSongInfo",
+    [("title", str), ("artist", str), ("album", str), ("index", int, 0), ("source", str, ""),
+     ("duration_ms", int, 0), ("isrc", str, "")],
+    frozen=True,
+)
+
+Strings = List[Tuple[str, str]]
+
+
+def _measure(build: Callable[[Strings], List[Any]], strings: Strings) -> int:
+    """Bytes allocated (and kept) by `build`."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = build(strings)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return after - before
+
+
+CASES: List[Tuple[str, str, Callable[[Strings], List[Any]]]] = [
+    ("DOM row", "dict", lambda s: [{"title": t, "artist": a, "row_index": i}
+                                    for i, (t, a) in enumerate(s)]),
+    ("DOM row", "list", lambda s: [[t, a, i] for i, (t, a) in enumerate(s)]),
+    ("network row", "dict", lambda s: [{"title": t, "artist": a, "album": "", "duration_ms": 0,
+                                        "isrc": "", "index": i} for i, (t, a) in enumerate(s)]),
+    ("network row", "TrackRow", lambda s: [TrackRow(t, a, "", 0, "", i)
+                                           for i, (t, a) in enumerate(s)]),
+    ("SongInfo", "__dict__", lambda s: [DictSongInfo(t, a, "", i) for i, (t, a) in enumerate(s)]),
+    ("SongInfo", "__slots__", lambda s: [SongInfo(t, a, "", i) for i, (t, a) in enumerate(s)]),
+    ("pending track", "dict", lambda s: [{"title": t, "artist": a, "track_id": i,
+                                          "duration_ms": 0} for i, (t, a) in enumerate(s)]),
+    ("pending track", "PendingSong", lambda s: [PendingSong(t, a, i, 0)
+                                                for i, (t, a) in enumerate(s)]),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    strings = [(f"Track {i}", f"Artist {i % 997}") for i in range(args.tracks)]
+    scale = 100_000 / args.tracks
+    print(f"{'record':<16}{'layout':<14}{'bytes/track':>12}{'MB per 100k':>13}")
+    for record, layout, build in CASES:
+        size = _measure(build, strings)
+        print(f"{record:<16}{layout:<14}{size / args.tracks:>12.0f}"
+              f"{size * scale / 1e6:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark: song MERGE and pending-lookup latency vs. graph size, with and without schema.
+
+Requires a running FalkorDB (`FALKORDB_HOST`/`FALKORDB_PORT`). Uses scratch
+graphs that are deleted afterwards.
+
+    python -m benchmarks.bench_merge_scaling --sizes 1000 10000 100000
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+from falkordb import FalkorDB
+
+from src.db.falkordb_manager import song_rows
+from src.db.queries import FIND_PENDING_TRACKS, SAVE_SONGS
+from src.db.schema import ensure_schema
+
+load_dotenv()
+
+LOAD_BATCH = 5000
+SOURCE = "playlist:bench"
+
+
+def _row(i: int) -> Dict[str, Any]:
+    return {"title": f"Song {i}", "artist": f"Artist {i % 1000}", "index": i,
+            "source": SOURCE, "album": f"Album {i % 100}", "duration_ms": 180_000 + i % 60_000, "isrc": ""}
+
+
+def _populate(graph, size: int) -> None:
+    for start in range(0, size, LOAD_BATCH):
+        rows = song_rows([_row(i) for i in range(start, min(start + LOAD_BATCH, size))])
+        graph.query(SAVE_SONGS, {"rows": rows})
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)] * 1000
+
+
+def _measure(graph, size: int, samples: int) -> List[float]:
+    latencies = []
+    for i in range(samples):
+        # Half existing songs (ON MATCH path), half new ones (ON CREATE path).
+        n = (i * 7919) % size if i % 2 == 0 else size + i
+        rows = song_rows([_row(n)])
+        start = time.perf_counter()
+        graph.query(SAVE_SONGS, {"rows": rows})
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    """Populates graphs of increasing size and reports MERGE latency."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    db = FalkorDB(
+        host=os.getenv("FALKORDB_HOST", "localhost"),
+        port=int(os.getenv("FALKORDB_PORT", "6379")),
+    )
+
+    print(f"{'songs':>8} {'schema':>7} {'merge p50 ms':>13} {'merge p95 ms':>13} "
+          f"{'pending ms':>11}")
+    for size in args.sizes:
+        for indexed in (False, True):
+            graph = db.select_graph(f"bench_merge_{size}_{int(indexed)}")
+            try:
+                if indexed:
+                    ensure_schema(graph)
+                _populate(graph, size)
+                latencies = _measure(graph, size, args.samples)
+                start = time.perf_counter()
+                graph.query(FIND_PENDING_TRACKS,
+                            {"status": "PENDING", "after_id": -1, "limit": size})
+                pending_ms = (time.perf_counter() - start) * 1000
+                print(f"{size:>8} {'yes' if indexed else 'no':>7} "
+                      f"{_percentile(latencies, 0.5):>13.3f} "
+                      f"{_percentile(latencies, 0.95):>13.3f} {pending_ms:>11.1f}")
+            finally:
+                graph.delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Benchmark: end-to-end scrape → store → match → create throughput.
+
+Runs the real pipeline components (`FalkordbPipeline`, `MatchEngine`,
+`MatchWriter`, `PlaylistWriter`, `YouTubeManager`) against the local
+`FakeYouTube` server and either an in-memory graph (`--backend fake`) or a
+scratch FalkorDB graph (`--backend falkordb`, needs `FALKORDB_HOST`/`PORT`).
+The scrape stage feeds synthetic items through the pipeline instead of
+driving a browser (`--scrape-delay` simulates scrolling time per song). With
+`--stream` matching overlaps the scrape through `MatchQueuePipeline`, and the
+match stage only waits for its queue to drain.
+
+    python -m benchmarks.bench_pipeline --sizes 100 1000 10000 --latency 0.02
+    python -m benchmarks.bench_pipeline --backend falkordb --json results.json
+    python -m benchmarks.bench_pipeline --sizes 1000 --scrape-delay 0.002 --latency 0.02 --stream
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, cast
+
+from dotenv import load_dotenv
+from google.oauth2.credentials import Credentials
+
+from benchmarks.fake_graph import InMemoryGraphManager
+from benchmarks.fake_youtube import FakeYouTube
+from src.db.falkordb_manager import FalkordbManager
+from src.db.match_writer import MatchWriter
+from src.models.data_classes import PlaylistSource, SongInfo
+from src.models.normalize import track_key
+from src.scraper.pipelines import FalkordbPipeline, MatchQueuePipeline
+from src.youtube.match_engine import MatchEngine
+from src.youtube.playlist_writer import PlaylistWriter
+from src.youtube.rate_limiter import TokenBucket
+from src.youtube.stream_matcher import StreamingMatcher
+from src.youtube.youtube_manager import YouTubeManager
+
+load_dotenv()
+
+
+def _items(size: int, playlist_size: int, unique_ratio: float, seed: int) -> List[Any]:
+    """Synthetic scrape output: `size` playlist entries over a shared catalog."""
+    rng = random.Random(seed)
+    catalog = max(1, int(size * unique_ratio))
+    items: List[Any] = []
+    for start in range(0, size, playlist_size):
+        source = f"playlist:bench{start // playlist_size}"
+        items.append(PlaylistSource(name=f"Bench {start // playlist_size}", source=source))
+        picks = rng.sample(range(catalog), min(playlist_size, size - start, catalog))
+        for index, n in enumerate(picks, start=1):
+            items.append(SongInfo(title=f"Track {n}", artist=f"Artist {n % 997}", album="",
+                                  index=index, source=source,
+                                  duration_ms=120_000 + n % 240 * 1000))
+    return items
+
+
+def _falkordb_manager(size: int) -> FalkordbManager:
+    # A scratch graph behind the manager's own pool, so pool metrics are real
+    FalkordbManager.close()
+    FalkordbManager._graph_name = f"bench_pipeline_{size}"  # pylint: disable=protected-access
+    manager = FalkordbManager()
+    if manager.graph is None:
+        raise SystemExit("FalkorDB is not reachable (FALKORDB_HOST/FALKORDB_PORT).")
+    return manager
+
+
+def run(size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Runs the pipeline once for `size` playlist entries and returns its metrics."""
+    # The in-memory graph implements the manager's API
+    manager = (_falkordb_manager(size) if args.backend == "falkordb"
+               else cast(FalkordbManager, InMemoryGraphManager()))
+    items = _items(size, args.playlist_size, args.unique_ratio, args.seed)
+    timings: Dict[str, float] = {}
+
+    with FakeYouTube(latency=args.latency, error_rate=args.error_rate, quota=args.quota,
+                     rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after) as fake:
+        youtube = YouTubeManager(credentials=Credentials(token="benchmark"), api_endpoint=fake.url)
+        started = time.perf_counter()
+        try:
+            stage = time.perf_counter()
+            limiter = TokenBucket(rate=1e9, capacity=1e9, daily_quota=None)
+            engine = MatchEngine(youtube, limiter=limiter, workers=args.workers,
+                                 candidates=args.candidates)
+            pipeline = FalkordbPipeline(batch_size=500, flush_interval=3600, manager=manager)
+            stages: List[Any] = [pipeline]
+            if args.stream:
+                streaming = StreamingMatcher(engine, manager)
+                stages.append(MatchQueuePipeline(streaming))
+                streaming.start()
+            for item in items:
+                if args.scrape_delay and isinstance(item, SongInfo):
+                    time.sleep(args.scrape_delay)  # stands in for page scrolling
+                for step in stages:
+                    step.process_item(item, None)
+            pipeline.close_spider(None)
+            timings["scrape_store"] = time.perf_counter() - stage
+
+            # With --stream this only waits for the queue to drain
+            stage = time.perf_counter()
+            matched = streaming.close()["matched"] if args.stream else 0
+            with MatchWriter(manager) as match_writer:
+                for result in engine.run(manager.iter_pending_tracks()):
+                    # Tracks read from the graph always carry their ID
+                    if result.match and result.song.track_id is not None:
+                        match_writer.submit(result.song.track_id, result.match["video_id"],
+                                            result.query, result.score)
+                        matched += 1
+            timings["match"] = time.perf_counter() - stage
+
+            stage = time.perf_counter()
+            inserted = failed = 0
+            playlist_writer = PlaylistWriter(youtube, manager, batch_size=args.batch_size)
+            for source, name in manager.get_playlists():
+                report = playlist_writer.sync(source, name)
+                inserted += report.inserted
+                failed += report.failed
+            timings["create"] = time.perf_counter() - stage
+        finally:
+            graph = manager.graph if args.backend == "falkordb" else None
+            if graph is not None:
+                graph.delete()
+
+        stats = fake.stats()
+    wall = time.perf_counter() - started
+    return {
+        "entries": size,
+        "unique_tracks": len({track_key(i.title, i.artist) for i in items if isinstance(i, SongInfo)}),
+        "matched": matched,
+        "inserted": inserted,
+        "failed": failed,
+        "wall_seconds": round(wall, 3),
+        "stage_seconds": {k: round(v, 3) for k, v in timings.items()},
+        "entries_per_second": round(size / wall, 1) if wall else 0.0,
+        **stats,
+        "retries": youtube.retry.stats(),
+        "db_pool": manager.pool_stats() if args.backend == "falkordb" else {},
+    }
+
+
+def main() -> None:
+    """Runs the pipeline at each size and prints (and optionally saves) the metrics."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--backend", choices=("fake", "falkordb"), default="fake")
+    parser.add_argument("--playlist-size", type=int, default=100)
+    parser.add_argument("--unique-ratio", type=float, default=0.8,
+                        help="unique tracks per playlist entry (cross-playlist overlap)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per API round trip")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="share of calls failing with 403 rateLimitExceeded")
+    parser.add_argument("--retry-after", type=float, default=None,
+                        help="Retry-After seconds sent with injected errors")
+    parser.add_argument("--quota", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--scrape-delay", type=float, default=0.0,
+                        help="seconds per scraped song (simulated page scrolling)")
+    parser.add_argument("--stream", action="store_true",
+                        help="match while scraping (MatchQueuePipeline) instead of afterwards")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", metavar="FILE", help="write all results as JSON")
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'tracks':>7} {'store s':>8} {'match s':>8} {'create s':>9} "
+          f"{'wall s':>7} {'entries/s':>10} {'calls':>7} {'http':>6} {'quota':>9}")
+    results = []
+    for size in args.sizes:
+        result = run(size, args)
+        results.append(result)
+        stages = result["stage_seconds"]
+        print(f"{size:>8} {result['unique_tracks']:>7} {stages['scrape_store']:>8.2f} "
+              f"{stages['match']:>8.2f} {stages['create']:>9.2f} {result['wall_seconds']:>7.2f} "
+              f"{result['entries_per_second']:>10.1f} {result['total_calls']:>7} "
+              f"{result['http_requests']:>6} {result['quota_spent']:>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark: offline scrape of replayed playlist pages.
+
+Generates a synthetic virtualized playlist page per `--sizes` entry with
+`src.scraper.replay`. Each page is served to headless Chromium through route
+interception, so no network is used. The spider's `_stream_songs` then scrolls
+and extracts it (the same `_scroll_page`/`_extract_songs_js` calls `parse`
+makes). For every size it reports time to the first song, total extraction
+time, scroll steps and recall (songs found vs. expected).
+
+    python -m benchmarks.bench_replay --sizes 50 500 5000 --scroll-delay-ms 50
+
+`--snapshot DIR` replays a recorded snapshot (manifest and/or HAR files)
+instead; recall then needs the manifest's expected tracks. Requires the
+Chromium build of Playwright (`python -m playwright install chromium`).
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from playwright.async_api import async_playwright
+
+from src.scraper.replay import SnapshotStore, recall, synthetic_tracks, write_synthetic_snapshot
+from src.scraper.spotify_spider import SpotifyPlaylistSpider, playlist_source_id
+
+BASE_URL = "https://open.spotify.com/playlist/replay{size}"
+
+
+class _CountingSpider(SpotifyPlaylistSpider):
+    """Spider that counts its scroll steps."""
+
+    scroll_steps = 0
+
+    async def _scroll_page(self, page):
+        self.scroll_steps += 1
+        await super()._scroll_page(page)
+
+
+async def _scrape(browser, store: SnapshotStore, url: str, scroll_delay_ms: int) -> Dict[str, Any]:
+    spider = _CountingSpider(playlist_urls=[url])
+    spider.scroll_delay_ms = scroll_delay_ms
+    context = await browser.new_context(viewport={"width": 1280, "height": 800})
+    page = await context.new_page()
+    await store.install(page)
+
+    start = time.perf_counter()
+    first_song = None
+    found: List[tuple] = []
+    await page.goto(url, wait_until="domcontentloaded")
+    _, default_artist = await spider._extract_playlist_info(page)  # pylint: disable=protected-access
+    async for song in spider._stream_songs(  # pylint: disable=protected-access
+            page, default_artist, "/album/" in url, playlist_source_id(url)):
+        if first_song is None:
+            first_song = time.perf_counter() - start
+        found.append((song.title, song.artist))
+    seconds = time.perf_counter() - start
+    await context.close()
+
+    expected = store.expected_tracks(url)
+    return {
+        "url": url,
+        "expected": len(expected),
+        "found": len(found),
+        "first_song_s": round(first_song or 0.0, 3),
+        "total_s": round(seconds, 3),
+        "scroll_steps": spider.scroll_steps,
+        "recall": round(recall(found, expected), 4) if expected else None,
+    }
+
+
+async def _run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.snapshot:
+            store = SnapshotStore(args.snapshot)
+            urls = args.url or store.urls()
+        else:
+            urls = [BASE_URL.format(size=size) for size in args.sizes]
+            for size, url in zip(args.sizes, urls):
+                store = write_synthetic_snapshot(scratch, url, synthetic_tracks(size),
+                                                 window=args.window,
+                                                 render_delay_ms=args.render_delay_ms)
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=True)
+            try:
+                return [await _scrape(browser, store, url, args.scroll_delay_ms) for url in urls]
+            finally:
+                await browser.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--scroll-delay-ms", type=int,
+                        default=SpotifyPlaylistSpider.scroll_delay_ms)
+    parser.add_argument("--window", type=int, default=30, help="rows rendered at once")
+    parser.add_argument("--render-delay-ms", type=int, default=0,
+                        help="delay between a scroll and the re-render")
+    parser.add_argument("--snapshot", help="replay this snapshot directory instead")
+    parser.add_argument("--url", nargs="*", help="playlist URLs of --snapshot (default: all)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    rows = asyncio.run(_run(args))
+    print(f"{'playlist':<48}{'expected':>9}{'found':>7}{'first s':>9}{'total s':>9}"
+          f"{'steps':>7}{'recall':>8}")
+    for row in rows:
+        recall_text = "-" if row["recall"] is None else f"{row['recall']:.3f}"
+        print(f"{row['url']:<48}{row['expected']:>9}{row['found']:>7}{row['first_song_s']:>9.2f}"
+              f"{row['total_s']:>9.2f}{row['scroll_steps']:>7}{recall_text:>8}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(rows, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
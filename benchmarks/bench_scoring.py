@@ -0,0 +1,89 @@
+"""Benchmark: local candidate scoring throughput on synthetic search results.
+
+Scores `--candidates` synthetic videos (grouped `--per-song` per song) with
+`score_candidates` and, for comparison, with a per-pair `difflib` ratio. No
+API or database access is needed.
+
+    python -m benchmarks.bench_scoring --candidates 10000 --per-song 5
+"""
+
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Tuple
+
+from src.models.data_classes import PendingSong
+from src.youtube.scoring import best_candidate, score_candidates
+
+_WORDS = (
+    "love night heart fire dream light rain city gold river summer blue wild "
+    "home road stars dance ghost echo shadow"
+).split()
+_SUFFIXES = ("", " (Official Video)", " (Lyrics)", " (Live)", " [Official Audio]", " (Cover)")
+
+def _synthetic(total: int, per_song: int, seed: int) -> List[Tuple[PendingSong, List[Dict[str, Any]]]]:
+    rng = random.Random(seed)
+    batches = []
+    for i in range(max(1, total // per_song)):
+        title = " ".join(rng.sample(_WORDS, rng.randint(1, 4))).title()
+        artist = f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()}"
+        duration = rng.randint(120_000, 360_000)
+        song = PendingSong(title, artist, track_id=i, duration_ms=duration)
+        candidates = []
+        for _ in range(per_song):
+            other = title if rng.random() < 0.6 else " ".join(rng.sample(_WORDS, 2)).title()
+            candidates.append({
+                "video_id": f"v{rng.getrandbits(40):x}",
+                "title": f"{artist} - {other}{rng.choice(_SUFFIXES)}",
+                "channel": rng.choice((f"{artist}VEVO", f"{artist} - Topic", "Various Uploads")),
+                "duration_ms": duration + rng.randint(-60_000, 60_000),
+            })
+        batches.append((song, candidates))
+    return batches
+
+
+def _difflib_best(song: PendingSong, candidates: List[Dict[str, Any]]) -> int:
+    target = f"{song.title} {song.artist}".lower()
+    ratios = [
+        SequenceMatcher(None, target, f"{c['title']} {c['channel']}".lower()).ratio()
+        for c in candidates
+    ]
+    return max(range(len(ratios)), key=ratios.__getitem__)
+
+
+def _time(func, batches, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for song, candidates in batches:
+            func(song, candidates)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Times candidate scoring and prints candidates per second."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=10_000)
+    parser.add_argument("--per-song", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    batches = _synthetic(args.candidates, args.per_song, args.seed)
+    total = sum(len(candidates) for _, candidates in batches)
+
+    print(f"{'scorer':>16} {'candidates':>11} {'total ms':>9} {'us/cand':>8} {'cand/s':>10}")
+    for name, func in (
+        ("score_candidates", score_candidates),
+        ("best_candidate", best_candidate),
+        ("difflib ratio", _difflib_best),
+    ):
+        seconds = _time(func, batches, args.repeat)
+        print(f"{name:>16} {total:>11} {seconds * 1000:>9.1f} "
+              f"{seconds / total * 1e6:>8.2f} {total / seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
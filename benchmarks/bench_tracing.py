@@ -0,0 +1,57 @@
+"""Benchmark: cost of the tracing spans on hot paths.
+
+Times `--ops` empty `with tracer.span(...)` blocks and counter increments
+with tracing disabled and enabled, against a bare loop. No API or database
+access is needed.
+
+    python -m benchmarks.bench_tracing --ops 1000000
+"""
+
+import argparse
+import time
+
+from src.telemetry.tracing import Tracer
+
+
+def _loop(ops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ops):
+        pass
+    return time.perf_counter() - start
+
+
+def _spans(tracer: Tracer, ops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ops):
+        with tracer.span("db.query", "save_songs"):
+            pass
+    return time.perf_counter() - start
+
+
+def _counts(tracer: Tracer, ops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ops):
+        tracer.count("match.cache", label="hit")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    base = _loop(args.ops)
+    print(f"{'case':<18}{'total s':>10}{'ns/op':>10}")
+    for enabled in (False, True):
+        tracer = Tracer(enabled=enabled)
+        state = "enabled" if enabled else "disabled"
+        for case, func in (("span", _spans), ("count", _counts)):
+            seconds = func(tracer, args.ops) - base
+            print(f"{case + ' ' + state:<18}{seconds:>10.3f}{seconds / args.ops * 1e9:>10.0f}")
+        if enabled:
+            span = tracer.report()["spans"]["db.query[save_songs]"]
+            print(f"recorded {span['count']} spans, p99 {span['p99_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""In-memory stand-in for `FalkordbManager` used by the pipeline benchmark.
+
+Implements the manager methods the scrape → match → create pipeline calls,
+with the same semantics as the Cypher in `src.db.queries` (songs per source,
+a persistent track catalog, matches on tracks, insert bookkeeping on songs),
+so the pipeline can be measured without a FalkorDB server.
+"""
+
+import threading
+from itertools import count
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from src.db.falkordb_manager import MatchRow
+from src.models.data_classes import PendingSong
+from src.models.normalize import track_key
+
+
+class InMemoryGraphManager:
+    """Thread-safe, dict-backed implementation of the `FalkordbManager` API."""
+
+    graph = True  # callers only test for a connection
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._ids = count(1)
+        self.songs: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.tracks: Dict[str, Dict[str, Any]] = {}
+        self.playlists: Dict[str, Dict[str, Any]] = {}
+        self.sync_targets: Dict[str, str] = {}
+        self.queries = 0
+
+    def save_songs_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """Creates or updates songs and links them to their tracks."""
+        with self._lock:
+            self.queries += 1
+            for row in rows:
+                source, title, artist = row.get("source", ""), row["title"], row["artist"]
+                duration = row.get("duration_ms", 0)
+                key = track_key(title, artist, row.get("isrc", ""))
+                track = self.tracks.setdefault(key, {
+                    "id": next(self._ids), "key": key, "title": title, "artist": artist,
+                    "match_status": "PENDING", "duration_ms": 0,
+                })
+                if duration:
+                    track["duration_ms"] = duration
+                song = self.songs.setdefault((source, title, artist), {
+                    "id": next(self._ids), "source": source, "inserted_at": None,
+                })
+                song.update(index=row.get("index", 0), track=key)
+
+    def save_playlist_name(self, name: str, source: str = "") -> None:
+        """Saves playlist metadata."""
+        with self._lock:
+            self.queries += 1
+            self.playlists.setdefault(source, {})["name"] = name
+
+    def get_playlists(self) -> List[Tuple[str, str]]:
+        """Returns `(source, name)` pairs sorted by name."""
+        with self._lock:
+            self.queries += 1
+            return sorted(((s, p.get("name", "")) for s, p in self.playlists.items()),
+                          key=lambda pair: pair[1])
+
+    def find_pending_tracks(self) -> List[PendingSong]:
+        """Returns unmatched tracks referenced by at least one song."""
+        with self._lock:
+            self.queries += 1
+            linked = {song["track"] for song in self.songs.values()}
+            return [
+                PendingSong(t["title"], t["artist"], t["id"], t["duration_ms"], key)
+                for status in ("DEFERRED", "PENDING")
+                for key, t in self.tracks.items()
+                if t["match_status"] == status and key in linked
+            ]
+
+    def iter_pending_tracks(self, page_size: Optional[int] = None  # pylint: disable=unused-argument
+                            ) -> Iterator[PendingSong]:
+        """Yields the pending tracks (read in one go; the fake has no pages)."""
+        yield from self.find_pending_tracks()
+
+    def count_pending_tracks(self) -> int:
+        """Returns how many unique tracks are waiting to be matched."""
+        return len(self.find_pending_tracks())
+
+    def defer_tracks(self, track_ids: Sequence[int]) -> None:
+        """Marks unmatched tracks DEFERRED."""
+        with self._lock:
+            self.queries += 1
+            wanted = set(track_ids)
+            for track in self.tracks.values():
+                if track["id"] in wanted and track["match_status"] != "MATCHED":
+                    track["match_status"] = "DEFERRED"
+
+    def update_tracks_with_youtube_matches(self, batch: Sequence[MatchRow]) -> None:
+        """Marks tracks as matched."""
+        with self._lock:
+            self.queries += 1
+            by_id = {t["id"]: t for t in self.tracks.values()}
+            for track_id, video_id, query, score in batch:
+                by_id[track_id].update(match_status="MATCHED", youtube_id=video_id,
+                                       query_used=query, match_score=score)
+
+    def update_tracks_by_key_with_youtube_matches(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Marks tracks as matched by key, creating tracks not stored yet."""
+        with self._lock:
+            self.queries += 1
+            for row in rows:
+                track = self.tracks.setdefault(row["track_key"], {
+                    "id": next(self._ids), "key": row["track_key"], "title": row["title"],
+                    "artist": row["artist"], "duration_ms": row["duration_ms"],
+                })
+                track.update(match_status="MATCHED", youtube_id=row["video_id"],
+                             query_used=row["query_used"], match_score=row["score"])
+
+    def get_matched_track_keys(self, keys: Sequence[str]) -> Set[str]:
+        """Returns which of the given track keys are already matched."""
+        with self._lock:
+            self.queries += 1
+            return {k for k in keys if self.tracks.get(k, {}).get("match_status") == "MATCHED"}
+
+    def _matched(self, source: str) -> List[Dict[str, Any]]:
+        songs = [
+            s for s in self.songs.values()
+            if s["source"] == source and self.tracks[s["track"]]["match_status"] == "MATCHED"
+        ]
+        return sorted(songs, key=lambda s: s["index"])
+
+    def get_pending_inserts(self, source: str) -> List[Tuple[int, str]]:
+        """Returns `(song_id, video_id)` of matched songs not yet inserted."""
+        with self._lock:
+            self.queries += 1
+            return [(s["id"], self.tracks[s["track"]]["youtube_id"])
+                    for s in self._matched(source) if s["inserted_at"] is None]
+
+    def get_matched_songs(self, source: str) -> List[Tuple[int, str]]:
+        """Returns `(song_id, video_id)` of all matched songs of a source."""
+        with self._lock:
+            self.queries += 1
+            return [(s["id"], self.tracks[s["track"]]["youtube_id"]) for s in self._matched(source)]
+
+    def iter_matched_songs(self, source: str,
+                           page_size: Optional[int] = None  # pylint: disable=unused-argument
+                           ) -> Iterator[Tuple[int, str]]:
+        """Yields `(song_id, video_id)` of all matched songs of a source."""
+        yield from self.get_matched_songs(source)
+
+    def count_inserted_songs(self, source: str) -> int:
+        """Returns how many songs of a source are confirmed in its playlist."""
+        with self._lock:
+            self.queries += 1
+            return sum(1 for s in self.songs.values()
+                       if s["source"] == source and s["inserted_at"] is not None)
+
+    def mark_songs_inserted(self, rows: Sequence[Tuple[int, int]]) -> None:
+        """Records `(song_id, position)` pairs as inserted."""
+        with self._lock:
+            self.queries += 1
+            by_id = {s["id"]: s for s in self.songs.values()}
+            for song_id, position in rows:
+                by_id[song_id].update(inserted_at=True, position=position)
+
+    def set_youtube_playlist_id(self, source: str, playlist_id: str) -> None:
+        """Remembers the YouTube playlist created for a source."""
+        with self._lock:
+            self.queries += 1
+            if source in self.playlists:
+                self.playlists[source]["youtube_playlist_id"] = playlist_id
+
+    def get_youtube_playlist_id(self, source: str) -> Optional[str]:
+        """Returns the YouTube playlist ID of a source."""
+        with self._lock:
+            self.queries += 1
+            return self.playlists.get(source, {}).get("youtube_playlist_id")
+
+    def set_sync_target(self, source: str, playlist_id: str) -> None:
+        """Persistently maps a source to its YouTube playlist."""
+        with self._lock:
+            self.queries += 1
+            self.sync_targets[source] = playlist_id
+
+    def get_sync_target(self, source: str) -> Optional[str]:
+        """Returns the YouTube playlist a source was synced into before."""
+        with self._lock:
+            self.queries += 1
+            return self.sync_targets.get(source)
+
+    def clear_database(self) -> bool:
+        """Drops playlist data; tracks and sync targets are kept."""
+        with self._lock:
+            self.queries += 1
+            self.songs.clear()
+            self.playlists.clear()
+            return True
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """No connection pool in memory."""
+        return {}
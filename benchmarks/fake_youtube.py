@@ -0,0 +1,325 @@
+"""Local stand-in for the YouTube Data API endpoints used by `YouTubeManager`.
+
+Serves `search.list`, `videos.list`, `playlists.insert`, `playlistItems`
+(`insert`/`list`/`update`/`delete`) and multipart batch requests over plain
+HTTP, so the real `googleapiclient` code path runs end to end without
+credentials or quota. Point a manager at it with
+`YouTubeManager(credentials=..., api_endpoint=fake.url)`.
+
+- `latency`: seconds added to every HTTP round trip (a batch counts once).
+- `error_rate`: share of calls failing with a retriable 503 `backendError`.
+- `rate_limit_rate`: share of calls failing with 403 `rateLimitExceeded`.
+- `retry_after`: seconds sent as `Retry-After` with those injected errors.
+- `token`: when set, requests without `Authorization: Bearer <token>` get 401.
+- `quota`: daily units; calls beyond it fail with 403 `quotaExceeded`.
+
+Search results are deterministic: the first candidate's title is the query,
+the others are alternative renditions.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Quota units per (HTTP method, resource), as documented for the Data API v3.
+COSTS: Dict[Tuple[str, str], int] = {
+    ("GET", "search"): 100,
+    ("GET", "videos"): 1,
+    ("POST", "playlists"): 50,
+    ("GET", "playlistItems"): 1,
+    ("POST", "playlistItems"): 50,
+    ("PUT", "playlistItems"): 50,
+    ("DELETE", "playlistItems"): 50,
+}
+
+_VERBS = {"GET": "list", "POST": "insert", "PUT": "update", "DELETE": "delete"}
+_BLANK_LINE = re.compile(rb"\r?\n\r?\n")
+_INJECTED = ("backendError", "rateLimitExceeded")
+_RENDITIONS = ("", " (Live)", " (Lyrics)", " (Cover)", " (Official Video)")
+
+Response = Tuple[int, Optional[Dict[str, Any]]]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _reason(payload: Optional[Dict[str, Any]]) -> str:
+    errors = ((payload or {}).get("error") or {}).get("errors") or [{}]
+    return errors[0].get("reason", "")
+
+
+def _error(status: int, reason: str, message: str) -> Response:
+    return status, {"error": {"code": status, "message": message,
+                              "errors": [{"reason": reason, "message": message}]}}
+
+
+class FakeYouTube:
+    """In-process fake of the YouTube Data API; use as a context manager."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        quota: Optional[int] = None,
+        seed: int = 0,
+        rate_limit_rate: float = 0.0,
+        retry_after: Optional[float] = None,
+        token: Optional[str] = None,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.token = token
+        self.quota = quota
+        self.calls: Counter = Counter()
+        self.quota_spent = 0
+        self.errors_injected = 0
+        self.http_requests = 0
+        self.playlists: Dict[str, List[Tuple[str, str]]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass as `api_endpoint`."""
+        if self._server is None:
+            raise RuntimeError("FakeYouTube is not running; call start() first.")
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeYouTube":
+        """Starts serving on a free local port."""
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeYouTube":
+        return self.start()
+
+    def __exit__(self, *_exc) -> None:
+        self.stop()
+
+    def reset_stats(self) -> None:
+        """Zeroes call, quota and error counters (playlists are kept)."""
+        with self._lock:
+            self.calls.clear()
+            self.quota_spent = 0
+            self.errors_injected = 0
+            self.http_requests = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns call counts per endpoint, quota spent and injected errors."""
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "total_calls": sum(self.calls.values()),
+                "http_requests": self.http_requests,
+                "quota_spent": self.quota_spent,
+                "errors_injected": self.errors_injected,
+            }
+
+    # -- request handling ---------------------------------------------------
+
+    def _next_id(self, prefix: str) -> str:
+        self._ids += 1
+        return f"{prefix}{self._ids:010d}"
+
+    def dispatch(self, method: str, path: str, body: bytes) -> Response:
+        """Handles one API call (also used for every part of a batch)."""
+        parts = urlsplit(path)
+        resource = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        payload = json.loads(body) if body else {}
+        cost = COSTS.get((method, resource))
+        if cost is None:
+            return _error(404, "notFound", f"{method} {parts.path} is not faked")
+
+        with self._lock:
+            self.calls[f"{resource}.{_VERBS[method]}"] += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors_injected += 1
+                return _error(503, "backendError", "Injected backend error")
+            if self.rate_limit_rate and self._random.random() < self.rate_limit_rate:
+                self.errors_injected += 1
+                return _error(403, "rateLimitExceeded", "Injected rate limit")
+            if self.quota is not None and self.quota_spent + cost > self.quota:
+                return _error(403, "quotaExceeded", "The request cannot be completed "
+                                                    "because you have exceeded your quota.")
+            self.quota_spent += cost
+            handler = getattr(self, f"_{resource}_{method.lower()}")
+            return handler(query, payload)
+
+    def _search_get(self, query: Dict[str, str], _payload) -> Response:
+        q = query.get("q", "")
+        count = min(int(query.get("maxResults", 5)), 50)
+        items = []
+        for i in range(count):
+            video_id = _digest(f"{q}#{i}")[:11]
+            items.append({
+                "id": {"kind": "youtube#video", "videoId": video_id},
+                "snippet": {"title": q + _RENDITIONS[i % len(_RENDITIONS)],
+                            "channelTitle": f"Channel {i}"},
+            })
+        return 200, {"items": items}
+
+    def _videos_get(self, query: Dict[str, str], _payload) -> Response:
+        items = []
+        for video_id in filter(None, query.get("id", "").split(",")):
+            seconds = 120 + int(_digest(video_id)[:4], 16) % 240
+            items.append({
+                "id": video_id,
+                "contentDetails": {"duration": f"PT{seconds // 60}M{seconds % 60}S"},
+                "snippet": {"channelTitle": "Channel", "channelId": f"UC{video_id}"},
+            })
+        return 200, {"items": items}
+
+    def _playlists_post(self, _query, payload) -> Response:
+        playlist_id = self._next_id("PL")
+        self.playlists[playlist_id] = []
+        return 200, {"id": playlist_id, "snippet": payload.get("snippet", {})}
+
+    def _playlist(self, snippet: Dict[str, Any]) -> Optional[List[Tuple[str, str]]]:
+        return self.playlists.get(snippet.get("playlistId", ""))
+
+    def _playlistItems_post(self, _query, payload) -> Response:  # pylint: disable=invalid-name
+        snippet = payload.get("snippet", {})
+        items = self._playlist(snippet)
+        if items is None:
+            return _error(404, "playlistNotFound", "Playlist not found")
+        item_id = self._next_id("PLI")
+        position = snippet.get("position", len(items))
+        items.insert(min(position, len(items)), (item_id, snippet["resourceId"]["videoId"]))
+        return 200, {"id": item_id, "snippet": snippet}
+
+    def _playlistItems_get(self, query: Dict[str, str], _payload) -> Response:  # pylint: disable=invalid-name
+        items = self.playlists.get(query.get("playlistId", ""))
+        if items is None:
+            return _error(404, "playlistNotFound", "Playlist not found")
+        start = int(query.get("pageToken") or 0)
+        size = min(int(query.get("maxResults", 5)), 50)
+        page = [
+            {"id": item_id, "snippet": {"position": start + i,
+                                        "resourceId": {"kind": "youtube#video", "videoId": video}}}
+            for i, (item_id, video) in enumerate(items[start:start + size])
+        ]
+        response: Dict[str, Any] = {"items": page, "pageInfo": {"totalResults": len(items)}}
+        if start + size < len(items):
+            response["nextPageToken"] = str(start + size)
+        return 200, response
+
+    def _playlistItems_put(self, _query, payload) -> Response:  # pylint: disable=invalid-name
+        snippet = payload.get("snippet", {})
+        items = self._playlist(snippet) or []
+        for i, (item_id, video) in enumerate(items):
+            if item_id == payload.get("id"):
+                del items[i]
+                items.insert(min(snippet.get("position", len(items)), len(items)), (item_id, video))
+                return 200, payload
+        return _error(404, "playlistItemNotFound", "Playlist item not found")
+
+    def _playlistItems_delete(self, query: Dict[str, str], _payload) -> Response:  # pylint: disable=invalid-name
+        for items in self.playlists.values():
+            for i, (item_id, _) in enumerate(items):
+                if item_id == query.get("id"):
+                    del items[i]
+                    return 204, None
+        return _error(404, "playlistItemNotFound", "Playlist item not found")
+
+    def dispatch_batch(self, content_type: str, body: bytes) -> Tuple[str, bytes]:
+        """Answers a multipart/mixed batch; returns `(content_type, body)`."""
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        boundary = "batch_fake_boundary"
+        chunks = []
+        for part in message.iter_parts():
+            request = part.get_payload(decode=True)
+            if not isinstance(request, bytes):
+                continue
+            head, *rest = _BLANK_LINE.split(request, 1)
+            inner_body = rest[0] if rest else b""
+            request_line = head.splitlines()[0].decode()
+            method, path, _ = request_line.split(" ", 2)
+            status, payload = self.dispatch(method, path, inner_body)
+            content_id = part.get("Content-ID", "").strip("<>")
+            text = json.dumps(payload) if payload is not None else ""
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(text.encode())}\r\n\r\n{text}\r\n"
+            )
+        chunks.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", "".join(chunks).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes HTTP requests to the owning `FakeYouTube`."""
+
+    fake: FakeYouTube
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_args) -> None:  # keep benchmark output clean
+        pass
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        with self.fake._lock:  # pylint: disable=protected-access
+            self.fake.http_requests += 1
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        if self.fake.token and self.headers.get("Authorization") != f"Bearer {self.fake.token}":
+            status, payload = _error(401, "authError", "Invalid Credentials")
+            self._send(status, "application/json; charset=UTF-8", json.dumps(payload).encode())
+            return
+
+        if self.path.startswith("/batch/"):
+            content_type, data = self.fake.dispatch_batch(self.headers["Content-Type"], body)
+            self._send(200, content_type, data)
+            return
+        status, payload = self.fake.dispatch(self.command, self.path, body)
+        data = json.dumps(payload).encode() if payload is not None else b""
+        headers = {}
+        if self.fake.retry_after is not None and _reason(payload) in _INJECTED:
+            headers["Retry-After"] = str(self.fake.retry_after)
+        self._send(status, "application/json; charset=UTF-8", data, headers)
+
+    def _send(self, status: int, content_type: str, data: bytes,
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
@@ -1,150 +1,394 @@
 """FalkorDB connection manager.
 
 This module provides access to the FalkorDB graph using a simple singleton pattern
-and includes helper methods for adding/updating data.
+and includes helper methods for adding/updating data. All Cypher lives in
+`src.db.queries` and is sent with query parameters.
+
+The connection is opened lazily, on the first access to `graph`, through a
+bounded blocking connection pool (see `src.db.pool`) that thread-pool workers
+share. A failed connect is retried with exponential backoff instead of on
+every call. The FalkorDB/redis client is only imported once the server
+accepts a TCP connection, so commands that find no server (or never touch
+the graph) do not pay for the import.
 """
 
 import os
-from typing import Dict, List, Optional
+import socket
+import threading
+import time
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Set,
+                    Tuple)
 
 from dotenv import load_dotenv
-from falkordb import FalkorDB
+
+from src.db.queries import QUERIES
+from src.models.data_classes import PendingSong
+from src.models.normalize import track_key
+from src.telemetry.tracing import tracer
+
+if TYPE_CHECKING:
+    from falkordb import Graph
+
+    from src.db.pool import InstrumentedConnectionPool
 
 load_dotenv()
 
+_SONG_DEFAULTS = {"source": "", "album": "", "duration_ms": 0, "isrc": ""}
+
+
+def song_rows(rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Completes `save_songs` rows: optional keys get defaults, plus `track_key`."""
+    completed = [{**_SONG_DEFAULTS, **row} for row in rows]
+    for row in completed:
+        row["track_key"] = track_key(row["title"], row["artist"], row["isrc"])
+    return completed
+
+
+# (track_id, video_id, query_used, score)
+MatchRow = Tuple[int, str, str, Optional[float]]
+
+# Rows per round-trip for the paginated readers
+_PAGE_SIZE = int(os.getenv("FALKORDB_PAGE_SIZE", "1000"))
+
+_RECONNECT_BASE_SECONDS = 1.0
+_RECONNECT_MAX_SECONDS = 60.0
+
+
+def _server_reachable(host: str, port: int) -> None:
+    """Raises `OSError` unless something accepts TCP connections on `host:port`."""
+    timeout = float(os.getenv("FALKORDB_CONNECT_TIMEOUT", "5"))
+    socket.create_connection((host, port), timeout=timeout).close()
+
 
 class FalkordbManager:
     """Simple FalkorDB manager (singleton-like behavior).
 
+    All instances share one graph handle and one connection pool, created on
+    first use. Pool size and timeouts come from `FALKORDB_MAX_CONNECTIONS`,
+    `FALKORDB_POOL_TIMEOUT`, `FALKORDB_HEALTH_CHECK_INTERVAL`,
+    `FALKORDB_CONNECT_TIMEOUT`, `FALKORDB_SOCKET_TIMEOUT` and `FALKORDB_RETRIES`.
+
     Note: `FALKORDB_PORT` environment variable is read as string and converted to int
     to prevent pylint's env default type warning.
     """
 
-    _instance: Optional[FalkorDB] = None
+    _instance: Optional["Graph"] = None
+    _pool: Optional["InstrumentedConnectionPool"] = None
     _graph_name = "spotify_sync_graph"
+    _lock = threading.Lock()
+    _failures = 0
+    _next_attempt = 0.0
 
-    def __init__(self) -> None:
-        host = os.getenv("FALKORDB_HOST", "localhost")
-        port = int(os.getenv("FALKORDB_PORT", "6379"))
-
+    @property
+    def graph(self) -> Optional["Graph"]:
+        """Returns the FalkorDB graph object (or None), connecting on first use."""
         if FalkordbManager._instance is None:
+            FalkordbManager._connect()
+        return FalkordbManager._instance
+
+    @classmethod
+    def _connect(cls) -> None:
+        """Opens the pool and selects the graph, unless a recent attempt failed."""
+        with cls._lock:
+            if cls._instance is not None or time.monotonic() < cls._next_attempt:
+                return
+            host = os.getenv("FALKORDB_HOST", "localhost")
+            port = int(os.getenv("FALKORDB_PORT", "6379"))
             try:
-                db = FalkorDB(host=host, port=port)
-                FalkordbManager._instance = db.select_graph(FalkordbManager._graph_name)
+                # A refused port fails here, before the client import and its retries
+                _server_reachable(host, port)
+            except OSError as exc:
+                cls._connect_failed(exc)
+                return
+
+            # pylint: disable=import-outside-toplevel
+            from falkordb import FalkorDB
+
+            from src.db.pool import InstrumentedConnectionPool
+            from src.db.schema import ensure_schema
+
+            pool = InstrumentedConnectionPool.from_env(host, port)
+            try:
+                graph = FalkorDB(connection_pool=pool).select_graph(cls._graph_name)
             except Exception as exc:  # pylint: disable=broad-except
-                print(f"Error: Could not establish FalkorDB connection. {exc}")
+                pool.disconnect()
+                cls._connect_failed(exc)
+                return
 
-    @property
-    def graph(self) -> Optional[FalkorDB]:
-        """Returns the FalkorDB graph object (or None)."""
-        return FalkordbManager._instance
+            try:
+                ensure_schema(graph)
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"Warning: Could not apply FalkorDB schema. {exc}")
 
-    def _sanitize(self, text: str) -> str:
-        """Escapes single quotes in the text.
+            cls._pool, cls._instance = pool, graph
+            cls._failures, cls._next_attempt = 0, 0.0
 
-        Emojis are preserved; only single quotes are escaped.
-        """
-        if not text:
-            return ""
-        return str(text).replace("'", "\\'")
+    @classmethod
+    def _connect_failed(cls, exc: Exception) -> None:
+        """Backs off exponentially before the next connection attempt."""
+        delay = min(_RECONNECT_MAX_SECONDS, _RECONNECT_BASE_SECONDS * 2 ** cls._failures)
+        cls._failures += 1
+        cls._next_attempt = time.monotonic() + delay
+        print(f"Error: Could not establish FalkorDB connection "
+              f"(retrying in {delay:.0f}s). {exc}")
+
+    @classmethod
+    def close(cls) -> None:
+        """Closes the pool's connections; the next access to `graph` reconnects."""
+        with cls._lock:
+            if cls._pool is not None:
+                cls._pool.disconnect()
+            cls._pool = cls._instance = None
+            cls._failures, cls._next_attempt = 0, 0.0
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Returns connection pool metrics (connections in use, wait times)."""
+        pool = FalkordbManager._pool
+        return pool.stats() if pool is not None else {}
+
+    def _query(self, name: str, params: Optional[Dict[str, Any]] = None):
+        """Runs a registered query template with the given parameters."""
+        graph = self.graph
+        if graph is None:
+            raise ConnectionError("Not connected to FalkorDB.")
+        with tracer.span("db.query", name):
+            return graph.query(QUERIES[name], params)
 
-    def save_song_info(self, title: str, artist: str, index: int = 0) -> None:
+    def save_song_info(self, title: str, artist: str, index: int = 0, source: str = "") -> None:
         """Creates or updates a `Song` node."""
-        if not self.graph:
-            return
+        self.save_songs_batch([{"title": title, "artist": artist, "index": index, "source": source}])
+
+    def save_songs_batch(self, rows: List[Dict[str, Any]]) -> None:
+        """Creates or updates many `Song` nodes in a single round-trip.
 
-        t = self._sanitize(title)
-        a = self._sanitize(artist)
-
-        query = f"""
-        MERGE (s:Song {{title: '{t}', artist: '{a}'}})
-        ON CREATE SET s.scraped_at = timestamp(), 
-                      s.match_status = 'PENDING', 
-                      s.playlist_index = {index}
-        ON MATCH SET s.playlist_index = {index}
-        MERGE (art:Artist {{name: '{a}'}})
-        MERGE (s)-[:PERFORMED_BY]->(art)
+        Each row is a dict with `title`, `artist` and `index` keys and optional
+        `source`, `album`, `duration_ms` and `isrc` keys. Every song is linked
+        to its `Track` (see `track_key`), created on first sight.
         """
-        self.graph.query(query)
+        if not self.graph or not rows:
+            return
+        self._query("save_songs", {"rows": song_rows(rows)})
 
-    def save_playlist_name(self, name: str) -> None:
+    def save_playlist_name(self, name: str, source: str = "") -> None:
         """Saves playlist metadata."""
         if not self.graph:
             return
+        self._query("save_playlist_name", {"name": name or "", "source": source})
 
-        n = self._sanitize(name)
-        query = f"MERGE (p:PlaylistMeta {{id: 1}}) SET p.name = '{n}'"
-        self.graph.query(query)
-
-    def get_playlist_name(self) -> str:
+    def get_playlist_name(self, source: str = "") -> str:
         """Returns the saved playlist name (returns default if not found)."""
         if not self.graph:
             return "Spotify Playlist"
         try:
-            res = self.graph.query("MATCH (p:PlaylistMeta) RETURN p.name LIMIT 1")
+            res = self._query("get_playlist_name", {"source": source})
             return res.result_set[0][0] if res.result_set else "Spotify Playlist"
         except Exception:  # pylint: disable=broad-except
             return "Spotify Playlist"
 
-    def find_pending_songs(self) -> List[Dict[str, str]]:
-        """Returns a list of pending songs as dictionaries."""
+    def get_playlists(self) -> List[Tuple[str, str]]:
+        """Returns `(source, name)` pairs for every scraped playlist."""
         if not self.graph:
             return []
-
-        query = (
-            "MATCH (s:Song) WHERE s.match_status = 'PENDING' "
-            "RETURN s.title, s.artist, ID(s) "
-            "ORDER BY s.playlist_index ASC"
-        )
         try:
-            result = self.graph.query(query)
-            return [
-                {"title": r[0], "artist": r[1], "song_id": r[2]}
-                for r in result.result_set
-            ]
-        except Exception: # pylint: disable=broad-except
+            return [(r[0], r[1]) for r in self._query("get_playlists").result_set]
+        except Exception:  # pylint: disable=broad-except
             return []
 
-    def update_song_with_youtube_match(self, song_id: int, video_id: str, query_used: str) -> None:
-        """Updates the song with the matched YouTube video ID."""
+    def _pages(self, name: str, params: Dict[str, Any], cursor: Dict[str, Any],
+               advance: Callable[[Sequence[Any]], Dict[str, Any]],
+               page_size: Optional[int]) -> Iterator[Sequence[Any]]:
+        """Yields the rows of a keyset-paginated query, one page per round-trip.
+
+        `advance` turns the last row of a page into the cursor for the next.
+        A failed query ends the iteration, like the list readers return [].
+        """
+        limit = max(1, page_size or _PAGE_SIZE)
+        while True:
+            try:
+                rows = self._query(name, {**params, **cursor, "limit": limit}).result_set
+            except Exception:  # pylint: disable=broad-except
+                return
+            yield from rows
+            if len(rows) < limit:
+                return
+            cursor = advance(rows[-1])
+
+    def iter_pending_tracks(self, page_size: Optional[int] = None) -> Iterator[PendingSong]:
+        """Yields the unique unmatched tracks page by page (`FALKORDB_PAGE_SIZE`):
+        all DEFERRED ones first, so work the last quota window could not cover
+        is not pushed back by newer scrapes, then the PENDING ones.
+
+        Matching can start on the first page; tracks matched while iterating
+        do not shift later pages.
+        """
         if not self.graph:
             return
+        for status in ("DEFERRED", "PENDING"):
+            for r in self._pages("find_pending_tracks", {"status": status}, {"after_id": -1},
+                                 lambda row: {"after_id": row[2]}, page_size):
+                yield PendingSong(r[0], r[1], r[2], r[3] or 0, r[4] or "")
+
+    def find_pending_tracks(self) -> List[PendingSong]:
+        """Returns the unique unmatched tracks of all scraped playlists
+        (with `duration_ms` for scoring)."""
+        return list(self.iter_pending_tracks())
 
-        q = self._sanitize(query_used)
-        query = f"""
-        MATCH (s:Song) WHERE ID(s) = {song_id}
-        SET s.match_status = 'MATCHED', 
-            s.youtube_id = '{video_id}',
-            s.query_used = '{q}',
-            s.matched_at = timestamp()
+    def count_pending_tracks(self) -> int:
+        """Returns how many unique tracks are waiting to be matched."""
+        if not self.graph:
+            return 0
+        try:
+            res = self._query("count_pending_tracks")
+            return int(res.result_set[0][0]) if res.result_set else 0
+        except Exception:  # pylint: disable=broad-except
+            return 0
+
+    def defer_tracks(self, track_ids: Sequence[int]) -> None:
+        """Marks unmatched tracks DEFERRED to the next quota window."""
+        if not self.graph or not track_ids:
+            return
+        self._query("defer_tracks", {"track_ids": list(track_ids)})
+
+    def update_track_with_youtube_match(self, track_id: int, video_id: str, query_used: str) -> None:
+        """Updates the track with the matched YouTube video ID."""
+        self.update_tracks_with_youtube_matches([(track_id, video_id, query_used, None)])
+
+    def update_tracks_with_youtube_matches(self, batch: Sequence[MatchRow]) -> None:
+        """Marks many tracks as matched in a single query.
+
+        `batch` holds `(track_id, video_id, query_used, score)` tuples; `score`
+        may be None. Every song of every playlist linked to a track shares its match.
         """
-        self.graph.query(query)
+        if not self.graph or not batch:
+            return
+
+        rows = [
+            {"track_id": track_id, "video_id": video_id, "query_used": query or "", "score": score}
+            for track_id, video_id, query, score in batch
+        ]
+        self._query("update_track_matches", {"rows": rows})
+
+    def update_tracks_by_key_with_youtube_matches(self, rows: Sequence[Dict[str, Any]]) -> None:
+        """Marks tracks as matched by `track_key`, creating tracks not stored yet.
+
+        Each row holds `track_key`, `title`, `artist`, `duration_ms`,
+        `video_id`, `query_used` and `score`.
+        """
+        if not self.graph or not rows:
+            return
+        self._query("update_track_matches_by_key", {"rows": list(rows)})
 
-    def get_all_matched_video_ids(self) -> List[str]:
-        """Returns a list of all matched YouTube video IDs."""
+    def get_matched_track_keys(self, keys: Sequence[str]) -> Set[str]:
+        """Returns which of the given track keys are already matched."""
+        if not self.graph or not keys:
+            return set()
+        try:
+            res = self._query("get_matched_track_keys", {"keys": list(keys)})
+            return {r[0] for r in res.result_set}
+        except Exception:  # pylint: disable=broad-except
+            return set()
+
+    def iter_matched_songs(self, source: str,
+                           page_size: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yields `(song_id, video_id)` of a source's matched songs in playlist order,
+        page by page (`FALKORDB_PAGE_SIZE`)."""
         if not self.graph:
-            return []
+            return
+        rows = self._pages("get_matched_songs", {"source": source},
+                           {"after_index": -1, "after_id": -1},
+                           lambda row: {"after_index": row[2], "after_id": row[0]}, page_size)
+        for r in rows:
+            yield r[0], r[1]
 
-        query = (
-            "MATCH (s:Song) WHERE s.match_status = 'MATCHED' "
-            "RETURN s.youtube_id "
-            "ORDER BY s.playlist_index ASC"
-        )
+    def iter_matched_video_ids(self, source: str = "",
+                               page_size: Optional[int] = None) -> Iterator[str]:
+        """Yields the matched YouTube video IDs of a playlist, in playlist order."""
+        for _, video_id in self.iter_matched_songs(source, page_size):
+            yield video_id
+
+    def get_all_matched_video_ids(self, source: str = "") -> List[str]:
+        """Returns the matched YouTube video IDs of a playlist, in playlist order."""
+        return list(self.iter_matched_video_ids(source))
+
+    def set_youtube_playlist_id(self, source: str, playlist_id: str) -> None:
+        """Remembers the YouTube playlist created for a source."""
+        if not self.graph:
+            return
+        self._query("set_youtube_playlist_id", {"source": source, "playlist_id": playlist_id})
+
+    def get_youtube_playlist_id(self, source: str) -> Optional[str]:
+        """Returns the YouTube playlist ID of a source (None if not created yet)."""
+        if not self.graph:
+            return None
+        try:
+            res = self._query("get_youtube_playlist_id", {"source": source})
+            return res.result_set[0][0] if res.result_set else None
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def set_sync_target(self, source: str, playlist_id: str) -> None:
+        """Persistently maps a Spotify source to its YouTube playlist."""
+        if not self.graph:
+            return
+        self._query("set_sync_target", {"source": source, "playlist_id": playlist_id})
+
+    def get_sync_target(self, source: str) -> Optional[str]:
+        """Returns the YouTube playlist a source was synced into before (or None)."""
+        if not self.graph:
+            return None
         try:
-            result = self.graph.query(query)
-            return [r[0] for r in result.result_set]
-        except Exception: # pylint: disable=broad-except
+            res = self._query("get_sync_target", {"source": source})
+            return res.result_set[0][0] if res.result_set else None
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def get_pending_inserts(self, source: str) -> List[Tuple[int, str]]:
+        """Returns `(song_id, video_id)` of matched songs not yet in the YouTube playlist."""
+        if not self.graph:
             return []
+        try:
+            result = self._query("get_pending_inserts", {"source": source})
+            return [(r[0], r[1]) for r in result.result_set]
+        except Exception:  # pylint: disable=broad-except
+            return []
+
+    def get_matched_songs(self, source: str) -> List[Tuple[int, str]]:
+        """Returns `(song_id, video_id)` of all matched songs of a source, in playlist order."""
+        return list(self.iter_matched_songs(source))
 
-    def clear_database(self) -> None:
-        """Deletes all nodes and relationships in the graph."""
+    def count_inserted_songs(self, source: str) -> int:
+        """Returns how many songs of a source are confirmed in its YouTube playlist."""
         if not self.graph:
+            return 0
+        try:
+            res = self._query("count_inserted", {"source": source})
+            return int(res.result_set[0][0]) if res.result_set else 0
+        except Exception:  # pylint: disable=broad-except
+            return 0
+
+    def mark_songs_inserted(self, rows: Sequence[Tuple[int, int]]) -> None:
+        """Records `(song_id, position)` pairs as inserted into the YouTube playlist."""
+        if not self.graph or not rows:
             return
+        self._query(
+            "mark_inserted",
+            {"rows": [{"song_id": song_id, "position": pos} for song_id, pos in rows]},
+        )
+
+    def clear_database(self) -> bool:
+        """Deletes all playlist data; the track catalog and sync targets are kept.
+
+        Returns True on success.
+        """
+        if not self.graph:
+            return False
         try:
-            self.graph.query("MATCH (n) DETACH DELETE n")
+            self._query("clear_database")
             print("Database cleared.")
+            return True
         except Exception as exc: # pylint: disable=broad-except
             print(f"Error clearing database: {exc}")
+            return False
 
-# Global instance
+# Global instance (connects on first use)
 db_manager = FalkordbManager()
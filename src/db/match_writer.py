@@ -0,0 +1,109 @@
+"""Background writer that batches YouTube match results into FalkorDB.
+
+Search workers (or the thread consuming their results) only enqueue rows;
+a single writer thread drains the queue and applies them with
+`FalkordbManager.update_tracks_with_youtube_matches`, so database latency
+never adds to API latency. A batch that fails is retried once; if that
+fails too, its rows are dropped and counted in `errors` (the tracks stay
+PENDING).
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional, Sequence
+
+from src.db.falkordb_manager import FalkordbManager, db_manager
+
+_STOP = object()
+
+
+class MatchWriter:
+    """Queue-driven batch writer for match results.
+
+    - `batch_size`: maximum rows per UNWIND query.
+    - `flush_interval`: seconds to wait for more rows before writing a partial batch.
+    - `write`: applies one batch; defaults to
+      `manager.update_tracks_with_youtube_matches` (rows from `submit`).
+    - `retry_delay`: seconds before a failed batch is retried.
+
+    Use as a context manager, or call `start()` and `close()`.
+    """
+
+    def __init__(
+        self,
+        manager: Optional[FalkordbManager] = None,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        write: Optional[Callable[[Sequence[Any]], None]] = None,
+        retry_delay: float = 1.0,
+    ) -> None:
+        self.manager = manager or db_manager
+        self._apply = write or self.manager.update_tracks_with_youtube_matches
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.retry_delay = retry_delay
+        self.written = 0
+        self.errors = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="match-writer", daemon=True)
+
+    def __enter__(self) -> "MatchWriter":
+        self.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Starts the writer thread."""
+        self._thread.start()
+
+    def submit(
+        self, track_id: int, video_id: str, query_used: str, score: Optional[float] = None
+    ) -> None:
+        """Enqueues a match; never blocks on the database."""
+        self.put((track_id, video_id, query_used, score))
+
+    def put(self, row: Any) -> None:
+        """Enqueues a row in the shape the `write` callable expects."""
+        self._queue.put(row)
+
+    def close(self) -> None:
+        """Flushes all queued rows and stops the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _loop(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[Any] = []
+            try:
+                item = self._queue.get()
+                while True:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                pass
+            self._write(batch)
+
+    def _write(self, batch: List[Any]) -> None:
+        if not batch:
+            return
+        for attempt in (1, 2):
+            try:
+                self._apply(batch)
+                self.written += len(batch)
+                return
+            except Exception as exc:  # pylint: disable=broad-except
+                if attempt == 1:
+                    time.sleep(self.retry_delay)
+                    continue
+                self.errors += len(batch)
+                print(f"Error writing {len(batch)} matches to FalkorDB: {exc}")
@@ -0,0 +1,98 @@
+"""Instrumented blocking connection pool for the FalkorDB client.
+
+`InstrumentedConnectionPool` is a `redis.BlockingConnectionPool`: at most
+`max_connections` sockets are opened and callers wait (up to `timeout`
+seconds) for a free one instead of opening more. It additionally counts
+connections in use and how long callers waited, so concurrent matchers can
+see whether they are serializing on the database.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Set
+
+from redis import BlockingConnectionPool
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from redis.retry import Retry
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """`BlockingConnectionPool` that records in-use connections and wait times."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.acquisitions = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.failed = 0
+        self._checked_out: Set[int] = set()  # id() of connections handed out
+
+    @classmethod
+    def from_env(cls, host: str, port: int) -> "InstrumentedConnectionPool":
+        """Builds a pool from `FALKORDB_MAX_CONNECTIONS`, `FALKORDB_POOL_TIMEOUT`,
+        `FALKORDB_HEALTH_CHECK_INTERVAL`, `FALKORDB_CONNECT_TIMEOUT`,
+        `FALKORDB_SOCKET_TIMEOUT` and `FALKORDB_RETRIES`.
+
+        Broken sockets are reconnected with exponential backoff on the next
+        command; idle connections are health-checked (PING) before reuse.
+        """
+        socket_timeout = os.getenv("FALKORDB_SOCKET_TIMEOUT")
+        return cls(
+            max_connections=int(os.getenv("FALKORDB_MAX_CONNECTIONS", "16")),
+            timeout=float(os.getenv("FALKORDB_POOL_TIMEOUT", "10")),
+            host=host,
+            port=port,
+            decode_responses=True,  # what the FalkorDB client expects
+            health_check_interval=int(os.getenv("FALKORDB_HEALTH_CHECK_INTERVAL", "30")),
+            socket_connect_timeout=float(os.getenv("FALKORDB_CONNECT_TIMEOUT", "5")),
+            socket_timeout=float(socket_timeout) if socket_timeout else None,
+            retry=Retry(ExponentialBackoff(cap=2.0, base=0.05),
+                        int(os.getenv("FALKORDB_RETRIES", "3"))),
+            retry_on_error=[RedisConnectionError, RedisTimeoutError],
+        )
+
+    def get_connection(self, *args: Any, **kwargs: Any):
+        start = time.perf_counter()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except RedisConnectionError:
+            # Pool exhausted for `timeout` seconds, or the server is unreachable
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self._checked_out.add(id(connection))
+            self.in_use = len(self._checked_out)
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.acquisitions += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+    def release(self, connection) -> None:
+        with self._stats_lock:
+            self._checked_out.discard(id(connection))
+            self.in_use = len(self._checked_out)
+        super().release(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns pool size, connections in use and wait-time counters."""
+        with self._stats_lock:
+            return {
+                "max_connections": self.max_connections,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "acquisitions": self.acquisitions,
+                "failed": self.failed,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "wait_ms_avg": round(self.wait_seconds / self.acquisitions * 1000, 3)
+                if self.acquisitions else 0.0,
+                "wait_ms_max": round(self.max_wait_seconds * 1000, 3),
+            }
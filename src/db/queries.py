@@ -0,0 +1,190 @@
+"""Cypher query templates used by `FalkordbManager`.
+
+Every query is a constant string with `$param` placeholders. Values are sent
+separately via `graph.query(q, params)`, so titles never need escaping and
+FalkorDB parses and plans each template once, then serves it from its
+execution-plan cache.
+"""
+
+from typing import Dict
+
+# Songs are always written through UNWIND so single saves and pipeline
+# batches share one cached plan. `source` partitions songs per playlist; every
+# song (playlist entry) links to the persistent `Track` it is a recording of.
+SAVE_SONGS = """
+UNWIND $rows AS r
+MERGE (s:Song {source: r.source, title: r.title, artist: r.artist})
+ON CREATE SET s.scraped_at = timestamp()
+SET s.playlist_index = r.index,
+    s.album = r.album,
+    s.duration_ms = r.duration_ms,
+    s.isrc = r.isrc
+MERGE (t:Track {key: r.track_key})
+ON CREATE SET t.title = r.title,
+              t.artist = r.artist,
+              t.match_status = 'PENDING',
+              t.created_at = timestamp()
+SET t.duration_ms = CASE WHEN r.duration_ms > 0 THEN r.duration_ms ELSE coalesce(t.duration_ms, 0) END
+MERGE (s)-[:OF_TRACK]->(t)
+MERGE (art:Artist {name: r.artist})
+MERGE (s)-[:PERFORMED_BY]->(art)
+"""
+
+SAVE_PLAYLIST_NAME = "MERGE (p:PlaylistMeta {id: $source}) SET p.name = $name"
+
+GET_PLAYLIST_NAME = "MATCH (p:PlaylistMeta {id: $source}) RETURN p.name LIMIT 1"
+
+GET_PLAYLISTS = "MATCH (p:PlaylistMeta) RETURN p.id, p.name ORDER BY p.name ASC"
+
+# Unmatched (PENDING or DEFERRED) tracks that appear in at least one scraped
+# playlist; each unique track is searched once no matter how many playlists
+# contain it. Read one `$status` at a time (DEFERRED before PENDING), in pages
+# with keyset pagination on ID(t): unlike SKIP, a cursor does not skip rows
+# when tracks of earlier pages are marked MATCHED while paging.
+FIND_PENDING_TRACKS = """
+MATCH (t:Track)<-[:OF_TRACK]-(:Song)
+WHERE t.match_status = $status AND ID(t) > $after_id
+WITH DISTINCT t
+RETURN t.title, t.artist, ID(t), t.duration_ms, t.key
+ORDER BY ID(t) ASC
+LIMIT $limit
+"""
+
+COUNT_PENDING_TRACKS = """
+MATCH (t:Track)<-[:OF_TRACK]-(:Song)
+WHERE t.match_status IN ['PENDING', 'DEFERRED']
+RETURN count(DISTINCT t)
+"""
+
+# Tracks the daily quota could not cover; they are searched first thing in
+# the next quota window (pending reads return DEFERRED tracks first).
+DEFER_TRACKS = """
+UNWIND $track_ids AS id
+MATCH (t:Track) WHERE ID(t) = id AND t.match_status IN ['PENDING', 'DEFERRED']
+SET t.match_status = 'DEFERRED', t.deferred_at = timestamp()
+"""
+
+UPDATE_TRACK_MATCHES = """
+UNWIND $rows AS r
+MATCH (t:Track) WHERE ID(t) = r.track_id
+SET t.match_status = 'MATCHED',
+    t.youtube_id = r.video_id,
+    t.query_used = r.query_used,
+    t.match_score = r.score,
+    t.matched_at = timestamp()
+"""
+
+
+SET_YOUTUBE_PLAYLIST_ID = """
+MATCH (p:PlaylistMeta {id: $source})
+SET p.youtube_playlist_id = $playlist_id
+"""
+
+GET_YOUTUBE_PLAYLIST_ID = """
+MATCH (p:PlaylistMeta {id: $source})
+RETURN p.youtube_playlist_id LIMIT 1
+"""
+
+# Matched songs not yet confirmed in the YouTube playlist, in playlist order.
+GET_PENDING_INSERTS = """
+MATCH (s:Song {source: $source})-[:OF_TRACK]->(t:Track)
+WHERE t.match_status = 'MATCHED' AND s.inserted_at IS NULL
+RETURN ID(s), t.youtube_id
+ORDER BY s.playlist_index ASC
+"""
+
+# Matches found while the crawl is still running are written by track key;
+# the Track may not be stored yet, so it is created here and SAVE_SONGS later
+# only links songs to it (its ON CREATE branch keeps the match).
+UPDATE_TRACK_MATCHES_BY_KEY = """
+UNWIND $rows AS r
+MERGE (t:Track {key: r.track_key})
+ON CREATE SET t.title = r.title,
+              t.artist = r.artist,
+              t.duration_ms = r.duration_ms,
+              t.created_at = timestamp()
+SET t.match_status = 'MATCHED',
+    t.youtube_id = r.video_id,
+    t.query_used = r.query_used,
+    t.match_score = r.score,
+    t.matched_at = timestamp()
+"""
+
+GET_MATCHED_TRACK_KEYS = """
+UNWIND $keys AS k
+MATCH (t:Track {key: k})
+WHERE t.match_status = 'MATCHED'
+RETURN t.key
+"""
+
+# One page of matched songs in playlist order, keyset-paginated on
+# (playlist_index, ID(s)) so duplicate indexes cannot repeat or drop rows.
+GET_MATCHED_SONGS = """
+MATCH (s:Song {source: $source})-[:OF_TRACK]->(t:Track)
+WHERE t.match_status = 'MATCHED'
+  AND (s.playlist_index > $after_index
+       OR (s.playlist_index = $after_index AND ID(s) > $after_id))
+RETURN ID(s), t.youtube_id, s.playlist_index
+ORDER BY s.playlist_index ASC, ID(s) ASC
+LIMIT $limit
+"""
+
+COUNT_INSERTED = """
+MATCH (s:Song {source: $source}) WHERE s.inserted_at IS NOT NULL
+RETURN count(s)
+"""
+
+MARK_INSERTED = """
+UNWIND $rows AS r
+MATCH (s:Song) WHERE ID(s) = r.song_id
+SET s.inserted_at = timestamp(), s.playlist_position = r.position
+"""
+
+# Which YouTube playlist a Spotify source syncs into; survives `clear_database`.
+SET_SYNC_TARGET = """
+MERGE (t:SyncTarget {source: $source})
+SET t.youtube_playlist_id = $playlist_id, t.synced_at = timestamp()
+"""
+
+GET_SYNC_TARGET = """
+MATCH (t:SyncTarget {source: $source})
+RETURN t.youtube_playlist_id LIMIT 1
+"""
+
+# Schema bookkeeping, sync targets and the track catalog (with its matches)
+# survive `clear_database`.
+CLEAR_DATABASE = """
+MATCH (n) WHERE NOT n:SchemaVersion AND NOT n:SyncTarget AND NOT n:Track
+DETACH DELETE n
+"""
+
+GET_SCHEMA_VERSION = "MATCH (v:SchemaVersion {id: 1}) RETURN v.version"
+
+SET_SCHEMA_VERSION = """
+MERGE (v:SchemaVersion {id: 1})
+SET v.version = $version, v.migrated_at = timestamp()
+"""
+
+QUERIES: Dict[str, str] = {
+    "save_songs": SAVE_SONGS,
+    "save_playlist_name": SAVE_PLAYLIST_NAME,
+    "get_playlist_name": GET_PLAYLIST_NAME,
+    "get_playlists": GET_PLAYLISTS,
+    "find_pending_tracks": FIND_PENDING_TRACKS,
+    "count_pending_tracks": COUNT_PENDING_TRACKS,
+    "defer_tracks": DEFER_TRACKS,
+    "update_track_matches": UPDATE_TRACK_MATCHES,
+    "update_track_matches_by_key": UPDATE_TRACK_MATCHES_BY_KEY,
+    "get_matched_track_keys": GET_MATCHED_TRACK_KEYS,
+    "set_youtube_playlist_id": SET_YOUTUBE_PLAYLIST_ID,
+    "get_youtube_playlist_id": GET_YOUTUBE_PLAYLIST_ID,
+    "get_pending_inserts": GET_PENDING_INSERTS,
+    "get_matched_songs": GET_MATCHED_SONGS,
+    "count_inserted": COUNT_INSERTED,
+    "mark_inserted": MARK_INSERTED,
+    "set_sync_target": SET_SYNC_TARGET,
+    "get_sync_target": GET_SYNC_TARGET,
+    "clear_database": CLEAR_DATABASE,
+    "get_schema_version": GET_SCHEMA_VERSION,
+    "set_schema_version": SET_SCHEMA_VERSION,
+}
@@ -0,0 +1,87 @@
+"""Versioned schema (indexes and constraints) for the sync graph.
+
+`ensure_schema` applies every migration newer than the version stored in the
+`(:SchemaVersion)` node. Each step is idempotent: "already exists" errors are
+ignored, so a half-applied migration can simply be re-run.
+"""
+
+from typing import List, NamedTuple, Tuple
+
+from src.db.queries import GET_SCHEMA_VERSION, SET_SCHEMA_VERSION
+
+
+class SchemaStep(NamedTuple):
+    """A single index/constraint operation on a node label."""
+
+    kind: str  # "range_index", "unique", "drop_range_index" or "drop_unique"
+    label: str
+    properties: Tuple[str, ...]
+
+
+MIGRATIONS: List[Tuple[int, List[SchemaStep]]] = [
+    (1, [
+        SchemaStep("range_index", "Song", ("match_status",)),
+        SchemaStep("range_index", "Song", ("playlist_index",)),
+        SchemaStep("unique", "Song", ("title", "artist")),
+        SchemaStep("unique", "Artist", ("name",)),
+    ]),
+    # Songs are partitioned per playlist source.
+    (2, [
+        SchemaStep("drop_unique", "Song", ("title", "artist")),
+        SchemaStep("range_index", "Song", ("source",)),
+        SchemaStep("unique", "Song", ("source", "title", "artist")),
+        SchemaStep("unique", "PlaylistMeta", ("id",)),
+    ]),
+    (3, [
+        SchemaStep("unique", "SyncTarget", ("source",)),
+    ]),
+    # Playlist-independent track catalog; matches live on tracks.
+    (4, [
+        SchemaStep("unique", "Track", ("key",)),
+        SchemaStep("range_index", "Track", ("match_status",)),
+        SchemaStep("drop_range_index", "Song", ("match_status",)),
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_ALREADY_DONE = ("already indexed", "already exists", "already created")
+
+
+def _apply_step(graph, step: SchemaStep) -> None:
+    try:
+        if step.kind == "range_index":
+            graph.create_node_range_index(step.label, *step.properties)
+        elif step.kind == "unique":
+            # Also creates the range index the constraint requires.
+            graph.create_node_unique_constraint(step.label, *step.properties)
+        elif step.kind == "drop_range_index":
+            graph.drop_node_range_index(step.label, *step.properties)
+        elif step.kind == "drop_unique":
+            graph.drop_node_unique_constraint(step.label, *step.properties)
+        else:
+            raise ValueError(f"Unknown schema step: {step.kind}")
+    except Exception as exc:  # pylint: disable=broad-except
+        message = str(exc).lower()
+        if step.kind.startswith("drop_") or any(s in message for s in _ALREADY_DONE):
+            return
+        raise
+
+
+def get_schema_version(graph) -> int:
+    """Returns the applied schema version (0 for a fresh graph)."""
+    result = graph.query(GET_SCHEMA_VERSION)
+    return int(result.result_set[0][0]) if result.result_set else 0
+
+
+def ensure_schema(graph) -> int:
+    """Applies pending migrations and returns the resulting schema version."""
+    current = get_schema_version(graph)
+    for version, steps in MIGRATIONS:
+        if version <= current:
+            continue
+        for step in steps:
+            _apply_step(graph, step)
+        graph.query(SET_SCHEMA_VERSION, {"version": version})
+        current = version
+    return current
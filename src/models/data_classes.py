@@ -1,20 +1,51 @@
-"""Data models (dataclasses)."""
+"""Data models (dataclasses and records).
 
+Songs are created once per scraped or pending track, so the models carry no
+per-instance `__dict__`: the dataclasses are slotted (Python 3.10+) and
+`PendingSong` is a tuple.
+"""
+
+import sys
 from dataclasses import dataclass
+from typing import NamedTuple, Optional
+
+# `dataclass(slots=True)` needs Python 3.10; older versions keep a `__dict__`
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class SongInfo:
-    """Carries song information."""
+    """Carries song information.
+
+    `source` identifies the playlist the song was scraped from (e.g.
+    `playlist:<spotify id>`) and partitions songs in the graph.
+    """
 
     title: str
     artist: str
     album: str
-    index: int
+    index: int = 0
+    source: str = ""
+    duration_ms: int = 0
+    isrc: str = ""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class PlaylistSource:
-    """Carries the playlist name."""
+    """Carries the playlist name and its source identifier."""
 
     name: str
+    source: str = ""
+
+
+class PendingSong(NamedTuple):
+    """A unique track waiting to be matched.
+
+    Read from the graph (`track_id`) or queued while scraping (`track_key`).
+    """
+
+    title: str
+    artist: str
+    track_id: Optional[int] = None
+    duration_ms: int = 0
+    track_key: str = ""
@@ -0,0 +1,40 @@
+"""Text normalization helpers shared by caching and matching code."""
+
+import re
+import unicodedata
+
+# Tokens that do not change which recording a query refers to.
+_NOISE_PATTERNS = (
+    re.compile(r"\b(?:feat|ft|featuring)\b\.?"),
+    re.compile(r"\b(?:\d{4}\s+)?remaster(?:ed)?(?:\s+(?:version|\d{4}))*\b"),
+)
+_PUNCTUATION = re.compile(r"[^\w\s]|_")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Returns a canonical form of a search query.
+
+    The text is NFKC-normalized and casefolded; "feat."/"ft." markers,
+    "Remastered [year]" suffixes and punctuation are removed, and whitespace is
+    collapsed. `"Song - Remastered 2011 (feat. X) Artist"` and
+    `"song (ft. x) artist"` map to the same key.
+    """
+    if not text:
+        return ""
+    value = unicodedata.normalize("NFKC", str(text)).casefold()
+    for pattern in _NOISE_PATTERNS:
+        value = pattern.sub(" ", value)
+    value = _PUNCTUATION.sub(" ", value)
+    return _WHITESPACE.sub(" ", value).strip()
+
+
+def track_key(title: str, artist: str, isrc: str = "") -> str:
+    """Returns the identity of a recording across playlists.
+
+    The ISRC when known (`"isrc:USUM71703861"`), otherwise the normalized
+    title and artist (`"name:shape of you|ed sheeran"`).
+    """
+    if isrc and isrc.strip():
+        return f"isrc:{isrc.strip().upper()}"
+    return f"name:{normalize_query(title)}|{normalize_query(artist)}"
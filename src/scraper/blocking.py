@@ -0,0 +1,119 @@
+"""Request-blocking profiles for the Playwright crawl.
+
+A profile decides which browser requests are aborted before they leave the
+page. Only the HTML document, the web player's scripts and its API calls are
+needed to list tracks; images, fonts, analytics, ads and the audio/DRM
+bootstraps are not.
+
+`abort_request` is the `PLAYWRIGHT_ABORT_REQUEST` hook; it applies the
+active profile, selected with `set_active_profile` or the
+`SCRAPER_BLOCK_PROFILE` environment variable.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Tuple
+from urllib.parse import urlsplit
+
+# Hosts the web player needs to render the tracklist; never treated as third-party.
+FIRST_PARTY_DOMAINS = ("spotify.com", "scdn.co", "spotifycdn.com")
+
+# Never aborted, whatever the profile says.
+ESSENTIAL_PATTERNS = (re.compile(r"api-partner\.spotify\.com/pathfinder"),)
+
+TRACKING_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "googlesyndication.com", "googleadservices.com", "facebook.net", "facebook.com",
+    "hotjar.com", "sentry.io", "branch.io", "adsrvr.org", "demdex.net",
+    "omtrdc.net", "scorecardresearch.com", "cookielaw.org", "onetrust.com",
+)
+
+# Spotify's own event logging, playback, audio and DRM bootstraps.
+PLAYER_PATTERNS = (
+    r"gabo-receiver-service", r"/melody/", r"/event/", r"pixel",
+    r"audio-.*\.akamaized\.net", r"audio4?-fa\.scdn\.co", r"/storage-resolve/",
+    r"seektables", r"widevine", r"/license/", r"/playplay/", r"dealer\.spotify\.com",
+    r"/track-playback/", r"/connect-state/",
+)
+
+
+@dataclass(frozen=True)
+class BlockingProfile:
+    """Rules for aborting browser requests."""
+
+    name: str
+    resource_types: FrozenSet[str] = frozenset()
+    url_patterns: Tuple[str, ...] = ()
+    blocked_domains: Tuple[str, ...] = ()
+    block_third_party: bool = False
+    _compiled: Tuple["re.Pattern", ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "_compiled", tuple(re.compile(p, re.IGNORECASE) for p in self.url_patterns)
+        )
+
+    def should_abort(self, url: str, resource_type: str) -> bool:
+        """Whether a request for `url` of `resource_type` should be aborted."""
+        if resource_type == "document" or any(p.search(url) for p in ESSENTIAL_PATTERNS):
+            return False
+        if resource_type in self.resource_types:
+            return True
+
+        host = urlsplit(url).hostname or ""
+        if _matches_domain(host, self.blocked_domains):
+            return True
+        if self.block_third_party and host and not _matches_domain(host, FIRST_PARTY_DOMAINS):
+            return True
+        return any(p.search(url) for p in self._compiled)
+
+
+def _matches_domain(host: str, domains: Tuple[str, ...]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+_MEDIA = frozenset({"image", "font", "media"})
+
+PROFILES: Dict[str, BlockingProfile] = {
+    "none": BlockingProfile("none"),
+    # Previous behaviour: only heavy static assets.
+    "default": BlockingProfile("default", resource_types=_MEDIA),
+    "lean": BlockingProfile(
+        "lean",
+        resource_types=_MEDIA | {"manifest", "texttrack", "eventsource", "websocket"},
+        url_patterns=PLAYER_PATTERNS,
+        blocked_domains=TRACKING_DOMAINS,
+        block_third_party=True,
+    ),
+    # Also drops CSS; fastest, but row layout may differ from the real page.
+    "aggressive": BlockingProfile(
+        "aggressive",
+        resource_types=_MEDIA | {"manifest", "texttrack", "eventsource", "websocket",
+                                 "stylesheet", "other"},
+        url_patterns=PLAYER_PATTERNS,
+        blocked_domains=TRACKING_DOMAINS,
+        block_third_party=True,
+    ),
+}
+
+_active = {"profile": PROFILES.get(os.getenv("SCRAPER_BLOCK_PROFILE", "default"),
+                                   PROFILES["default"])}
+
+
+def set_active_profile(name: str) -> BlockingProfile:
+    """Selects the profile used by `abort_request`."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown blocking profile '{name}'. Choose from {sorted(PROFILES)}.")
+    _active["profile"] = PROFILES[name]
+    return _active["profile"]
+
+
+def get_active_profile() -> BlockingProfile:
+    """Returns the profile used by `abort_request`."""
+    return _active["profile"]
+
+
+def abort_request(request) -> bool:
+    """`PLAYWRIGHT_ABORT_REQUEST` hook applying the active profile."""
+    return _active["profile"].should_abort(request.url, request.resource_type)
@@ -1,13 +1,48 @@
-"""Scrapy pipeline: saves scraped items to FalkorDB."""
+"""Scrapy pipelines: save scraped items to FalkorDB and, optionally, match
+them against YouTube while the crawl is still running."""
 
-from typing import Any
+import time
+from typing import Any, Dict, List, Optional
 
-from src.db.falkordb_manager import db_manager
+from scrapy.exceptions import NotConfigured
+
+from src.db.falkordb_manager import FalkordbManager, db_manager
 from src.models.data_classes import PlaylistSource, SongInfo
+from src.telemetry.tracing import tracer
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+
+class FalkordbPipeline:
+    """Pipeline to process scraped items and save them to FalkorDB.
+
+    Songs are buffered and written with one `UNWIND` query per batch. A batch is
+    flushed when it reaches `FALKORDB_BATCH_SIZE` items, when
+    `FALKORDB_FLUSH_INTERVAL` seconds have passed since the last flush, and
+    when the spider closes.
+    """
 
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        manager: Optional[FalkordbManager] = None,
+    ) -> None:
+        self.manager = manager or db_manager
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
 
-class FalkordbPipeline:  # pylint: disable=too-few-public-methods
-    """Pipeline to process scraped items and save them to FalkorDB."""
+    @classmethod
+    def from_crawler(cls, crawler) -> "FalkordbPipeline":
+        """Reads batch settings from the crawler settings."""
+        settings = crawler.settings
+        return cls(
+            batch_size=settings.getint("FALKORDB_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+            flush_interval=settings.getfloat("FALKORDB_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL),
+        )
 
     def process_item(self, item: Any, _spider) -> Any:
         """Processes the item coming from the spider and saves it to FalkorDB.
@@ -15,9 +50,78 @@ class FalkordbPipeline:  # pylint: disable=too-few-public-methods
         The `_spider` parameter is provided by the Scrapy pipeline API but is unused here.
         """
         if isinstance(item, SongInfo):
-            db_manager.save_song_info(title=item.title, artist=item.artist, index=item.index)
+            self._buffer.append({
+                "title": item.title,
+                "artist": item.artist,
+                "album": item.album,
+                "duration_ms": item.duration_ms,
+                "isrc": item.isrc,
+                "index": item.index,
+                "source": item.source,
+            })
+            if (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self.flush()
 
         elif isinstance(item, PlaylistSource):
-            db_manager.save_playlist_name(item.name)
+            self.manager.save_playlist_name(item.name, source=item.source)
+
+        return item
+
+    def close_spider(self, _spider) -> None:
+        """Writes any buffered songs when the crawl ends."""
+        self.flush()
+
+    def flush(self) -> None:
+        """Sends buffered songs to FalkorDB in a single batch query."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        with tracer.span("store.flush"):
+            self.manager.save_songs_batch(rows)
+        tracer.count("store.songs", len(rows))
 
+
+class MatchQueuePipeline:
+    """Hands each scraped song to a background `StreamingMatcher`.
+
+    Runs after `FalkordbPipeline` and is only enabled with the
+    `MATCH_WHILE_SCRAPING` setting (`runner --match`). The crawl never waits
+    for a search; `close_spider` waits for the queue to drain.
+    """
+
+    def __init__(self, matcher) -> None:
+        self.matcher = matcher
+
+    @classmethod
+    def from_crawler(cls, crawler) -> "MatchQueuePipeline":
+        """Builds the matcher, or disables the pipeline unless `MATCH_WHILE_SCRAPING` is set."""
+        if not crawler.settings.getbool("MATCH_WHILE_SCRAPING"):
+            raise NotConfigured("MATCH_WHILE_SCRAPING is off")
+        # pylint: disable=import-outside-toplevel
+        from src.youtube.stream_matcher import StreamingMatcher
+        try:
+            return cls(StreamingMatcher.from_env())
+        except Exception as exc:  # pylint: disable=broad-except
+            raise NotConfigured(f"Matching while scraping is unavailable: {exc}") from exc
+
+    def open_spider(self, _spider) -> None:
+        """Starts the background matcher."""
+        self.matcher.start()
+
+    def process_item(self, item: Any, _spider) -> Any:
+        """Queues songs for matching; other items pass through."""
+        if isinstance(item, SongInfo):
+            self.matcher.submit(item.title, item.artist, item.duration_ms, item.isrc)
         return item
+
+    def close_spider(self, _spider) -> None:
+        """Waits for outstanding matches and prints a summary."""
+        stats = self.matcher.close()
+        print(
+            f"Matched {stats['matched']} tracks while scraping "
+            f"({stats['already_matched']} already matched, {stats['not_found']} not found)."
+        )
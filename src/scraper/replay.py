@@ -0,0 +1,197 @@
+"""Offline replay of recorded Spotify pages for the spider.
+
+A snapshot directory holds everything a playlist page needs to render without
+the network:
+
+- `manifest.json`: responses served from files, plus the tracks each playlist
+  is expected to yield (for recall):
+
+      {"entries": [{"url": "https://open.spotify.com/playlist/x",
+                    "path": "playlist_x.html", "content_type": "text/html"}],
+       "playlists": {"https://open.spotify.com/playlist/x": {
+           "tracks": [["Title", "Artist"], ...]}}}
+
+  `url` is a Playwright glob, so one entry can cover e.g. all cover images.
+- `*.har`: HAR files, e.g. recorded with `runner --har-dir`. They are replayed
+  by Playwright itself (`route_from_har`).
+
+`SnapshotStore.install(page)` routes a page to the snapshot. Manifest entries
+win over HAR entries, and any other request is aborted, so a replay never
+touches the network. `write_synthetic_snapshot` generates a self-contained
+page that imitates the web player's virtualized tracklist (same test ids and
+ARIA attributes). Scroll and extraction changes can then be benchmarked at
+any playlist size (see `benchmarks/bench_replay.py`).
+"""
+
+import glob
+import json
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+MANIFEST = "manifest.json"
+
+
+class SnapshotEntry(NamedTuple):
+    """One response served from a file."""
+
+    url: str
+    path: str
+    status: int = 200
+    content_type: str = "text/html; charset=utf-8"
+
+
+class SnapshotStore:
+    """Recorded responses of one snapshot directory."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        manifest: Dict[str, Any] = {}
+        manifest_path = os.path.join(root, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        self.entries = [SnapshotEntry(**entry) for entry in manifest.get("entries", [])]
+        self.playlists: Dict[str, Dict[str, Any]] = manifest.get("playlists", {})
+        self.har_paths = sorted(glob.glob(os.path.join(root, "*.har")))
+        self.served = 0
+        self.aborted: List[str] = []
+
+    def urls(self) -> List[str]:
+        """Playlist URLs the snapshot can replay."""
+        return list(self.playlists)
+
+    def expected_tracks(self, url: str) -> List[Tuple[str, str]]:
+        """`(title, artist)` of every track `url` should yield, in playlist order."""
+        return [tuple(track) for track in self.playlists.get(url, {}).get("tracks", [])]
+
+    def _body(self, entry: SnapshotEntry) -> bytes:
+        with open(os.path.join(self.root, entry.path), "rb") as handle:
+            return handle.read()
+
+    def _serve(self, entry: SnapshotEntry):
+        async def handler(route) -> None:
+            self.served += 1
+            await route.fulfill(status=entry.status, content_type=entry.content_type,
+                                body=self._body(entry))
+        return handler
+
+    async def _abort(self, route) -> None:
+        self.aborted.append(route.request.url)
+        await route.abort()
+
+    async def install(self, page) -> None:
+        """Routes `page` to the snapshot.
+
+        The last registered route is asked first, so registration runs from
+        the catch-all abort to the manifest entries.
+        """
+        await page.route("**/*", self._abort)
+        for har_path in self.har_paths:
+            await page.route_from_har(har_path, not_found="fallback")
+        for entry in self.entries:
+            await page.route(entry.url, self._serve(entry))
+
+
+def recall(found: Iterable[Tuple[str, str]], expected: Sequence[Tuple[str, str]]) -> float:
+    """Share of the expected `(title, artist)` pairs that were found (1.0 if none expected)."""
+    if not expected:
+        return 1.0
+    found_set = set(found)
+    return sum(1 for track in expected if track in found_set) / len(expected)
+
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} - playlist by {owner} | Spotify</title>
+<style>
+body {{ margin: 0; font: 14px sans-serif; }}
+div[role="row"] {{ position: absolute; left: 0; right: 0; height: {row_height}px; }}
+</style></head>
+<body><main>
+<div data-testid="entity-header"><h1>{title}</h1>
+<a data-testid="creator-link" href="/user/{owner}">{owner}</a>
+<span>{count} songs</span></div>
+<div data-testid="playlist-tracklist" aria-rowcount="{rowcount}">
+<div role="row" aria-rowindex="1"><div>#</div><div>Title</div></div>
+<div id="rows" style="position: relative; height: {height}px"></div>
+</div></main>
+<script>
+const TRACKS = {tracks};
+const ROW = {row_height}, WINDOW = {window}, DELAY = {render_delay_ms};
+const rows = document.getElementById('rows');
+let pending = null;
+function render() {{
+  pending = null;
+  const top = Math.max(0, window.scrollY - rows.offsetTop);
+  const first = Math.max(0, Math.floor(top / ROW) - 2);
+  const last = Math.min(TRACKS.length, first + WINDOW);
+  rows.textContent = '';
+  for (let i = first; i < last; i++) {{
+    const row = document.createElement('div');
+    row.setAttribute('role', 'row');
+    row.setAttribute('aria-rowindex', String(i + 2));
+    row.style.top = (i * ROW) + 'px';
+    const link = document.createElement('a');
+    link.dataset.testid = 'internal-track-link';
+    link.href = '/track/' + i;
+    link.textContent = TRACKS[i][0];
+    const artist = document.createElement('a');
+    artist.href = '/artist/' + encodeURIComponent(TRACKS[i][1]);
+    artist.textContent = TRACKS[i][1];
+    row.append(link, artist);
+    rows.append(row);
+  }}
+}}
+window.addEventListener('scroll', () => {{
+  if (pending === null) pending = setTimeout(render, DELAY);
+}});
+render();
+</script></body></html>
+"""
+
+
+def synthetic_tracks(count: int) -> List[Tuple[str, str]]:
+    """Deterministic `(title, artist)` pairs for a synthetic playlist."""
+    return [(f"Track {i + 1}", f"Artist {i % 97}") for i in range(count)]
+
+
+def write_synthetic_snapshot(
+    root: str,
+    url: str,
+    tracks: Sequence[Tuple[str, str]],
+    title: str = "Replay Playlist",
+    window: int = 30,
+    row_height: int = 56,
+    render_delay_ms: int = 0,
+) -> SnapshotStore:
+    """Writes a virtualized playlist page for `url` into `root` and returns its store.
+
+    - `window`: rows kept in the DOM at once (the web player keeps a few dozen).
+    - `render_delay_ms`: delay between a scroll and the re-render.
+
+    Calling it again for another URL adds that playlist to the manifest.
+    """
+    os.makedirs(root, exist_ok=True)
+    name = "".join(c if c.isalnum() else "_" for c in url.rsplit("/", 1)[-1]) or "index"
+    page_path = f"{name}.html"
+    html = _PAGE.format(
+        title=title, owner="replay", count=len(tracks), rowcount=len(tracks) + 1,
+        height=len(tracks) * row_height, row_height=row_height, window=window,
+        render_delay_ms=render_delay_ms,
+        # "</" must not close the inline script
+        tracks=json.dumps([list(t) for t in tracks]).replace("</", "<\\/"),
+    )
+    with open(os.path.join(root, page_path), "w", encoding="utf-8") as handle:
+        handle.write(html)
+
+    manifest_path = os.path.join(root, MANIFEST)
+    manifest: Dict[str, Any] = {"entries": [], "playlists": {}}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    manifest["entries"] = [e for e in manifest["entries"] if e["url"] != url]
+    manifest["entries"].append(SnapshotEntry(url, page_path)._asdict())
+    manifest["playlists"][url] = {"tracks": [list(t) for t in tracks]}
+    with open(manifest_path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle)
+    return SnapshotStore(root)
+
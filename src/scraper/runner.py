@@ -1,10 +1,70 @@
+"""Runs the Spotify spider for one or more playlists in a single CrawlerProcess.
+
+All playlists share one Playwright browser; each gets its own browser context.
+
+    python -m src.scraper.runner <url> [<url> ...] [--file urls.txt] [--concurrency 4] [--match]
+
+With `--replay DIR` pages are served from a snapshot directory (see
+src/scraper/replay.py) instead of the network; without URLs every playlist in
+the snapshot's manifest is scraped.
+"""
+
+import argparse
 import sys
 import os
 import warnings
 import logging
 from scrapy.crawler import CrawlerProcess
 from scrapy.utils.log import configure_logging
+from src.scraper.blocking import PROFILES, set_active_profile
+from src.scraper.replay import SnapshotStore
 from src.scraper.spotify_spider import SpotifyPlaylistSpider
+from src.telemetry.tracing import write_env_report
+
+def parse_args(argv):
+    """Parses runner command-line arguments."""
+    parser = argparse.ArgumentParser(prog="python -m src.scraper.runner")
+    parser.add_argument("urls", nargs="*", help="Spotify playlist/album URLs")
+    parser.add_argument("--file", help="Text file with one URL per line")
+    parser.add_argument(
+        "--concurrency", type=int, default=int(os.getenv("SCRAPER_CONCURRENCY", "4")),
+        help="Playlists rendered at the same time (CONCURRENT_REQUESTS)",
+    )
+    parser.add_argument(
+        "--mode", choices=["dom", "network"], default=os.getenv("SCRAPER_MODE", "dom"),
+        help="'network' reads Spotify's JSON API responses, falling back to the DOM",
+    )
+    parser.add_argument(
+        "--block-profile", choices=sorted(PROFILES),
+        default=os.getenv("SCRAPER_BLOCK_PROFILE", "default"),
+        help="Which requests the browser aborts (see src/scraper/blocking.py)",
+    )
+    parser.add_argument(
+        "--user-data-dir",
+        help="Share one persistent browser context (warm HTTP cache) stored here",
+    )
+    parser.add_argument("--har-dir", help="Record one HAR file per playlist into this directory")
+    parser.add_argument(
+        "--replay", default=os.getenv("SCRAPER_REPLAY_DIR"),
+        help="Serve pages from this snapshot directory instead of the network",
+    )
+    parser.add_argument("--metrics", help="Write per-playlist page metrics to this JSON file")
+    parser.add_argument(
+        "--match", action="store_true",
+        default=os.getenv("MATCH_WHILE_SCRAPING", "").lower() in ("1", "true", "yes"),
+        help="Match songs against YouTube while the crawl is still running",
+    )
+    return parser.parse_args(argv)
+
+def collect_urls(urls, path=None):
+    """Merges URLs from arguments and an optional file, dropping duplicates."""
+    collected = list(urls)
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            collected.extend(
+                line.strip() for line in handle if line.strip() and not line.startswith("#")
+            )
+    return list(dict.fromkeys(collected))
 
 def main():
     """Main entry point for the spider runner."""
@@ -14,12 +74,14 @@ def main():
     logging.getLogger('filelock').setLevel(logging.ERROR)
     logging.getLogger('hpack').setLevel(logging.ERROR)
 
-    if len(sys.argv) < 2:
-        print("Usage: python -m src.scraper.runner <playlist_url>")
+    args = parse_args(sys.argv[1:])
+    playlist_urls = collect_urls(args.urls, args.file)
+    if args.replay and not playlist_urls:
+        playlist_urls = SnapshotStore(args.replay).urls()
+    if not playlist_urls:
+        print("Usage: python -m src.scraper.runner <playlist_url> [...] [--file urls.txt]")
         sys.exit(2)
 
-    playlist_url = sys.argv[1]
-
     settings = {
         "DOWNLOAD_HANDLERS": {
             "http": "scrapy_playwright.handler.ScrapyPlaywrightDownloadHandler",
@@ -29,18 +91,37 @@ def main():
         "PLAYWRIGHT_BROWSER_TYPE": "chromium",
         "PLAYWRIGHT_LAUNCH_OPTIONS": {"headless": True},
         "LOG_LEVEL": "ERROR", # Show only errors
+        "CONCURRENT_REQUESTS": args.concurrency,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": args.concurrency,
+        "PLAYWRIGHT_MAX_CONTEXTS": args.concurrency,
+        "MATCH_WHILE_SCRAPING": args.match,
     }
 
+    set_active_profile(args.block_profile)
+    if args.har_dir:
+        os.makedirs(args.har_dir, exist_ok=True)
+
     configure_logging(settings=settings)
     process = CrawlerProcess(settings=settings)
 
     try:
-        process.crawl(SpotifyPlaylistSpider, playlist_url=playlist_url)
+        process.crawl(
+            SpotifyPlaylistSpider,
+            playlist_urls=playlist_urls,
+            scrape_mode=args.mode,
+            user_data_dir=args.user_data_dir,
+            har_dir=args.har_dir,
+            replay_dir=args.replay,
+            metrics_path=args.metrics,
+        )
         process.start()
     except Exception as exc: # pylint: disable=broad-exception-caught
         print(f"Spider failed: {exc}")
+        write_env_report()
         sys.exit(1)
 
+    # TRACE_REPORT: per-phase timings of this crawl (os._exit skips atexit)
+    write_env_report()
     # Force exit to prevent async loop hangs on Windows
     os._exit(0)
 
@@ -0,0 +1,150 @@
+"""Parsing helpers for the Spotify web player's pathfinder (GraphQL) responses.
+
+The web player loads playlist and album tracks from
+`api-partner.spotify.com/pathfinder/...` in pages of `offset`/`limit`. Reading
+those JSON payloads gives album, duration and (when present) ISRC data that the
+rendered DOM does not show. These helpers are pure functions so they can be
+tested against recorded fixtures.
+"""
+
+import json
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+PATHFINDER_HOST = "api-partner.spotify.com"
+TRACK_LIST_OPERATIONS = (
+    "fetchPlaylist",
+    "fetchPlaylistContents",
+    "fetchPlaylistWithGatedEntityRelations",
+    "getAlbum",
+    "queryAlbumTracks",
+)
+
+
+class TrackRow(NamedTuple):
+    """One track of a pathfinder response; `position` is its 1-based playlist position."""
+
+    title: str
+    artist: str
+    album: str
+    duration_ms: int
+    isrc: str
+    position: int
+
+
+class TrackPage(NamedTuple):
+    """Tracks parsed from one pathfinder response."""
+
+    tracks: List[TrackRow]
+    offset: int
+    limit: int
+    total: int
+
+
+def operation_name(url: str, post_data: Optional[str] = None) -> str:
+    """Returns the GraphQL operation name of a pathfinder request ("" if unknown)."""
+    query = parse_qs(urlsplit(url).query)
+    if "operationName" in query:
+        return query["operationName"][0]
+    if post_data:
+        try:
+            return json.loads(post_data).get("operationName", "")
+        except (ValueError, AttributeError):
+            return ""
+    return ""
+
+
+def is_track_list_request(url: str, post_data: Optional[str] = None) -> bool:
+    """Whether a request fetches a page of playlist or album tracks."""
+    return PATHFINDER_HOST in url and operation_name(url, post_data) in TRACK_LIST_OPERATIONS
+
+
+def _artist_names(artists: Optional[Dict[str, Any]]) -> str:
+    items = (artists or {}).get("items") or []
+    names = [(a.get("profile") or {}).get("name", "") for a in items]
+    return ", ".join(n for n in names if n) or "Unknown"
+
+
+def _isrc(track: Dict[str, Any]) -> str:
+    external = track.get("externalIds") or {}
+    if isinstance(external, dict):
+        if external.get("isrc"):
+            return external["isrc"]
+        for item in external.get("items") or []:
+            if str(item.get("type", "")).lower() == "isrc":
+                return item.get("id", "")
+    return track.get("isrc", "") or ""
+
+
+def _duration(track: Dict[str, Any]) -> int:
+    duration = track.get("trackDuration") or track.get("duration") or {}
+    return int(duration.get("totalMilliseconds") or 0)
+
+
+def _track_row(track: Dict[str, Any], position: int, album: str) -> Optional[TrackRow]:
+    if not track or track.get("__typename", "Track") != "Track" or not track.get("name"):
+        return None
+    album_name = (track.get("albumOfTrack") or {}).get("name") or album
+    return TrackRow(
+        title=track["name"],
+        artist=_artist_names(track.get("artists")),
+        album=album_name,
+        duration_ms=_duration(track),
+        isrc=_isrc(track),
+        position=position,
+    )
+
+
+def parse_track_page(payload: Dict[str, Any]) -> Optional[TrackPage]:
+    """Parses a playlist or album pathfinder payload into a `TrackPage`.
+
+    Returns None when the payload holds no track list. Each row's `position`
+    is its 1-based playlist position (`offset + position in page + 1`).
+    """
+    data = (payload or {}).get("data") or {}
+
+    if data.get("playlistV2"):
+        content = data["playlistV2"].get("content") or {}
+        items = content.get("items") or []
+        tracks_of = [((item.get("itemV2") or {}).get("data") or {}) for item in items]
+        album = ""
+    elif data.get("albumUnion"):
+        album_union = data["albumUnion"]
+        content = album_union.get("tracksV2") or album_union.get("tracks") or {}
+        items = content.get("items") or []
+        tracks_of = [item.get("track") or {} for item in items]
+        album = album_union.get("name", "")
+    else:
+        return None
+
+    paging = content.get("pagingInfo") or {}
+    offset = int(paging.get("offset") or 0)
+    limit = int(paging.get("limit") or len(items))
+    total = int(content.get("totalCount") or len(items))
+
+    tracks = []
+    for i, track in enumerate(tracks_of):
+        row = _track_row(track, offset + i + 1, album)
+        if row:
+            tracks.append(row)
+    return TrackPage(tracks=tracks, offset=offset, limit=limit, total=total)
+
+
+def with_offset(url: str, post_data: Optional[str], offset: int, limit: int):
+    """Returns `(url, post_data)` of a track-list request rewritten for another page.
+
+    GET requests carry the variables JSON in the `variables` query parameter,
+    POST requests in the JSON body.
+    """
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if "variables" in query:
+        variables = json.loads(query["variables"][0])
+        variables.update(offset=offset, limit=limit)
+        query["variables"] = [json.dumps(variables, separators=(",", ":"))]
+        url = urlunsplit(parts._replace(query=urlencode(query, doseq=True)))
+    elif post_data:
+        body = json.loads(post_data)
+        body.setdefault("variables", {}).update(offset=offset, limit=limit)
+        post_data = json.dumps(body, separators=(",", ":"))
+    return url, post_data
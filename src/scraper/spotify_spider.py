@@ -1,7 +1,36 @@
 import asyncio
+import json
+import os
+import re
+import time
+from typing import Any, Dict, NamedTuple, Optional
 import scrapy
 from scrapy_playwright.page import PageMethod
 from src.models.data_classes import SongInfo, PlaylistSource
+from src.scraper.replay import SnapshotStore
+from src.scraper.spotify_api import TrackRow, is_track_list_request, parse_track_page, with_offset
+from src.telemetry.tracing import tracer
+
+_SOURCE_RE = re.compile(r"/(playlist|album)/([A-Za-z0-9]+)")
+
+
+def playlist_source_id(url):
+    """Returns a stable source id such as `playlist:<id>` for a Spotify URL."""
+    match = _SOURCE_RE.search(url or "")
+    if match:
+        return f"{match.group(1)}:{match.group(2)}"
+    return url or ""
+
+
+class CapturedResponse(NamedTuple):
+    """A pathfinder track-list response recorded from the page."""
+
+    url: str
+    method: str
+    headers: Dict[str, str]
+    post_data: Optional[str]
+    payload: Dict[str, Any]
+
 
 class SpotifyPlaylistSpider(scrapy.Spider):
     name = 'spotify_spider'
@@ -10,37 +39,97 @@ class SpotifyPlaylistSpider(scrapy.Spider):
         'ROBOTSTXT_OBEY': False,
         'DOWNLOAD_DELAY': 1,
         'LOG_LEVEL': 'ERROR',
-        'PLAYWRIGHT_ABORT_REQUEST': lambda req: req.resource_type in ["image", "font", "media"],
+        # Blocking rules come from the active profile (see src/scraper/blocking.py)
+        'PLAYWRIGHT_ABORT_REQUEST': 'src.scraper.blocking.abort_request',
         'ITEM_PIPELINES': {
             'src.scraper.pipelines.FalkordbPipeline': 300,
+            # Disabled unless MATCH_WHILE_SCRAPING is set (runner --match)
+            'src.scraper.pipelines.MatchQueuePipeline': 400,
         },
     }
 
+    # Scroll tuning; can be overridden with spider arguments (-a scroll_delay_ms=200)
+    scroll_delay_ms = 300
+    max_stale_scrolls = 3
+    max_scroll_steps = 2000
+    # "dom" renders and scrapes rows; "network" reads the web player's
+    # pathfinder JSON responses and falls back to the DOM if none arrive.
+    scrape_mode = "dom"
+    network_wait_seconds = 5
+    # Optional: reuse one persistent context (warm HTTP cache) and/or record HARs
+    user_data_dir = None
+    har_dir = None
+    # Optional snapshot directory served instead of the network (see src/scraper/replay.py)
+    replay_dir = None
+    # Optional JSON file receiving per-playlist page metrics when the crawl ends
+    metrics_path = None
+
+    def __init__(self, *args, playlist_urls=None, playlist_url=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._captured = {}
+        self._traffic = {}
+        self.page_metrics = {}
+        self._replay_store = None
+        if isinstance(playlist_urls, str):
+            playlist_urls = [u for u in playlist_urls.split(",") if u.strip()]
+        self.playlist_urls = [u.strip() for u in (playlist_urls or [])]
+        if playlist_url:
+            self.playlist_urls.append(playlist_url.strip())
+
     def start_requests(self):
-        url = getattr(self, 'playlist_url', None)
-        if url:
-            yield scrapy.Request(
-                url=url,
-                callback=self.parse,
-                meta={
-                    'playwright': True,
-                    'playwright_include_page': True,
-                    'playwright_context_kwargs': {
-                        'viewport': {'width': 1280, 'height': 800},
-                        'java_script_enabled': True,
-                        'ignore_https_errors': True,
-                    },
-                    'playwright_page_methods': [
-                        PageMethod(
-                            "add_init_script",
-                            script=(
-                                "Object.defineProperty(navigator, 'webdriver', "
-                                "{get: () => undefined})"
-                            )
-                        ),
-                    ],
-                }
-            )
+        for i, url in enumerate(self.playlist_urls):
+            handlers = {'requestfinished': '_on_request_finished'}
+            if self.scrape_mode == "network":
+                handlers['response'] = '_on_response'
+            meta = {
+                'playwright': True,
+                'playwright_include_page': True,
+                **self._context_meta(i, url),
+                'playwright_page_event_handlers': handlers,
+                'playwright_page_methods': [
+                    PageMethod(
+                        "add_init_script",
+                        script=(
+                            "Object.defineProperty(navigator, 'webdriver', "
+                            "{get: () => undefined})"
+                        )
+                    ),
+                ],
+            }
+            if self.replay_dir:
+                # Runs before navigation, after scrapy-playwright's own route
+                meta['playwright_page_init_callback'] = self._install_replay
+            yield scrapy.Request(url=url, callback=self.parse, dont_filter=True, meta=meta)
+
+    async def _install_replay(self, page, _request):
+        """Serves `page` from the `replay_dir` snapshot instead of the network."""
+        if self._replay_store is None:
+            self._replay_store = SnapshotStore(self.replay_dir)
+        await self._replay_store.install(page)
+
+    def _context_meta(self, i, url):
+        """Browser context name and options for the i-th playlist.
+
+        By default every playlist gets its own isolated context. With
+        `user_data_dir` all playlists share one persistent context so the HTTP
+        cache stays warm across playlists and runs.
+        """
+        context_kwargs = {
+            'viewport': {'width': 1280, 'height': 800},
+            'java_script_enabled': True,
+            'ignore_https_errors': True,
+        }
+        if self.user_data_dir:
+            context_kwargs['user_data_dir'] = self.user_data_dir
+            return {'playwright_context': "persistent",
+                    'playwright_context_kwargs': context_kwargs}
+
+        if self.har_dir:
+            name = re.sub(r"[^A-Za-z0-9_-]", "_", playlist_source_id(url))
+            context_kwargs['record_har_path'] = os.path.join(self.har_dir, f"{name}.har")
+        # One browser, one isolated context per playlist
+        return {'playwright_context': f"playlist-{i}",
+                'playwright_context_kwargs': context_kwargs}
 
     async def parse(self, response):
         """Parses the Spotify playlist page."""
@@ -48,42 +137,196 @@ class SpotifyPlaylistSpider(scrapy.Spider):
 
         # Check URL: Album or Playlist?
         is_album = "/album/" in response.url
+        source = playlist_source_id(response.url)
 
-        playlist_title, default_artist = await self._extract_playlist_info(page)
+        started = time.monotonic()
+        with tracer.span("scrape.playlist_info"):
+            playlist_title, default_artist = await self._extract_playlist_info(page)
+        with tracer.span("scrape.wait_tracklist"):
+            time_to_tracklist = await self._time_to_tracklist(page)
 
         print(f"📘 PLAYLIST NAME: {playlist_title}")
         if is_album and default_artist != "Unknown":
             print(f"🎤 ALBUM ARTIST: {default_artist}")
 
-        yield PlaylistSource(name=playlist_title)
-
-        await self._scroll_page(page)
-
-        songs_data = await self._extract_songs_js(page, default_artist, is_album)
+        yield PlaylistSource(name=playlist_title, source=source)
 
         count = 0
-        seen = set()
+        if self.scrape_mode == "network":
+            async for song in self._stream_network_songs(page, source):
+                count += 1
+                print(f"🎵 Song Found: {song.title} - {song.artist}")
+                yield song
 
-        for i, s in enumerate(songs_data, start=1):
-            key = f"{s['title']}-{s['artist']}"
-            if key not in seen:
-                seen.add(key)
+        if count == 0:
+            async for song in self._stream_songs(page, default_artist, is_album, source):
                 count += 1
-                print(f"🎵 Song Found: {s['title']} - {s['artist']}")
-                yield SongInfo(title=s['title'], artist=s['artist'], album="", index=i)
+                print(f"🎵 Song Found: {song.title} - {song.artist}")
+                yield song
 
         if count == 0:
-            async for item in self._fallback_parse(page):
+            async for item in self._fallback_parse(page, source):
                 yield item
                 count += 1
 
         print(f"✅ TOTAL {count} SONGS SCRAPED.")
+        self._record_metrics(page, source, count, time_to_tracklist, time.monotonic() - started)
         try:
-            # Try to close page, but don't force if stuck (2 second timeout)
+            # Try to close page (and its context unless it is the shared persistent one),
+            # but don't force if stuck (2 second timeout)
             await asyncio.wait_for(page.close(), timeout=2.0)
+            if not self.user_data_dir:
+                await asyncio.wait_for(page.context.close(), timeout=2.0)
         except (asyncio.TimeoutError, Exception): # pylint: disable=broad-exception-caught
             pass
 
+    def closed(self, _reason):
+        """Writes collected page metrics to `metrics_path`, if set."""
+        if self.metrics_path:
+            with open(self.metrics_path, "w", encoding="utf-8") as handle:
+                json.dump(self.page_metrics, handle, indent=2)
+
+    async def _on_request_finished(self, request):
+        """Accumulates request counts and transferred bytes per page."""
+        try:
+            sizes = await request.sizes()
+            traffic = self._traffic.setdefault(request.frame.page, {"requests": 0, "bytes": 0})
+            traffic["requests"] += 1
+            traffic["bytes"] += (
+                sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+            )
+        except Exception: # pylint: disable=broad-exception-caught
+            pass
+
+    async def _time_to_tracklist(self, page):
+        """Milliseconds from navigation start until the first track row rendered."""
+        try:
+            await page.wait_for_selector(
+                'div[role="row"], div[data-testid="tracklist-row"]', timeout=10000
+            )
+            return round(await page.evaluate("() => performance.now()"), 1)
+        except Exception: # pylint: disable=broad-exception-caught
+            return None
+
+    def _record_metrics(self, page, source, count, time_to_tracklist, parse_seconds):
+        """Stores per-page timing/traffic metrics and reports them."""
+        traffic = self._traffic.pop(page, {"requests": 0, "bytes": 0})
+        metrics = {
+            "songs": count,
+            "time_to_tracklist_ms": time_to_tracklist,
+            "parse_seconds": round(parse_seconds, 3),
+            "requests": traffic["requests"],
+            "bytes": traffic["bytes"],
+        }
+        self.page_metrics[source] = metrics
+        tracer.observe("scrape.page", parse_seconds, nbytes=traffic["bytes"])
+        tracer.count("scrape.songs", count)
+        tracer.count("scrape.requests", traffic["requests"])
+        crawler = getattr(self, "crawler", None)
+        if crawler is not None and crawler.stats is not None:
+            for key, value in metrics.items():
+                if value is not None:
+                    crawler.stats.set_value(f"spotify/{source}/{key}", value)
+        print(
+            f"⏱️ {source}: tracklist after {time_to_tracklist} ms, "
+            f"{traffic['requests']} requests, {traffic['bytes'] / 1024:.0f} KiB"
+        )
+
+    async def _on_response(self, response):
+        """Records pathfinder track-list responses for the page that made them."""
+        request = response.request
+        try:
+            post_data = request.post_data
+            if not is_track_list_request(request.url, post_data):
+                return
+            captured = CapturedResponse(
+                url=request.url,
+                method=request.method,
+                headers=await request.all_headers(),
+                post_data=post_data,
+                payload=await response.json(),
+            )
+            self._captured.setdefault(response.frame.page, []).append(captured)
+        except Exception: # pylint: disable=broad-exception-caught
+            pass
+
+    async def _stream_network_songs(self, page, source):
+        """Yields songs parsed from intercepted pathfinder responses.
+
+        Pages missing after the initial load are fetched by replaying the
+        captured request with a new offset; if replaying fails, scrolling is
+        used to make the web player request them itself.
+        """
+        captured = self._captured.setdefault(page, [])
+        for _ in range(int(float(self.network_wait_seconds) * 4)):
+            if captured:
+                break
+            await asyncio.sleep(0.25)
+
+        harvested = set()
+        consumed = 0
+        stale = 0
+        template, limit, total = None, 0, 0
+
+        while consumed < len(captured) or (total and len(harvested) < total):
+            if consumed < len(captured):
+                response = captured[consumed]
+                consumed += 1
+                track_page = parse_track_page(response.payload)
+                if track_page is None:
+                    continue
+                template = template or response
+                limit = limit or track_page.limit
+                total = max(total, track_page.total)
+                for song in self._harvest(track_page.tracks, harvested, source):
+                    yield song
+                continue
+
+            next_offset = self._next_missing_offset(harvested, limit, total)
+            track_page = await self._replay(page, template, next_offset, limit)
+            if track_page is not None and track_page.tracks:
+                new_songs = self._harvest(track_page.tracks, harvested, source)
+                for song in new_songs:
+                    yield song
+                if new_songs:
+                    continue
+
+            # Replaying failed: let the web player fetch the next page.
+            before = len(captured)
+            await self._scroll_page(page)
+            stale = 0 if len(captured) > before else stale + 1
+            if stale >= int(self.max_stale_scrolls):
+                break
+
+        self._captured.pop(page, None)
+
+    @staticmethod
+    def _next_missing_offset(harvested, limit, total):
+        """Returns the offset of the first page containing an unharvested index."""
+        limit = max(limit, 1)
+        for index in range(1, total + 1):
+            if index not in harvested:
+                return ((index - 1) // limit) * limit
+        return total
+
+    async def _replay(self, page, template, offset, limit):
+        """Re-issues a captured track-list request for another offset."""
+        if template is None:
+            return None
+        url, data = with_offset(template.url, template.post_data, offset, limit)
+        headers = {k: v for k, v in template.headers.items() if not k.startswith(':')}
+        try:
+            with tracer.span("scrape.replay"):
+                response = await page.request.fetch(
+                    url, method=template.method, headers=headers, data=data
+                )
+                if not response.ok:
+                    return None
+                payload = await response.json()
+            return parse_track_page(payload)
+        except Exception: # pylint: disable=broad-exception-caught
+            return None
+
     async def _extract_playlist_info(self, page):
         """Extracts playlist title and default artist."""
         playlist_title = "Spotify Playlist"
@@ -136,20 +379,101 @@ class SpotifyPlaylistSpider(scrapy.Spider):
 
         return "Unknown"
 
-    async def _scroll_page(self, page):
-        """Scrolls the page to load lazy content."""
+    async def _stream_songs(self, page, default_artist, is_album, source):
+        """Harvests the virtualized tracklist while scrolling, yielding songs as found.
+
+        Spotify only keeps the rows near the viewport in the DOM, so rows are
+        collected after every scroll step, keyed by `aria-rowindex`. Scrolling
+        stops once the declared track count is reached or the list stops
+        growing for `max_stale_scrolls` steps.
+        """
+        expected = await self._declared_track_count(page)
+        harvested = set()
+        stale = 0
+
+        for _ in range(int(self.max_scroll_steps)):
+            with tracer.span("scrape.extract_rows"):
+                rows = await self._extract_songs_js(page, default_artist, is_album)
+            new_songs = self._harvest(rows, harvested, source)
+            for song in new_songs:
+                yield song
+
+            if expected and len(harvested) >= expected:
+                break
+            stale = 0 if new_songs else stale + 1
+            if stale >= int(self.max_stale_scrolls):
+                break
+            await self._scroll_page(page)
+
+    @staticmethod
+    def _harvest(rows, harvested, source):
+        """Returns `SongInfo`s for rows not seen before and records their keys.
+
+        DOM rows are `[title, artist, aria-rowindex]` arrays. They are keyed by
+        the row index (the header row is 1, so the first track gets index 1);
+        rows without one fall back to a title/artist key and the next free
+        index. Network rows are `TrackRow`s keyed by their `position`.
+        """
+        songs = []
+        for row in rows:
+            if isinstance(row, TrackRow):
+                # Network rows already carry their 1-based playlist position
+                if row.position in harvested:
+                    continue
+                harvested.add(row.position)
+                songs.append(SongInfo(row.title, row.artist, row.album, row.position, source,
+                                      row.duration_ms, row.isrc))
+                continue
+            title, artist, row_index = row
+            key = row_index if row_index is not None else f"{title}-{artist}"
+            if key in harvested:
+                continue
+            index = row_index - 1 if row_index is not None else len(harvested) + 1
+            harvested.add(key)
+            songs.append(SongInfo(title, artist, "", index, source))
+        return songs
+
+    async def _declared_track_count(self, page):
+        """Returns the track count declared by the page header (0 if unknown)."""
         try:
-            await page.evaluate("""async () => {
-                for (let i = 0; i < 10; i++) {
-                    window.scrollBy(0, document.body.scrollHeight);
-                    await new Promise(resolve => setTimeout(resolve, 500));
-                }
+            return await page.evaluate("""() => {
+                const grid = document.querySelector(
+                    'div[data-testid="playlist-tracklist"], div[data-testid="album-tracklist"]'
+                );
+                const rowCount = parseInt(grid ? grid.getAttribute('aria-rowcount') || '' : '', 10);
+                if (!isNaN(rowCount) && rowCount > 1) return rowCount - 1;
+
+                const header = document.querySelector('div[data-testid="entity-header"]')
+                    || document.querySelector('main') || document.body;
+                const match = (header.innerText || '').match(/([\\d.,]+)\\s+(songs|song|şarkı)/i);
+                return match ? parseInt(match[1].replace(/[.,]/g, ''), 10) : 0;
             }""")
+        except Exception: # pylint: disable=broad-exception-caught
+            return 0
+
+    async def _scroll_page(self, page):
+        """Scrolls one step so the next rows of the virtualized list render."""
+        try:
+            with tracer.span("scrape.scroll"):
+                await page.evaluate("""async (delay) => {
+                    const rows = document.querySelectorAll(
+                        'div[role="row"], div[data-testid="tracklist-row"]'
+                    );
+                    if (rows.length > 0) {
+                        rows[rows.length - 1].scrollIntoView({block: 'start'});
+                    } else {
+                        window.scrollBy(0, window.innerHeight);
+                    }
+                    await new Promise(resolve => setTimeout(resolve, delay));
+                }""", int(self.scroll_delay_ms))
         except Exception: # pylint: disable=broad-exception-caught
             pass
 
     async def _extract_songs_js(self, page, default_artist, is_album):
-        """Extracts songs using JavaScript execution."""
+        """Extracts the currently rendered song rows using JavaScript execution.
+
+        Returns one `[title, artist, aria-rowindex or None]` array per row.
+        """
         return await page.evaluate("""({default_artist, is_album}) => {
             // 1. Scope Definition: Get songs only from the main list
             let container = document.querySelector('div[data-testid="playlist-tracklist"]');
@@ -230,12 +554,14 @@ class SpotifyPlaylistSpider(scrapy.Spider):
 
                 if (!artist) artist = "Unknown";
 
-                return { title, artist };
-            }).filter(item => item !== null && item.title);
+                // Arrays, not objects: no per-row dict on the Python side
+                const rowIndex = parseInt(row.getAttribute('aria-rowindex') || '', 10);
+                return [title, artist, isNaN(rowIndex) ? null : rowIndex];
+            }).filter(item => item !== null);
 
         }""", {'default_artist': default_artist, 'is_album': is_album})
 
-    async def _fallback_parse(self, page):
+    async def _fallback_parse(self, page, source=""):
         """Fallback parsing using meta tags."""
         try:
             meta_urls = await page.evaluate("""() => {
@@ -258,6 +584,6 @@ class SpotifyPlaylistSpider(scrapy.Spider):
                         t = data.get('title', 'Unknown')
                         a = data.get('author_name', 'Unknown')
                         print(f"🎵 Song Found: {t} - {a}")
-                        yield SongInfo(title=t, artist=a, album="", index=i)
+                        yield SongInfo(title=t, artist=a, album="", index=i, source=source)
         except Exception: # pylint: disable=broad-exception-caught
             pass
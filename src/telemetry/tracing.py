@@ -0,0 +1,258 @@
+"""Lightweight tracing: timed spans, counters and per-run latency histograms.
+
+Hot paths wrap their work in `tracer.span(name, label)`:
+
+    with tracer.span("db.query", "save_songs"):
+        ...
+
+While tracing is disabled (the default) `span` returns a shared no-op object,
+so an instrumented call costs one attribute check. Enabled, every span
+records its duration (and optional byte count) into a histogram per
+`(name, label)`. `report()` summarizes them as call counts, errors, totals
+and p50/p95/p99. The result can be written as JSON (`write_report`) or in the
+Prometheus text format (`prometheus`, `write_prometheus`).
+
+Tracing is enabled by `TRACE_REPORT=<file>` (the report is written there by
+the command that enabled it) or by `sync_cli.py --trace <file>`.
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Samples kept per histogram; beyond this a uniform reservoir sample is kept.
+MAX_SAMPLES = 10_000
+
+Key = Tuple[str, str]
+
+
+class _Histogram:
+    """Durations of one span name/label pair."""
+
+    __slots__ = ("count", "errors", "total", "max", "bytes", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes = 0
+        self.samples: List[float] = []
+
+    def add(self, seconds: float, nbytes: int, error: bool, rng: random.Random) -> None:
+        self.count += 1
+        self.errors += int(error)
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.bytes += nbytes
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = rng.randrange(self.count)
+            if slot < MAX_SAMPLES:
+                self.samples[slot] = seconds
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_s": round(self.total, 6),
+            "p50_ms": round(_percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "bytes": self.bytes,
+        }
+
+
+def _label_value(value: str) -> str:
+    """Escapes a Prometheus label value (backslash, double quote, newline)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples (0 when empty)."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(q * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class _NoopSpan:
+    """Span returned while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        pass
+
+    def add_bytes(self, nbytes: int) -> None:
+        """Ignored."""
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """Times a block and records it on exit; exceptions count as errors."""
+
+    __slots__ = ("_tracer", "_key", "_start", "bytes")
+
+    def __init__(self, tracer: "Tracer", key: Key) -> None:
+        self._tracer = tracer
+        self._key = key
+        self._start = 0.0
+        self.bytes = 0
+
+    def __enter__(self) -> "Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb) -> None:
+        self._tracer.record(self._key, time.perf_counter() - self._start, self.bytes,
+                            exc_type is not None)
+
+    def add_bytes(self, nbytes: int) -> None:
+        """Adds transferred bytes to the span."""
+        self.bytes += nbytes
+
+
+class Tracer:
+    """Thread-safe collector of span histograms and counters."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+        self._histograms: Dict[Key, _Histogram] = {}
+        self._counters: Dict[Key, float] = {}
+        self._started = time.time()
+
+    def enable(self) -> None:
+        """Starts recording (keeps anything recorded so far)."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stops recording."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Drops all recorded data."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._started = time.time()
+
+    def span(self, name: str, label: str = ""):
+        """Returns a context manager timing one `name`/`label` operation."""
+        if not self.enabled:
+            return _NOOP
+        return Span(self, (name, label))
+
+    def record(self, key: Key, seconds: float, nbytes: int = 0, error: bool = False) -> None:
+        """Adds one timed operation to the histogram of `key`."""
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.add(seconds, nbytes, error, self._rng)
+
+    def observe(self, name: str, seconds: float, label: str = "", nbytes: int = 0) -> None:
+        """Records an operation timed elsewhere (no-op while disabled)."""
+        if self.enabled:
+            self.record((name, label), seconds, nbytes)
+
+    def count(self, name: str, value: float = 1, label: str = "") -> None:
+        """Increments a counter (no-op while disabled)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (name, label)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @staticmethod
+    def _name(key: Key) -> str:
+        return f"{key[0]}[{key[1]}]" if key[1] else key[0]
+
+    def report(self) -> Dict[str, Any]:
+        """Returns every span's summary and every counter, keyed `name[label]`."""
+        with self._lock:
+            spans = {self._name(k): h.summary() for k, h in sorted(self._histograms.items())}
+            counters = {self._name(k): v for k, v in sorted(self._counters.items())}
+        return {
+            "started_at": self._started,
+            "wall_s": round(time.time() - self._started, 3),
+            "spans": spans,
+            "counters": counters,
+        }
+
+    def write_report(self, path: str) -> None:
+        """Writes `report()` as JSON."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.report(), handle, indent=2)
+
+    def prometheus(self, prefix: str = "spotify_sync") -> str:
+        """Renders spans as summaries and counters in the Prometheus text format.
+
+        Each metric family is written as one block: `# HELP` and `# TYPE`,
+        then all of its samples.
+        """
+        with self._lock:
+            histograms = [(k, h.summary(), h.total, h.count)
+                          for k, h in sorted(self._histograms.items())]
+            counters = sorted(self._counters.items())
+
+        def family(name: str, kind: str, doc: str, samples: List[str]) -> List[str]:
+            return [f"# HELP {prefix}_{name} {doc}", f"# TYPE {prefix}_{name} {kind}", *samples]
+
+        def labels(key: Key) -> str:
+            return f'span="{_label_value(key[0])}",label="{_label_value(key[1])}"'
+
+        seconds: List[str] = []
+        for key, summary, total, count in histograms:
+            for quantile, field in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms")):
+                value = summary[field] / 1000
+                seconds.append(f'{prefix}_span_seconds{{{labels(key)},quantile="{quantile}"}} {value}')
+            seconds.append(f"{prefix}_span_seconds_sum{{{labels(key)}}} {total}")
+            seconds.append(f"{prefix}_span_seconds_count{{{labels(key)}}} {count}")
+        lines = family("span_seconds", "summary", "Duration of traced operations.", seconds)
+        lines += family("span_errors_total", "counter", "Traced operations that raised.",
+                        [f"{prefix}_span_errors_total{{{labels(key)}}} {summary['errors']}"
+                         for key, summary, _, _ in histograms])
+        lines += family("span_bytes_total", "counter", "Bytes transferred by traced operations.",
+                        [f"{prefix}_span_bytes_total{{{labels(key)}}} {summary['bytes']}"
+                         for key, summary, _, _ in histograms])
+        if counters:
+            lines += family("events_total", "counter", "Counted events.",
+                            [f'{prefix}_events_total{{event="{_label_value(name)}",'
+                             f'label="{_label_value(label)}"}} {value}'
+                             for (name, label), value in counters])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Writes `prometheus()` to a file (e.g. for node_exporter's textfile collector)."""
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(self.prometheus())
+
+
+# Process-wide tracer used by the instrumented modules
+tracer = Tracer(enabled=bool(os.getenv("TRACE_REPORT")))
+
+
+def write_env_report() -> Optional[str]:
+    """Writes the report to `TRACE_REPORT` (plus `TRACE_PROMETHEUS`) if set; returns the path."""
+    path = os.getenv("TRACE_REPORT")
+    if not path or not tracer.enabled:
+        return None
+    tracer.write_report(path)
+    if os.getenv("TRACE_PROMETHEUS"):
+        tracer.write_prometheus(os.environ["TRACE_PROMETHEUS"])
+    return path
@@ -0,0 +1,309 @@
+"""Asynchronous YouTube searcher on one pooled HTTP session.
+
+`AsyncVideoSearcher` calls the Data API REST endpoints directly with an
+`httpx.AsyncClient` instead of one `googleapiclient`/`httplib2` transport per
+thread. It keeps a keep-alive connection pool and uses HTTP/2 when the
+optional `h2` package is installed (`pip install httpx[http2]`). It asks
+for gzip and for partial responses (`fields`). Hundreds of searches can be
+in flight on one event loop.
+
+The coroutines (`asearch_video`, `asearch_candidates`, `asearch_many`) are
+for callers running their own event loop. The `VideoSearcher` methods run
+the same coroutines on a private loop thread, so `MatchEngine` and
+`CachedVideoSearcher` work with it unchanged. An instance belongs to the
+first loop that uses it.
+
+Credentials come from the existing `token.json` flow (`load_credentials`).
+An expired or rejected token is refreshed once for all requests in flight
+and saved back. Calls use the same `RetryPolicy` and quota ledger as
+`YouTubeManager`.
+"""
+
+import asyncio
+import os
+import threading
+from importlib.util import find_spec
+from typing import Any, Coroutine, Dict, List, Optional, Sequence
+from urllib.parse import urljoin
+
+import httplib2
+import httpx
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from src.youtube.interfaces import VideoSearcher
+from src.youtube.quota import QuotaExceededError, QuotaLedger
+from src.youtube.rate_limiter import VIDEOS_PER_LIST_CALL
+from src.youtube.retry import QUOTA, RetryPolicy, classify
+from src.youtube.youtube_manager import API_ENDPOINT, TOKEN_FILE, load_credentials, parse_duration
+
+# pylint: disable=broad-exception-caught
+
+DEFAULT_API_ROOT = "https://youtube.googleapis.com/"
+# Partial responses: only the fields the searcher reads
+SEARCH_FIELDS = "items(id/videoId,snippet/title,snippet/channelTitle)"
+VIDEO_FIELDS = "items(id,contentDetails/duration,snippet/channelTitle,snippet/channelId)"
+# Google only compresses responses for user agents that mention gzip
+USER_AGENT = "spotify-youtube-sync (gzip)"
+
+
+def _http_error(response: httpx.Response) -> HttpError:
+    """Wraps an error response like `googleapiclient` does, for `classify`."""
+    info = {"status": str(response.status_code), **response.headers}
+    return HttpError(httplib2.Response(info), response.content, uri=str(response.url))
+
+
+class AsyncVideoSearcher(VideoSearcher):
+    """`VideoSearcher` on a pooled `httpx.AsyncClient`.
+
+    - `credentials`: OAuth credentials (default: `load_credentials()`).
+    - `api_endpoint`: API root (default: `YOUTUBE_API_ENDPOINT` or Google's).
+    - `concurrency`: most requests in flight at once; also the pool size.
+    - `token_file`: where refreshed tokens are saved (None: not saved).
+    """
+
+    def __init__(
+        self,
+        credentials: Optional[Credentials] = None,
+        api_endpoint: Optional[str] = None,
+        ledger: Optional[QuotaLedger] = None,
+        retry: Optional[RetryPolicy] = None,
+        concurrency: int = 100,
+        token_file: Optional[str] = TOKEN_FILE,
+    ) -> None:
+        self.credentials = credentials or load_credentials()
+        self.api_root = api_endpoint or API_ENDPOINT or DEFAULT_API_ROOT
+        self.ledger = ledger
+        self.retry = retry or RetryPolicy.from_env()
+        self.concurrency = max(1, concurrency)
+        self.token_file = token_file
+        self.http2 = find_spec("h2") is not None
+        self.refreshes = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, ledger: Optional[QuotaLedger] = None) -> "AsyncVideoSearcher":
+        """Builds a searcher from `token.json` and `YOUTUBE_ASYNC_CONCURRENCY`."""
+        return cls(ledger=ledger,
+                   concurrency=int(os.getenv("YOUTUBE_ASYNC_CONCURRENCY", "100")))
+
+    # -- session ---------------------------------------------------------------
+
+    def _session(self) -> httpx.AsyncClient:
+        """Creates the pooled client on the running loop at first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=urljoin(self.api_root, "youtube/v3/"),
+                http2=self.http2,
+                headers={"Accept-Encoding": "gzip", "User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=self.concurrency,
+                                    max_keepalive_connections=self.concurrency),
+                # Requests queue on the semaphore, never on the pool
+                timeout=httpx.Timeout(30.0, connect=10.0, pool=None),
+            )
+        return self._client
+
+    async def _token(self, rejected: Optional[str] = None) -> str:
+        """Returns a valid access token; refreshes it when expired or `rejected`."""
+        creds = self.credentials
+        if creds.valid and creds.token != rejected:
+            return creds.token
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            # Another request may have refreshed it while this one waited
+            if creds.valid and creds.token != rejected:
+                return creds.token
+            await asyncio.to_thread(creds.refresh, Request())
+            self.refreshes += 1
+            if self.token_file:
+                with open(self.token_file, "w", encoding="utf-8") as token:
+                    token.write(creds.to_json())
+        return creds.token
+
+    async def _send(self, method: str, resource: str, params: Dict[str, Any],
+                    body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """One HTTP attempt; error responses raise `HttpError`."""
+        client = self._session()
+        if self._slots is None:
+            # Created on the loop that uses them, like the client
+            self._slots = asyncio.Semaphore(self.concurrency)
+        token = await self._token()
+        try:
+            async with self._slots:
+                response = await client.request(method, resource, params=params, json=body,
+                                                headers={"Authorization": f"Bearer {token}"})
+                if response.status_code == 401 and getattr(self.credentials, "refresh_token", None):
+                    token = await self._token(rejected=token)
+                    response = await client.request(
+                        method, resource, params=params, json=body,
+                        headers={"Authorization": f"Bearer {token}"})
+        except httpx.TransportError as exc:
+            # Retried like any dropped connection
+            raise ConnectionError(f"{type(exc).__name__}: {exc}") from exc
+        if response.is_error:
+            raise _http_error(response)
+        return response.json() if response.content else {}
+
+    async def _call(self, method: str, resource: str, endpoint: str, params: Dict[str, Any],
+                    body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """`_send` under the retry policy, charged to the ledger per attempt."""
+        def charge() -> None:
+            if self.ledger is not None:
+                self.ledger.charge(endpoint)
+
+        try:
+            return await self.retry.acall(self._send, method, resource, params, body,
+                                          endpoint=endpoint, before_attempt=charge)
+        except HttpError as http_err:
+            if classify(http_err).kind == QUOTA:
+                if self.ledger is not None:
+                    self.ledger.exhaust()
+                raise QuotaExceededError(f"YouTube quota exceeded ({endpoint}).") from http_err
+            raise
+
+    # -- coroutines ------------------------------------------------------------
+
+    async def _search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        response = await self._call("GET", "search", "search.list", {
+            "part": "snippet", "q": query, "type": "video",
+            "maxResults": max(1, min(max_results, 50)), "fields": SEARCH_FIELDS,
+        })
+        return [
+            {
+                "video_id": item["id"]["videoId"],
+                "title": item["snippet"]["title"],
+                "channel": item["snippet"]["channelTitle"],
+            }
+            for item in response.get("items", [])
+        ]
+
+    async def asearch_video(self, query: str) -> Optional[Dict[str, str]]:
+        """Coroutine version of `search_video` (API errors are raised, not returned as None)."""
+        results = await self._search(query, 1)
+        return results[0] if results else None
+
+    async def asearch_candidates(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """Coroutine version of `search_candidates` (with `videos.list` details)."""
+        candidates = await self._search(query, max_results)
+        details = await self.aget_video_details([c["video_id"] for c in candidates])
+        for candidate in candidates:
+            candidate.update(details.get(candidate["video_id"], {}))
+        return candidates
+
+    async def aget_video_details(self, video_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Duration and channel per video ID; the 50-ID chunks are fetched concurrently."""
+        chunks = [video_ids[i:i + VIDEOS_PER_LIST_CALL]
+                  for i in range(0, len(video_ids), VIDEOS_PER_LIST_CALL)]
+        responses = await asyncio.gather(*(
+            self._call("GET", "videos", "videos.list", {
+                "part": "contentDetails,snippet", "id": ",".join(chunk),
+                "maxResults": len(chunk), "fields": VIDEO_FIELDS,
+            })
+            for chunk in chunks
+        ))
+        details: Dict[str, Dict[str, Any]] = {}
+        for response in responses:
+            for item in response.get("items", []):
+                snippet = item.get("snippet", {})
+                details[item["id"]] = {
+                    "duration_ms": parse_duration(item.get("contentDetails", {}).get("duration", "")),
+                    "channel": snippet.get("channelTitle", ""),
+                    "channel_id": snippet.get("channelId", ""),
+                }
+        return details
+
+    async def asearch_many(self, queries: Sequence[str], max_results: int = 1) -> List[Any]:
+        """Runs all searches concurrently; returns results in query order.
+
+        With `max_results` > 1 each result is a candidate list. The first API
+        error is raised.
+        """
+        if max_results > 1:
+            return list(await asyncio.gather(
+                *(self.asearch_candidates(q, max_results) for q in queries)))
+        return list(await asyncio.gather(*(self.asearch_video(q) for q in queries)))
+
+    async def acreate_playlist(self, title: str, description: str = "") -> Optional[str]:
+        """Coroutine version of `create_playlist`."""
+        try:
+            response = await self._call("POST", "playlists", "playlists.insert",
+                                        {"part": "snippet,status"}, {
+                                            "snippet": {"title": title, "description": description},
+                                            "status": {"privacyStatus": "private"},
+                                        })
+            return response["id"]
+        except Exception as e:
+            print(f"Error creating playlist: {e}")
+            return None
+
+    async def aadd_video_to_playlist(self, playlist_id: str, video_id: str,
+                                     position: Optional[int] = None) -> bool:
+        """Coroutine version of `add_video_to_playlist`."""
+        snippet: Dict[str, Any] = {
+            "playlistId": playlist_id,
+            "resourceId": {"kind": "youtube#video", "videoId": video_id},
+        }
+        if position is not None:
+            snippet["position"] = position
+        try:
+            await self._call("POST", "playlistItems", "playlistItems.insert",
+                             {"part": "snippet"}, {"snippet": snippet})
+            return True
+        except Exception as e:
+            print(f"Error adding video {video_id} to playlist: {e}")
+            return False
+
+    async def aclose(self) -> None:
+        """Closes the connection pool (on the loop that uses it)."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        # A later session may run on another loop
+        self._slots = self._refresh_lock = None
+
+    # -- VideoSearcher (sync bridge) --------------------------------------------
+
+    def _run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Runs `coro` on the private loop thread and waits for its result."""
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name="youtube-async", daemon=True)
+                self._thread.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def search_video(self, query: str) -> Optional[Dict[str, str]]:
+        return self._run(self.asearch_video(query))
+
+    def search_candidates(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        return self._run(self.asearch_candidates(query, max_results))
+
+    def search_many(self, queries: Sequence[str], max_results: int = 1) -> List[Any]:
+        """Blocking `asearch_many`."""
+        return self._run(self.asearch_many(queries, max_results))
+
+    def create_playlist(self, title: str, description: str = "") -> Optional[str]:
+        return self._run(self.acreate_playlist(title, description))
+
+    def add_video_to_playlist(self, playlist_id: str, video_id: str,
+                              position: Optional[int] = None) -> bool:
+        return self._run(self.aadd_video_to_playlist(playlist_id, video_id, position))
+
+    def close(self) -> None:
+        """Closes the pool and stops the private loop thread, if started."""
+        if self._loop is None:
+            return
+        self._run(self.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+        self._loop.close()
+        self._loop = None
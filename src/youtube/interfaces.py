@@ -4,7 +4,9 @@ This module provides the `VideoSearcher` abstract base class.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from src.youtube.playlist_diff import PlaylistItem
 
 
 class VideoSearcher(ABC):
@@ -15,12 +17,51 @@ class VideoSearcher(ABC):
         """Returns the most relevant video ID for the given query."""
         raise NotImplementedError
 
+    def search_candidates(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """Returns up to `max_results` candidate videos, most relevant first.
+
+        The default implementation returns the single `search_video` result;
+        implementations may return several candidates enriched with
+        `duration_ms`.
+        """
+        result = self.search_video(query)
+        return [result] if result else []
+
     @abstractmethod
     def create_playlist(self, title: str, description: str = "") -> Optional[str]:
         """Creates a new playlist in the user's account and returns its ID."""
         raise NotImplementedError
 
     @abstractmethod
-    def add_video_to_playlist(self, playlist_id: str, video_id: str) -> bool:
-        """Adds a single video ID to the specified playlist."""
+    def add_video_to_playlist(self, playlist_id: str, video_id: str,
+                              position: Optional[int] = None) -> bool:
+        """Adds a single video ID to the specified playlist (at `position` if given)."""
+        raise NotImplementedError
+
+    def add_videos_to_playlist(self, playlist_id: str, video_ids: List[str],
+                               start_position: Optional[int] = None) -> List[bool]:
+        """Adds several videos in order; returns one success flag per video.
+
+        The default implementation inserts them one at a time; implementations
+        may override it with a batched request.
+        """
+        return [
+            self.add_video_to_playlist(
+                playlist_id, v, None if start_position is None else start_position + i)
+            for i, v in enumerate(video_ids)
+        ]
+
+    # Incremental sync (see `PlaylistWriter.sync`); optional for implementations.
+
+    def list_playlist_items(self, playlist_id: str) -> List[PlaylistItem]:
+        """Returns all items of a playlist in position order."""
+        raise NotImplementedError
+
+    def delete_playlist_item(self, item_id: str) -> bool:
+        """Removes an item from a playlist."""
+        raise NotImplementedError
+
+    def move_playlist_item(self, item_id: str, playlist_id: str, video_id: str,
+                           position: int) -> bool:
+        """Moves an existing playlist item to `position`."""
         raise NotImplementedError
@@ -0,0 +1,130 @@
+"""Concurrent YouTube matching engine.
+
+Searches run on a bounded thread pool while results are yielded strictly in
+input (playlist) order, so callers can keep writing them to the database
+sequentially.
+
+Each search asks for several candidates (`MATCH_CANDIDATES`) in the same
+`search.list` call; the candidates are enriched with one batched
+`videos.list` call and scored locally (see `src.youtube.scoring`), so the
+best-scoring video wins instead of YouTube's first hit.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from src.models.data_classes import PendingSong
+from src.telemetry.tracing import tracer
+from src.youtube.interfaces import VideoSearcher
+from src.youtube.rate_limiter import QuotaExhaustedError, TokenBucket, candidate_search_cost
+from src.youtube.retry import CircuitOpenError
+from src.youtube.scoring import best_candidate
+from src.youtube.search_cache import CachedVideoSearcher
+
+@dataclass(frozen=True)
+class MatchResult:
+    """Outcome of a single song search.
+
+    `error` is set when the search failed (the song was not searched, as
+    opposed to `match` being None for "not found").
+    """
+
+    song: PendingSong
+    query: str
+    match: Optional[Dict[str, str]]
+    score: Optional[float] = None
+    error: Optional[str] = None
+
+
+def build_query(song: PendingSong) -> str:
+    """Builds the YouTube search query for a song."""
+    return f"{song.title} {song.artist}"
+
+
+class MatchEngine:
+    """Matches songs against YouTube with bounded concurrency.
+
+    - `workers`: number of concurrent searches (defaults to `MATCH_WORKERS` env).
+    - `limiter`: optional token bucket charged the quota cost of each search.
+    - `candidates`: results requested per search (defaults to
+      `MATCH_CANDIDATES` env, max 50); 1 skips the `videos.list` enrichment.
+
+    When `searcher` is a `CachedVideoSearcher`, cache hits bypass the limiter
+    since they cost no quota.
+    """
+
+    def __init__(
+        self,
+        searcher: VideoSearcher,
+        limiter: Optional[TokenBucket] = None,
+        workers: Optional[int] = None,
+        candidates: Optional[int] = None,
+    ) -> None:
+        self.searcher = searcher
+        self.limiter = limiter
+        self.workers = max(1, workers or int(os.getenv("MATCH_WORKERS", "8")))
+        self.candidates = min(50, max(1, candidates or int(os.getenv("MATCH_CANDIDATES", "5"))))
+
+    def _search(self, song: PendingSong) -> MatchResult:
+        query = build_query(song)
+        if isinstance(self.searcher, CachedVideoSearcher):
+            hit, found = self.searcher.lookup(query, self.candidates)
+            tracer.count("match.cache", label="hit" if hit else "miss")
+            if hit:
+                return self._result(song, query, found)
+            search: Callable[[str], Any] = partial(self.searcher.fetch,
+                                                   max_results=self.candidates)
+        elif self.candidates > 1:
+            search = partial(self.searcher.search_candidates, max_results=self.candidates)
+        else:
+            search = self.searcher.search_video
+
+        if self.limiter is not None:
+            with tracer.span("match.limiter_wait"):
+                self.limiter.acquire(candidate_search_cost(self.candidates))
+        try:
+            with tracer.span("match.search"):
+                found = search(query)
+        except (QuotaExhaustedError, CircuitOpenError):
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            # e.g. a 5xx after the retries ran out: the song stays pending
+            tracer.count("match.search_failed")
+            return MatchResult(song=song, query=query, match=None, error=str(exc))
+        return self._result(song, query, found)
+
+    @staticmethod
+    def _result(song: PendingSong, query: str, found: Any) -> MatchResult:
+        # A single search returns a dict (or None), a candidate search a list.
+        candidates: List[Dict[str, Any]] = found if isinstance(found, list) else [found] if found else []
+        match, score = best_candidate(song, candidates)
+        return MatchResult(song=song, query=query, match=match, score=score)
+
+    def run(self, songs: Iterable[PendingSong]) -> Iterator[MatchResult]:
+        """Yields a `MatchResult` per song, in the same order as `songs`.
+
+        At most `2 * workers` searches are in flight, so `songs` may be a lazy
+        iterator. A failed search yields a result with `error` set. On
+        `QuotaExhaustedError` or `CircuitOpenError` outstanding searches are
+        cancelled and the exception propagates after all earlier results have
+        been yielded.
+        """
+        window = self.workers * 2
+        pending: Deque[Future] = deque()
+        source = iter(songs)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                for song in source:
+                    pending.append(pool.submit(self._search, song))
+                    if len(pending) >= window:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
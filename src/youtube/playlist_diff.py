@@ -0,0 +1,120 @@
+"""Minimal insert/delete/move diff between a YouTube playlist and the desired order.
+
+`compute_playlist_diff` matches existing playlist items to desired videos
+(duplicates are matched one-to-one), keeps the longest run of items that are
+already in relative order (longest increasing subsequence) and moves or
+inserts everything else. Operations are simulated locally so every `position`
+is the index the item must end up at when the operations are applied in
+order: deletes first, then `operations`.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence
+
+
+class PlaylistItem(NamedTuple):
+    """An existing item of a YouTube playlist."""
+
+    item_id: str
+    video_id: str
+    position: int
+
+
+class PlaylistOperation(NamedTuple):
+    """A move of an existing item (`item_id` set) or an insert of a new video."""
+
+    kind: str  # "move" or "insert"
+    video_id: str
+    position: int
+    item_id: Optional[str] = None
+
+
+@dataclass
+class PlaylistDiff:
+    """Deletes (item IDs) followed by ordered moves and inserts."""
+
+    deletes: List[str] = field(default_factory=list)
+    operations: List[PlaylistOperation] = field(default_factory=list)
+
+    @property
+    def inserts(self) -> int:
+        """Number of insert operations."""
+        return sum(1 for op in self.operations if op.kind == "insert")
+
+    @property
+    def moves(self) -> int:
+        """Number of move operations."""
+        return sum(1 for op in self.operations if op.kind == "move")
+
+    def __bool__(self) -> bool:
+        return bool(self.deletes or self.operations)
+
+
+def _longest_increasing(values: Sequence[int]) -> List[int]:
+    """Returns the indexes (into `values`) of one longest increasing subsequence."""
+    tails: List[int] = []
+    tail_idx: List[int] = []
+    parents = [-1] * len(values)
+    for i, value in enumerate(values):
+        pos = bisect_left(tails, value)
+        if pos == len(tails):
+            tails.append(value)
+            tail_idx.append(i)
+        else:
+            tails[pos] = value
+            tail_idx[pos] = i
+        parents[i] = tail_idx[pos - 1] if pos > 0 else -1
+
+    result = []
+    i = tail_idx[-1] if tail_idx else -1
+    while i != -1:
+        result.append(i)
+        i = parents[i]
+    return result[::-1]
+
+
+def compute_playlist_diff(current: Sequence[PlaylistItem], desired: Sequence[str]) -> PlaylistDiff:
+    """Computes the operations that turn `current` into the `desired` video order."""
+    ordered = sorted(current, key=lambda item: item.position)
+    available: Dict[str, Deque[PlaylistItem]] = defaultdict(deque)
+    for item in ordered:
+        available[item.video_id].append(item)
+
+    # Pair each desired slot with an existing item of the same video, if any.
+    assigned: List[Optional[PlaylistItem]] = []
+    for video_id in desired:
+        queue = available.get(video_id)
+        assigned.append(queue.popleft() if queue else None)
+
+    used = {item.item_id for item in assigned if item is not None}
+    diff = PlaylistDiff(deletes=[item.item_id for item in ordered if item.item_id not in used])
+
+    # Items kept in place: longest run already in desired relative order.
+    rank = {item.item_id: i for i, item in enumerate(i for i in ordered if i.item_id in used)}
+    kept = [item for item in assigned if item is not None]
+    lis = _longest_increasing([rank[item.item_id] for item in kept])
+    stay = {kept[i].item_id for i in lis}
+
+    # Simulate the playlist after deletes; place every other slot right after
+    # its desired predecessor.
+    simulated: List[str] = [item.item_id for item in ordered if item.item_id in used]
+    for slot, (video_id, match) in enumerate(zip(desired, assigned)):
+        if match is not None and match.item_id in stay:
+            continue
+        token = match.item_id if match is not None else f"new:{slot}"
+        if match is not None:
+            simulated.remove(token)
+        position = 0 if slot == 0 else simulated.index(_token(assigned, slot - 1)) + 1
+        simulated.insert(position, token)
+        if match is not None:
+            diff.operations.append(PlaylistOperation("move", video_id, position, match.item_id))
+        else:
+            diff.operations.append(PlaylistOperation("insert", video_id, position))
+    return diff
+
+
+def _token(assigned: Sequence[Optional[PlaylistItem]], slot: int) -> str:
+    item = assigned[slot]
+    return item.item_id if item is not None else f"new:{slot}"
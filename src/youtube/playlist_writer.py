@@ -0,0 +1,188 @@
+"""Resumable YouTube playlist population and incremental sync.
+
+`PlaylistWriter.write` inserts a source's matched videos in playlist order and
+records every confirmed insert (`inserted_at`, `playlist_position`) on its
+`Song` node. The YouTube playlist ID is stored on the `PlaylistMeta` node, so
+a run that stops halfway (quota, 409, network) resumes with the first
+unconfirmed song instead of recreating the playlist.
+
+`PlaylistWriter.sync` additionally remembers the playlist per source in a
+`(:SyncTarget)` node that outlives `clear_database`. Re-syncing a source
+fetches the existing items (1 unit per 50) and applies only the minimal
+delete/move/insert diff.
+"""
+
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from src.db.falkordb_manager import FalkordbManager, db_manager
+from src.telemetry.tracing import tracer
+from src.youtube.interfaces import VideoSearcher
+from src.youtube.playlist_diff import compute_playlist_diff
+
+
+@dataclass(frozen=True)
+class WriteReport:
+    """Outcome of a `PlaylistWriter.write` or `PlaylistWriter.sync` run."""
+
+    playlist_id: Optional[str]
+    inserted: int
+    failed: int
+    already_inserted: int
+    seconds: float
+    deleted: int = 0
+    moved: int = 0
+
+    @property
+    def inserts_per_second(self) -> float:
+        """Confirmed inserts per second of wall time."""
+        return self.inserted / self.seconds if self.seconds > 0 else 0.0
+
+
+class PlaylistWriter:
+    """Writes matched songs of a source into its YouTube playlist.
+
+    - `batch_size`: inserts per `BatchHttpRequest` (`PLAYLIST_BATCH_SIZE` env);
+      1 means strictly serial inserts.
+    """
+
+    def __init__(
+        self,
+        youtube: VideoSearcher,
+        manager: Optional[FalkordbManager] = None,
+        batch_size: Optional[int] = None,
+    ) -> None:
+        self.youtube = youtube
+        self.manager = manager or db_manager
+        self.batch_size = max(1, batch_size or int(os.getenv("PLAYLIST_BATCH_SIZE", "10")))
+
+    def write(
+        self,
+        source: str,
+        playlist_name: str,
+        description: str = "Created by Spotify-Youtube Sync",
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> WriteReport:
+        """Creates the playlist if needed and inserts all unconfirmed songs.
+
+        Stops at the first failed insert; it and every later song stay
+        unconfirmed and are picked up by the next run. `failed` counts them
+        for the stopping chunk.
+        """
+        started = time.monotonic()
+        playlist_id = self.manager.get_youtube_playlist_id(source)
+        if not playlist_id:
+            playlist_id = self.youtube.create_playlist(playlist_name, description)
+            if not playlist_id:
+                return WriteReport(None, 0, 0, 0, time.monotonic() - started)
+            self.manager.set_youtube_playlist_id(source, playlist_id)
+            self.manager.set_sync_target(source, playlist_id)
+
+        position = self.manager.count_inserted_songs(source)
+        already_inserted = position
+        pending = self.manager.get_pending_inserts(source)
+        inserted = failed = 0
+
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            with tracer.span("playlist.insert_batch"):
+                results = self.youtube.add_videos_to_playlist(
+                    playlist_id, [video_id for _, video_id in chunk], start_position=position
+                )
+            tracer.count("playlist.inserted", sum(results))
+
+            # Only the run of inserts before the first failure is confirmed, so
+            # the failed song keeps its position on the next run.
+            confirmed = []
+            for (song_id, _), ok in zip(chunk, results):
+                if not ok:
+                    break
+                confirmed.append((song_id, position))
+                position += 1
+            self.manager.mark_songs_inserted(confirmed)
+            inserted += len(confirmed)
+            failed += len(chunk) - len(confirmed)
+            if on_progress:
+                on_progress(len(chunk))
+            if len(confirmed) < len(chunk):
+                stray = [video_id for (_, video_id), ok
+                         in zip(chunk[len(confirmed):], results[len(confirmed):]) if ok]
+                if stray:
+                    self._remove_stray(playlist_id, position, stray)
+                break
+
+        return WriteReport(
+            playlist_id, inserted, failed, already_inserted, time.monotonic() - started
+        )
+
+    def _remove_stray(self, playlist_id: str, position: int, video_ids: List[str]) -> None:
+        """Deletes inserts that succeeded after a failed one in the same batch.
+
+        They sit where the failed song belongs; left in place, the next run
+        would insert that song after them and add them a second time.
+        """
+        stray = Counter(video_ids)
+        for item in self.youtube.list_playlist_items(playlist_id):
+            if item.position >= position and stray[item.video_id] > 0:
+                stray[item.video_id] -= 1
+                self.youtube.delete_playlist_item(item.item_id)
+
+    def sync(
+        self,
+        source: str,
+        playlist_name: str,
+        description: str = "Created by Spotify-Youtube Sync",
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> WriteReport:
+        """Brings the source's YouTube playlist in line with the scraped order.
+
+        Sources without a known playlist (or with a creation still in
+        progress for this scrape) go through `write`; otherwise only the
+        diff against the playlist's current items is applied.
+        """
+        target = self.manager.get_sync_target(source)
+        if not target or self.manager.get_youtube_playlist_id(source):
+            return self.write(source, playlist_name, description, on_progress)
+
+        started = time.monotonic()
+        songs = self.manager.get_matched_songs(source)
+        desired = [video_id for _, video_id in songs]
+        diff = compute_playlist_diff(self.youtube.list_playlist_items(target), desired)
+
+        deleted = moved = inserted = failed = 0
+        for item_id in diff.deletes:
+            if not self.youtube.delete_playlist_item(item_id):
+                failed += 1
+                break
+            deleted += 1
+
+        # Positions assume every earlier operation succeeded, so stop at the first failure.
+        for op in diff.operations if not failed else ():
+            with tracer.span("playlist.sync_op", op.kind):
+                if op.item_id is not None:  # a move
+                    ok = self.youtube.move_playlist_item(op.item_id, target, op.video_id, op.position)
+                    moved += int(ok)
+                else:
+                    ok = self.youtube.add_video_to_playlist(target, op.video_id, op.position)
+                    inserted += int(ok)
+            if not ok:
+                failed += 1
+                break
+            if on_progress:
+                on_progress(1)
+
+        if not failed:
+            # Everything is in place: record it so `write` has nothing left to do.
+            self.manager.set_youtube_playlist_id(source, target)
+            self.manager.mark_songs_inserted(
+                [(song_id, position) for position, (song_id, _) in enumerate(songs)]
+            )
+            self.manager.set_sync_target(source, target)
+
+        return WriteReport(
+            target, inserted, failed, len(desired) - diff.inserts - diff.moves,
+            time.monotonic() - started, deleted=deleted, moved=moved,
+        )
@@ -0,0 +1,249 @@
+"""Persistent YouTube quota ledger and sync-cost planner.
+
+The Data API charges every request (including failed ones) against a daily
+quota that resets at midnight Pacific time. `QuotaLedger` records the units
+and calls of each endpoint per Pacific day in SQLite, so the budget carries
+across runs. `plan_sync` estimates what a run will cost before it starts,
+so work that does not fit can be deferred to the next window.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Callable, Dict, Optional
+
+from src.youtube.rate_limiter import (
+    DEFAULT_DAILY_QUOTA,
+    SEARCH_LIST_COST,
+    VIDEOS_LIST_COST,
+    QuotaExhaustedError,
+    candidate_search_cost,
+)
+
+# Quota units per API method (YouTube Data API v3 quota calculator).
+ENDPOINT_COSTS: Dict[str, int] = {
+    "search.list": SEARCH_LIST_COST,
+    "videos.list": VIDEOS_LIST_COST,
+    "playlists.list": 1,
+    "playlists.insert": 50,
+    "playlistItems.list": 1,
+    "playlistItems.insert": 50,
+    "playlistItems.update": 50,
+    "playlistItems.delete": 50,
+}
+DEFAULT_ENDPOINT_COST = 1
+
+
+def _pacific() -> tzinfo:
+    try:
+        from zoneinfo import ZoneInfo  # pylint: disable=import-outside-toplevel
+        return ZoneInfo("America/Los_Angeles")
+    except Exception:  # pylint: disable=broad-except
+        # No tz database (e.g. Windows without `tzdata`): Pacific Standard Time
+        return timezone(timedelta(hours=-8), "PST")
+
+
+PACIFIC = _pacific()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_usage (
+    day TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    units INTEGER NOT NULL,
+    calls INTEGER NOT NULL,
+    PRIMARY KEY (day, endpoint)
+);
+"""
+
+
+class QuotaExceededError(QuotaExhaustedError):
+    """Raised when the API itself answers 403 `quotaExceeded`."""
+
+
+def endpoint_cost(endpoint: str) -> int:
+    """Quota units of one call to `endpoint` (e.g. `"search.list"`)."""
+    return ENDPOINT_COSTS.get(endpoint, DEFAULT_ENDPOINT_COST)
+
+
+class QuotaLedger:
+    """Thread-safe, SQLite-backed record of quota spent per Pacific day.
+
+    - `daily_quota`: the project's daily allowance in units.
+    - `clock`: returns the current UNIX time (for tests).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        daily_quota: int = DEFAULT_DAILY_QUOTA,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.daily_quota = daily_quota
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "QuotaLedger":
+        """Builds a ledger from `YOUTUBE_QUOTA_LEDGER_PATH` and `YOUTUBE_DAILY_QUOTA`."""
+        return cls(
+            path=os.getenv("YOUTUBE_QUOTA_LEDGER_PATH", "quota_ledger.sqlite3"),
+            daily_quota=int(os.getenv("YOUTUBE_DAILY_QUOTA", str(DEFAULT_DAILY_QUOTA))),
+        )
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock(), PACIFIC)
+
+    def day(self) -> str:
+        """Current quota day (Pacific date) as `YYYY-MM-DD`."""
+        return self._now().date().isoformat()
+
+    def seconds_until_reset(self) -> float:
+        """Seconds until the quota resets at midnight Pacific time."""
+        now = self._now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), PACIFIC)
+        return max(0.0, midnight.timestamp() - now.timestamp())
+
+    def _record(self, endpoint: str, calls: int, units: int) -> None:
+        """Adds to today's row of `endpoint` (caller holds the lock)."""
+        self._conn.execute(
+            "INSERT INTO quota_usage (day, endpoint, units, calls) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(day, endpoint) DO UPDATE SET "
+            "units = units + excluded.units, calls = calls + excluded.calls",
+            (self.day(), endpoint, units, calls),
+        )
+        self._conn.commit()
+
+    def _spent(self) -> int:
+        """Units spent today (caller holds the lock)."""
+        row = self._conn.execute(
+            "SELECT COALESCE(SUM(units), 0) FROM quota_usage WHERE day = ?", (self.day(),)
+        ).fetchone()
+        return int(row[0])
+
+    def _remaining(self) -> int:
+        return max(0, self.daily_quota - self._spent())
+
+    def _refuse(self, endpoint: str, cost: int, remaining: int) -> QuotaExhaustedError:
+        hours = self.seconds_until_reset() / 3600
+        return QuotaExhaustedError(
+            f"Daily quota of {self.daily_quota} units exhausted "
+            f"({remaining} left, {endpoint} needs {cost}); resets in {hours:.1f} h."
+        )
+
+    def record(self, endpoint: str, calls: int = 1, units: Optional[int] = None) -> int:
+        """Charges `calls` calls of `endpoint` to today's budget; returns the units."""
+        units = endpoint_cost(endpoint) * calls if units is None else units
+        with self._lock:
+            self._record(endpoint, calls, units)
+        return units
+
+    def check(self, endpoint: str, calls: int = 1) -> None:
+        """Raises `QuotaExhaustedError` if today's budget cannot cover the calls."""
+        cost = endpoint_cost(endpoint) * calls
+        remaining = self.remaining()
+        if cost > remaining:
+            raise self._refuse(endpoint, cost, remaining)
+
+    def charge(self, endpoint: str, calls: int = 1) -> int:
+        """`check` and `record` under one lock; returns the units charged.
+
+        Concurrent callers cannot both pass the check on the last units.
+        """
+        cost = endpoint_cost(endpoint) * calls
+        with self._lock:
+            remaining = self._remaining()
+            if cost > remaining:
+                raise self._refuse(endpoint, cost, remaining)
+            self._record(endpoint, calls, cost)
+        return cost
+
+    def exhaust(self) -> None:
+        """Marks today's budget as used up (the API reported `quotaExceeded`)."""
+        with self._lock:
+            remaining = self._remaining()
+            if remaining:
+                self._record("quotaExceeded", 0, remaining)
+
+    def spent(self) -> int:
+        """Units spent today."""
+        with self._lock:
+            return self._spent()
+
+    def remaining(self) -> int:
+        """Units left today."""
+        with self._lock:
+            return self._remaining()
+
+    def by_endpoint(self) -> Dict[str, Dict[str, int]]:
+        """Returns today's `{endpoint: {"units", "calls"}}`."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, units, calls FROM quota_usage WHERE day = ? ORDER BY endpoint",
+                (self.day(),),
+            ).fetchall()
+        return {endpoint: {"units": units, "calls": calls} for endpoint, units, calls in rows}
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass(frozen=True)
+class SyncPlan:
+    """Estimated quota cost of a sync and how much of it fits today's budget."""
+
+    tracks: int
+    search_units: int
+    inserts: int
+    insert_units: int
+    remaining: int
+    affordable_tracks: int
+
+    @property
+    def total_units(self) -> int:
+        """Units the whole sync would cost."""
+        return self.search_units + self.insert_units
+
+    @property
+    def deferred_tracks(self) -> int:
+        """Tracks that do not fit today's budget."""
+        return self.tracks - self.affordable_tracks
+
+    @property
+    def fits(self) -> bool:
+        """True when the whole sync fits today's budget."""
+        return self.total_units <= self.remaining
+
+
+def plan_sync(
+    tracks: int,
+    remaining: int,
+    candidates: int = 1,
+    inserts: int = 0,
+    new_playlists: int = 0,
+) -> SyncPlan:
+    """Estimates the quota cost of matching `tracks` and inserting `inserts` videos.
+
+    Searches are budgeted first: `affordable_tracks` is how many tracks can be
+    matched with `remaining` units. Cache hits cost nothing, so this is an
+    upper bound.
+    """
+    per_search = candidate_search_cost(candidates)
+    insert_units = (inserts * endpoint_cost("playlistItems.insert")
+                    + new_playlists * endpoint_cost("playlists.insert"))
+    return SyncPlan(
+        tracks=tracks,
+        search_units=tracks * per_search,
+        inserts=inserts,
+        insert_units=insert_units,
+        remaining=remaining,
+        affordable_tracks=min(tracks, max(0, remaining) // per_search),
+    )
@@ -0,0 +1,114 @@
+"""Quota-aware token-bucket rate limiter for YouTube Data API calls.
+
+Tokens are YouTube quota units, so a `search.list` call acquires
+`SEARCH_LIST_COST` tokens. The bucket refills at a steady rate (burst
+protection) and additionally tracks the total units spent against the
+daily quota.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+# Quota cost of a single `search.list` call (YouTube Data API v3).
+SEARCH_LIST_COST = 100
+# Quota cost of a `videos.list` call; one call covers up to 50 video IDs.
+VIDEOS_LIST_COST = 1
+VIDEOS_PER_LIST_CALL = 50
+DEFAULT_DAILY_QUOTA = 10_000
+
+
+def candidate_search_cost(candidates: int) -> int:
+    """Quota units of one search for `candidates` results, including the
+    `videos.list` enrichment used when more than one candidate is requested."""
+    if candidates <= 1:
+        return SEARCH_LIST_COST
+    calls = -(-candidates // VIDEOS_PER_LIST_CALL)
+    return SEARCH_LIST_COST + calls * VIDEOS_LIST_COST
+
+
+class QuotaExhaustedError(RuntimeError):
+    """Raised when a call would exceed the configured daily quota."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket measured in YouTube quota units.
+
+    - `rate`: units refilled per second.
+    - `capacity`: maximum burst size in units.
+    - `daily_quota`: total units allowed for the run (None disables the check).
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        daily_quota: Optional[int] = DEFAULT_DAILY_QUOTA,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.daily_quota = daily_quota
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._last = clock()
+        self._units_spent = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TokenBucket":
+        """Builds a limiter from `YOUTUBE_UNITS_PER_SECOND`, `YOUTUBE_BURST_UNITS`
+        and `YOUTUBE_DAILY_QUOTA`."""
+        rate = float(os.getenv("YOUTUBE_UNITS_PER_SECOND", "500"))
+        capacity = float(os.getenv("YOUTUBE_BURST_UNITS", "1000"))
+        daily_quota = int(os.getenv("YOUTUBE_DAILY_QUOTA", str(DEFAULT_DAILY_QUOTA)))
+        return cls(rate=rate, capacity=capacity, daily_quota=daily_quota)
+
+    @property
+    def units_spent(self) -> int:
+        """Quota units charged so far."""
+        return self._units_spent
+
+    @property
+    def units_remaining(self) -> Optional[int]:
+        """Quota units left for the day (None when unlimited)."""
+        if self.daily_quota is None:
+            return None
+        return max(self.daily_quota - self._units_spent, 0)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._last
+        self._last = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    def acquire(self, cost: int = SEARCH_LIST_COST) -> None:
+        """Blocks until `cost` units are available and charges them.
+
+        Raises `QuotaExhaustedError` if the daily quota would be exceeded.
+        """
+        if cost > self.capacity:
+            raise ValueError(f"cost {cost} exceeds bucket capacity {self.capacity}")
+
+        with self._lock:
+            if self.daily_quota is not None and self._units_spent + cost > self.daily_quota:
+                raise QuotaExhaustedError(
+                    f"Daily quota of {self.daily_quota} units exhausted "
+                    f"({self._units_spent} spent)."
+                )
+            # Reserve the units up front so concurrent callers can't overspend.
+            self._units_spent += cost
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                wait = (cost - self._tokens) / self.rate
+            self._sleep(wait)
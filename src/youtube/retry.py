@@ -0,0 +1,362 @@
+"""Retry policy and per-endpoint circuit breaker for YouTube Data API calls.
+
+`classify` sorts a failed call into one of three kinds:
+
+- `RETRY`: 5xx, 408/429, `rateLimitExceeded`/`userRateLimitExceeded` and
+  transport errors (timeouts, reset or refused connections). A transport
+  error is only retried on idempotent endpoints: an insert may have been
+  applied before the connection dropped, and sending it again would
+  duplicate it.
+- `QUOTA`: `quotaExceeded`/`dailyLimitExceeded`. Retrying cannot help
+  before the daily reset.
+- `FATAL`: anything else, e.g. 403 `forbidden` or 404.
+
+`RetryPolicy.call` retries `RETRY` failures with exponential backoff and
+decorrelated jitter. It honours `Retry-After` and re-raises the last error
+once the attempts are used up. Failures also feed a `CircuitBreaker` per
+endpoint that all threads share. After a run of failures (or a
+`Retry-After`) every worker pauses together instead of each one hammering
+the API on its own schedule. A pause longer than `max_wait` raises
+`CircuitOpenError` right away.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from src.telemetry.tracing import tracer
+
+RETRY = "retry"
+QUOTA = "quota"
+FATAL = "fatal"
+
+# 403 reasons meaning the daily quota is gone (retrying cannot help)
+QUOTA_REASONS = ("quotaExceeded", "dailyLimitExceeded")
+# 403/429 reasons meaning "slow down": retried after a backoff
+RATE_LIMIT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded")
+RETRY_STATUSES = (408, 429)
+# Dropped, reset, refused or timed-out connections and DNS hiccups
+# (`socket.timeout` is only an alias of `TimeoutError` from Python 3.10 on)
+TRANSPORT_ERRORS = (ConnectionError, TimeoutError, socket.timeout, http.client.IncompleteRead,
+                    httplib2.ServerNotFoundError)
+# Endpoints that are safe to resend after a transport error
+IDEMPOTENT_ENDPOINTS = frozenset({
+    "search.list", "videos.list", "playlists.list", "playlistItems.list", "playlistItems.delete",
+})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when an endpoint is paused for longer than the policy will wait."""
+
+
+@dataclass(frozen=True)
+class Failure:
+    """How a failed call should be handled."""
+
+    kind: str
+    reason: str
+    retry_after: Optional[float] = None
+
+
+def error_reason(error: HttpError) -> str:
+    """Returns the first `reason` of an API error response ("" if absent)."""
+    try:
+        errors = json.loads(error.content.decode("utf-8"))["error"].get("errors") or [{}]
+        return errors[0].get("reason", "")
+    except Exception:  # pylint: disable=broad-except
+        return ""
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a `Retry-After` header (delta seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when - (time.time() if now is None else now))
+
+
+def classify(exc: BaseException, endpoint: str = "") -> Failure:
+    """Classifies an exception raised by an API call to `endpoint`.
+
+    Transport errors of named endpoints outside `IDEMPOTENT_ENDPOINTS` are
+    `FATAL`; without an endpoint they count as retryable.
+    """
+    if isinstance(exc, HttpError):
+        status = exc.resp.status
+        reason = error_reason(exc) or f"http{status}"
+        retry_after = parse_retry_after(exc.resp.get("retry-after"))
+        if reason in QUOTA_REASONS:
+            return Failure(QUOTA, reason)
+        if status >= 500 or status in RETRY_STATUSES or reason in RATE_LIMIT_REASONS:
+            return Failure(RETRY, reason, retry_after)
+        return Failure(FATAL, reason)
+    if isinstance(exc, TRANSPORT_ERRORS):
+        if endpoint and endpoint not in IDEMPOTENT_ENDPOINTS:
+            return Failure(FATAL, type(exc).__name__)
+        return Failure(RETRY, type(exc).__name__)
+    return Failure(FATAL, type(exc).__name__)
+
+
+class CircuitBreaker:
+    """Shared pause for one endpoint.
+
+    Opens after `threshold` consecutive retryable failures, or for as long
+    as a `Retry-After` asks. Each reopening without a success in between
+    doubles the pause, up to `max_cooldown`. Once the pause is over, the
+    next failure reopens the breaker immediately and a success closes it.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        cooldown: float = 5.0,
+        max_cooldown: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._streak = 0
+        self._open_until = 0.0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """`"closed"`, `"open"` or `"half_open"`."""
+        with self._lock:
+            if self._clock() < self._open_until:
+                return "open"
+            return "half_open" if self._failures >= self.threshold else "closed"
+
+    def remaining(self) -> float:
+        """Seconds until calls may go through again (0 when not open)."""
+        with self._lock:
+            return max(0.0, self._open_until - self._clock())
+
+    def record_failure(self, retry_after: Optional[float] = None) -> bool:
+        """Counts a retryable failure; returns True if it opened the breaker."""
+        with self._lock:
+            now = self._clock()
+            self._failures += 1
+            until = now + retry_after if retry_after else 0.0
+            if self._failures >= self.threshold:
+                until = max(until, now + min(self.max_cooldown,
+                                             self.cooldown * 2 ** self._streak))
+                self._streak += 1
+            if until <= self._open_until:
+                return False
+            self._open_until = until
+            self.opened += 1
+            return True
+
+    def record_success(self) -> None:
+        """Closes the breaker."""
+        with self._lock:
+            self._failures = 0
+            self._streak = 0
+
+
+class RetryPolicy:
+    """Retries API calls with decorrelated-jitter backoff.
+
+    - `attempts`: tries per call, including the first one.
+    - `base`/`cap`: bounds of the backoff in seconds. Each delay is drawn
+      from `[base, 3 * previous delay]` and capped at `cap`.
+    - `threshold`/`cooldown`/`max_cooldown`: per-endpoint `CircuitBreaker`.
+    - `max_wait`: longest breaker pause a call sits out before it raises
+      `CircuitOpenError`.
+
+    Thread-safe. Share one policy between the workers of a run.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 5,
+        base: float = 0.5,
+        cap: float = 30.0,
+        threshold: int = 5,
+        cooldown: float = 5.0,
+        max_cooldown: float = 300.0,
+        max_wait: float = 30.0,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.attempts = max(1, attempts)
+        self.base = base
+        self.cap = cap
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_wait = max_wait
+        self._rng = rng or random.Random()
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._stats: Dict[str, Any] = {"calls": 0, "retries": 0, "gave_up": 0,
+                                       "rejected": 0, "backoff_s": 0.0, "reasons": {}}
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        """Builds a policy from the `YOUTUBE_RETRY_*` and `YOUTUBE_BREAKER_*` env vars."""
+        return cls(
+            attempts=int(os.getenv("YOUTUBE_RETRY_ATTEMPTS", "5")),
+            base=float(os.getenv("YOUTUBE_RETRY_BASE", "0.5")),
+            cap=float(os.getenv("YOUTUBE_RETRY_CAP", "30")),
+            threshold=int(os.getenv("YOUTUBE_BREAKER_THRESHOLD", "5")),
+            cooldown=float(os.getenv("YOUTUBE_BREAKER_COOLDOWN", "5")),
+            max_cooldown=float(os.getenv("YOUTUBE_BREAKER_MAX_COOLDOWN", "300")),
+            max_wait=float(os.getenv("YOUTUBE_BREAKER_MAX_WAIT", "30")),
+        )
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Returns the breaker shared by all calls to `endpoint`."""
+        with self._lock:
+            breaker = self._breakers.get(endpoint)
+            if breaker is None:
+                breaker = self._breakers[endpoint] = CircuitBreaker(
+                    self.threshold, self.cooldown, self.max_cooldown, self._clock)
+            return breaker
+
+    def backoff(self, previous: float) -> float:
+        """Next delay after `previous` (decorrelated jitter)."""
+        with self._lock:
+            return min(self.cap, self._rng.uniform(self.base, max(self.base, previous * 3)))
+
+    def _bump(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+
+    def _pause(self, breaker: CircuitBreaker, endpoint: str) -> float:
+        """Seconds to sit out an open breaker; raises if the pause is too long."""
+        pause = breaker.remaining()
+        if not pause:
+            return 0.0
+        if pause > self.max_wait:
+            self._bump("rejected")
+            tracer.count("youtube.circuit_rejected", label=endpoint)
+            raise CircuitOpenError(
+                f"YouTube {endpoint or 'API'} is failing; paused for another {pause:.0f} s.")
+        # A little jitter so the paused workers do not all resume at once
+        pause += self.backoff(0.0) * 0.1
+        self._bump("backoff_s", pause)
+        return pause
+
+    def _failed(self, exc: Exception, breaker: CircuitBreaker, endpoint: str,
+                attempt: int, delay: float) -> Optional[Tuple[float, float]]:
+        """Books a failed attempt. Returns `(next delay, seconds to sleep now)`,
+        or None when `exc` should be raised."""
+        failure = classify(exc, endpoint)
+        tracer.count("youtube.errors", label=failure.reason)
+        if failure.kind != RETRY:
+            return None
+        with self._lock:
+            reasons = self._stats["reasons"]
+            reasons[failure.reason] = reasons.get(failure.reason, 0) + 1
+        if breaker.record_failure(failure.retry_after):
+            tracer.count("youtube.circuit_open", label=endpoint)
+        if attempt == self.attempts:
+            self._bump("gave_up")
+            return None
+        self._bump("retries")
+        tracer.count("youtube.retries", label=endpoint)
+        delay = self.backoff(delay)
+        if failure.retry_after:
+            # The breaker is paused for Retry-After; the next attempt waits it out
+            return delay, 0.0
+        self._bump("backoff_s", delay)
+        return delay, delay
+
+    def _wait(self, seconds: float, endpoint: str) -> None:
+        if seconds:
+            with tracer.span("youtube.backoff", endpoint):
+                self._sleep(seconds)
+
+    def call(self, func: Callable[..., Any], *args,
+             endpoint: str = "", before_attempt: Optional[Callable[[], None]] = None,
+             **kwargs) -> Any:
+        """Calls `func(*args, **kwargs)`, retrying retryable failures.
+
+        `before_attempt` runs before every attempt (e.g. to charge the quota
+        ledger, which may raise to stop the call).
+        """
+        breaker = self.breaker(endpoint)
+        delay = self.base
+        self._bump("calls")
+        for attempt in range(1, self.attempts + 1):
+            self._wait(self._pause(breaker, endpoint), endpoint)
+            if before_attempt is not None:
+                before_attempt()
+            try:
+                with tracer.span("youtube.call", endpoint):
+                    result = func(*args, **kwargs)
+            except Exception as exc:
+                step = self._failed(exc, breaker, endpoint, attempt, delay)
+                if step is None:
+                    raise
+                delay, wait = step
+                self._wait(wait, endpoint)
+                continue
+            breaker.record_success()
+            return result
+        return None
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args,
+                    endpoint: str = "", before_attempt: Optional[Callable[[], None]] = None,
+                    **kwargs) -> Any:
+        """Awaits `func(*args, **kwargs)` like `call`, sleeping with `asyncio.sleep`."""
+        breaker = self.breaker(endpoint)
+        delay = self.base
+        self._bump("calls")
+        for attempt in range(1, self.attempts + 1):
+            pause = self._pause(breaker, endpoint)
+            if pause:
+                await asyncio.sleep(pause)
+            if before_attempt is not None:
+                before_attempt()
+            try:
+                with tracer.span("youtube.call", endpoint):
+                    result = await func(*args, **kwargs)
+            except Exception as exc:
+                step = self._failed(exc, breaker, endpoint, attempt, delay)
+                if step is None:
+                    raise
+                delay, wait = step
+                if wait:
+                    await asyncio.sleep(wait)
+                continue
+            breaker.record_success()
+            return result
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns call/retry counters, retries per reason and open breakers."""
+        with self._lock:
+            stats = dict(self._stats, reasons=dict(self._stats["reasons"]))
+            breakers = dict(self._breakers)
+        stats["backoff_s"] = round(stats["backoff_s"], 3)
+        stats["circuit_opened"] = sum(b.opened for b in breakers.values())
+        stats["open_endpoints"] = sorted(e for e, b in breakers.items() if b.state == "open")
+        return stats
@@ -0,0 +1,96 @@
+"""Local scoring of YouTube search candidates against a Spotify song.
+
+Each candidate gets a score in [0, 1] built from:
+
+- title similarity: trigram Dice coefficient between the song's
+  "title artist" and the video's "title channel";
+- artist coverage: share of the artist's trigrams found in the video title or
+  channel name;
+- duration agreement: 1 at an exact match, falling linearly to 0 at
+  `DURATION_TOLERANCE_MS` (skipped when either duration is unknown).
+
+Videos whose title advertises a different rendition ("live", "cover",
+"karaoke", ...) that the song title does not mention are penalized. The song
+side is prepared once per batch, so scoring N candidates is N set
+intersections.
+"""
+
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from src.models.data_classes import PendingSong
+
+from src.models.normalize import normalize_query
+
+TITLE_WEIGHT = 0.5
+ARTIST_WEIGHT = 0.25
+DURATION_WEIGHT = 0.25
+DURATION_TOLERANCE_MS = 30_000
+RENDITION_PENALTY = 0.7
+
+RENDITION_WORDS = frozenset({
+    "live", "cover", "karaoke", "instrumental", "remix", "nightcore", "sped",
+    "slowed", "reverb", "8d", "reaction", "tutorial", "lesson", "acoustic",
+})
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Returns the character trigrams of the normalized text (space padded)."""
+    return _grams(normalize_query(text))
+
+
+def _grams(normalized: str) -> FrozenSet[str]:
+    value = f"  {normalized} "
+    return frozenset(value[i:i + 3] for i in range(len(value) - 2))
+
+
+def _dice(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return 2 * len(left & right) / (len(left) + len(right))
+
+
+def _coverage(needle: FrozenSet[str], haystack: FrozenSet[str]) -> float:
+    return len(needle & haystack) / len(needle) if needle else 0.0
+
+
+def score_candidates(song: PendingSong, candidates: Sequence[Mapping[str, Any]]) -> List[float]:
+    """Returns one score per candidate, in the same order."""
+    song_grams = trigrams(f"{song.title} {song.artist}")
+    artist_grams = trigrams(song.artist)
+    song_words = set(normalize_query(song.title).split())
+    song_duration = song.duration_ms or 0
+
+    scores = []
+    for candidate in candidates:
+        title = normalize_query(candidate.get("title", ""))
+        video_grams = _grams(f"{title} {normalize_query(candidate.get('channel', ''))}")
+        score = TITLE_WEIGHT * _dice(song_grams, video_grams)
+        score += ARTIST_WEIGHT * _coverage(artist_grams, video_grams)
+        weight = TITLE_WEIGHT + ARTIST_WEIGHT
+
+        video_duration = int(candidate.get("duration_ms") or 0)
+        if song_duration and video_duration:
+            delta = abs(song_duration - video_duration)
+            score += DURATION_WEIGHT * max(0.0, 1 - delta / DURATION_TOLERANCE_MS)
+            weight += DURATION_WEIGHT
+
+        score /= weight
+        if RENDITION_WORDS.intersection(title.split()) - song_words:
+            score *= RENDITION_PENALTY
+        scores.append(round(score, 4))
+    return scores
+
+
+def best_candidate(
+    song: PendingSong, candidates: Sequence[Dict[str, Any]]
+) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+    """Returns `(candidate, score)` of the highest-scoring candidate.
+
+    Ties keep YouTube's relevance order. Returns `(None, None)` without
+    candidates.
+    """
+    if not candidates:
+        return None, None
+    scores = score_candidates(song, candidates)
+    best = max(range(len(candidates)), key=lambda i: (scores[i], -i))
+    return candidates[best], scores[best]
@@ -0,0 +1,222 @@
+"""Persistent search-result cache in front of a `VideoSearcher`.
+
+Results are stored in SQLite keyed by the normalized query, so re-running a
+playlist after the graph was cleared (or syncing another playlist that shares
+tracks) does not spend another `search.list` call. Entries expire after a TTL
+and the least recently used ones are evicted once `max_entries` is reached.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.models.normalize import normalize_query
+from src.youtube.interfaces import VideoSearcher
+from src.youtube.playlist_diff import PlaylistItem
+from src.youtube.rate_limiter import SEARCH_LIST_COST
+
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 100_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache (accessed_at);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SearchCache:
+    """SQLite-backed TTL/LRU cache of search results.
+
+    `None` results and empty candidate lists ("not found") are cached too,
+    with the shorter `negative_ttl`, because they cost the same quota as a hit.
+    A `namespace` keeps differently shaped results for the same query apart.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls) -> "SearchCache":
+        """Builds a cache from `SEARCH_CACHE_PATH`, `SEARCH_CACHE_TTL` and
+        `SEARCH_CACHE_MAX_ENTRIES`."""
+        return cls(
+            path=os.getenv("SEARCH_CACHE_PATH", "search_cache.sqlite3"),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL", str(DEFAULT_TTL))),
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+        )
+
+    @staticmethod
+    def _key(query: str, namespace: str) -> str:
+        key = normalize_query(query)
+        return f"{namespace}:{key}" if namespace else key
+
+    def get(self, query: str, namespace: str = "") -> Tuple[bool, Any]:
+        """Returns `(hit, value)` for the query and updates hit/miss counters."""
+        key = self._key(query, namespace)
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self.misses += 1
+                self._bump("misses")
+                self._conn.commit()
+                return False, None
+
+            self._conn.execute(
+                "UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            self._bump("hits")
+            self._conn.commit()
+            return True, json.loads(row[0])
+
+    def put(self, query: str, value: Any, namespace: str = "") -> None:
+        """Stores a result and evicts least recently used entries if needed."""
+        key = self._key(query, namespace)
+        now = self._clock()
+        ttl = self.ttl if value else self.negative_ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                "SELECT key FROM search_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def _bump(self, name: str) -> None:
+        self._conn.execute(
+            "INSERT INTO cache_stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Returns session and lifetime hit/miss counters and quota saved."""
+        with self._lock:
+            lifetime = dict(self._conn.execute("SELECT name, value FROM cache_stats"))
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        total_hits = lifetime.get("hits", 0)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "quota_saved": self.hits * SEARCH_LIST_COST,
+            "lifetime_hits": total_hits,
+            "lifetime_misses": lifetime.get("misses", 0),
+            "lifetime_quota_saved": total_hits * SEARCH_LIST_COST,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedVideoSearcher(VideoSearcher):
+    """Wraps any `VideoSearcher` and serves repeated searches from `SearchCache`.
+
+    Playlist operations are delegated unchanged.
+    """
+
+    def __init__(self, inner: VideoSearcher, cache: SearchCache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def lookup(self, query: str, max_results: int = 1) -> Tuple[bool, Any]:
+        """Returns `(hit, result)` from the cache without calling the API.
+
+        With `max_results` > 1 the result is a candidate list.
+        """
+        if max_results > 1:
+            return self.cache.get(query, namespace=f"candidates{max_results}")
+        return self.cache.get(query)
+
+    def fetch(self, query: str, max_results: int = 1) -> Any:
+        """Searches through the wrapped searcher and caches the result."""
+        if max_results > 1:
+            candidates = self.inner.search_candidates(query, max_results)
+            self.cache.put(query, candidates, namespace=f"candidates{max_results}")
+            return candidates
+        result = self.inner.search_video(query)
+        self.cache.put(query, result)
+        return result
+
+    def search_candidates(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        if max_results <= 1:
+            return super().search_candidates(query, max_results)
+        hit, candidates = self.lookup(query, max_results)
+        if hit:
+            return candidates
+        return self.fetch(query, max_results)
+
+    def search_video(self, query: str) -> Optional[Dict[str, str]]:
+        hit, result = self.lookup(query)
+        if hit:
+            return result
+        return self.fetch(query)
+
+    def create_playlist(self, title: str, description: str = "") -> Optional[str]:
+        return self.inner.create_playlist(title, description)
+
+    def add_video_to_playlist(self, playlist_id: str, video_id: str,
+                              position: Optional[int] = None) -> bool:
+        return self.inner.add_video_to_playlist(playlist_id, video_id, position)
+
+    def add_videos_to_playlist(self, playlist_id: str, video_ids: List[str],
+                               start_position: Optional[int] = None) -> List[bool]:
+        return self.inner.add_videos_to_playlist(playlist_id, video_ids, start_position)
+
+    def list_playlist_items(self, playlist_id: str) -> List[PlaylistItem]:
+        return self.inner.list_playlist_items(playlist_id)
+
+    def delete_playlist_item(self, item_id: str) -> bool:
+        return self.inner.delete_playlist_item(item_id)
+
+    def move_playlist_item(self, item_id: str, playlist_id: str, video_id: str,
+                           position: int) -> bool:
+        return self.inner.move_playlist_item(item_id, playlist_id, video_id, position)
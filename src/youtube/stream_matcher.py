@@ -0,0 +1,185 @@
+"""Matches tracks while the crawl that finds them is still running.
+
+`StreamingMatcher` accepts songs one at a time (from the Scrapy pipeline)
+and matches them on a background thread with `MatchEngine`. That way YouTube
+searches overlap with page scrolling, and a sync takes about as long as
+the slower of the two.
+
+Each unique track is searched once. Tracks the catalog already has a match
+for are skipped with one lookup per batch, and cache hits cost no quota.
+Matches are written by track key, because a song may still sit in the graph
+pipeline's buffer when its match arrives.
+"""
+
+import os
+import queue
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from src.db.falkordb_manager import FalkordbManager, db_manager
+from src.db.match_writer import MatchWriter
+from src.models.data_classes import PendingSong
+from src.models.normalize import track_key
+from src.youtube.match_engine import MatchEngine
+from src.youtube.quota import QuotaLedger
+from src.youtube.rate_limiter import QuotaExhaustedError
+
+_STOP = object()
+
+
+class StreamingMatcher:
+    """Background match queue fed while scraping.
+
+    - `engine`: matches the songs (its searcher should be a `CachedVideoSearcher`).
+    - `batch_size`: queued songs checked against the catalog per query.
+
+    Call `start()`, `submit()` each scraped song, then `close()` to wait
+    for the queue to drain. After a `QuotaExhaustedError` the tracks not
+    searched yet are DEFERRED to the next quota window, as `match` does.
+    """
+
+    def __init__(
+        self,
+        engine: MatchEngine,
+        manager: Optional[FalkordbManager] = None,
+        batch_size: int = 50,
+        ledger: Optional[QuotaLedger] = None,
+    ) -> None:
+        self.engine = engine
+        self.ledger = ledger
+        self.manager = manager or db_manager
+        self.batch_size = max(1, batch_size)
+        self.writer = MatchWriter(self.manager,
+                                  write=self.manager.update_tracks_by_key_with_youtube_matches)
+        self.queued = 0
+        self.already_matched = 0
+        self.matched = 0
+        self.not_found = 0
+        self.failed = 0
+        self.deferred = 0
+        self.quota_exhausted = False
+        self._seen: Set[str] = set()
+        self._searched: Set[str] = set()
+        self._stopped = False
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="stream-matcher", daemon=True)
+
+    @classmethod
+    def from_env(cls, manager: Optional[FalkordbManager] = None) -> "StreamingMatcher":
+        """Builds the matcher `run_match` would use: cached YouTube searches
+        behind the `YOUTUBE_*` token bucket (needs YouTube credentials)."""
+        # pylint: disable=import-outside-toplevel
+        from src.youtube.rate_limiter import TokenBucket
+        from src.youtube.search_cache import CachedVideoSearcher, SearchCache
+        from src.youtube.youtube_manager import YouTubeManager
+
+        ledger = QuotaLedger.from_env()
+        searcher = CachedVideoSearcher(YouTubeManager(ledger=ledger), SearchCache.from_env())
+        limiter = TokenBucket.from_env()
+        if limiter.daily_quota is not None:
+            # Never plan past what is left of today's (persisted) budget
+            limiter.daily_quota = min(limiter.daily_quota, ledger.remaining())
+        engine = MatchEngine(searcher, limiter=limiter)
+        return cls(engine, manager, int(os.getenv("STREAM_MATCH_BATCH_SIZE", "50")), ledger)
+
+    def start(self) -> None:
+        """Starts the writer and matcher threads."""
+        self.writer.start()
+        self._thread.start()
+
+    def submit(self, title: str, artist: str, duration_ms: int = 0, isrc: str = "") -> None:
+        """Queues a scraped song; repeats of a track already queued are ignored."""
+        key = track_key(title, artist, isrc)
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        self.queued += 1
+        self._queue.put(PendingSong(title, artist, None, duration_ms or 0, key))
+
+    def close(self) -> Dict[str, Any]:
+        """Waits until every queued song is matched and written; returns the stats."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self.writer.close()
+        if self.quota_exhausted:
+            self._defer()
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns counters for the songs seen so far."""
+        return {
+            "queued": self.queued,
+            "already_matched": self.already_matched,
+            # Matches whose write failed stay PENDING for `match`
+            "matched": self.matched - self.writer.errors,
+            "not_found": self.not_found,
+            "failed": self.failed,
+            "quota_exhausted": self.quota_exhausted,
+            "deferred": self.deferred,
+            "write_errors": self.writer.errors,
+        }
+
+    def _songs(self) -> Iterator[PendingSong]:
+        """Yields queued songs whose track has no match yet, until `close()`."""
+        while True:
+            batch: List[PendingSong] = []
+            item = self._queue.get()
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            # Set before yielding: a search error may end the loop mid-batch
+            self._stopped = item is _STOP
+            if batch:
+                known = self.manager.get_matched_track_keys([s.track_key for s in batch])
+                self.already_matched += len(known)
+                yield from (s for s in batch if s.track_key not in known)
+            if self._stopped:
+                return
+
+    def _defer(self) -> None:
+        """Moves every pending track not searched yet to the next quota window."""
+        deferred = [t.track_id for t in self.manager.iter_pending_tracks()
+                    if t.track_key not in self._searched and t.track_id is not None]
+        self.manager.defer_tracks(deferred)
+        self.deferred = len(deferred)
+        if self.ledger is not None:
+            hours = self.ledger.seconds_until_reset() / 3600
+            print(f"{len(deferred)} tracks DEFERRED until the quota resets (in {hours:.1f} h).")
+
+    def _drain(self) -> None:
+        """Discards queued songs until `close()`, so callers never block."""
+        while not self._stopped:
+            self._stopped = self._queue.get() is _STOP
+
+    def _loop(self) -> None:
+        try:
+            for result in self.engine.run(self._songs()):
+                self._searched.add(result.song.track_key)
+                if result.error:
+                    # Not searched: the track stays PENDING for `match`
+                    self.failed += 1
+                    continue
+                if not result.match:
+                    self.not_found += 1
+                    continue
+                song = result.song
+                self.writer.put({
+                    "track_key": song.track_key, "title": song.title,
+                    "artist": song.artist, "duration_ms": song.duration_ms,
+                    "video_id": result.match["video_id"], "query_used": result.query,
+                    "score": result.score,
+                })
+                self.matched += 1
+        except QuotaExhaustedError as exc:
+            self.quota_exhausted = True
+            print(str(exc))
+            self._drain()
+        except Exception as exc:  # pylint: disable=broad-except
+            print(f"Error matching while scraping: {exc}")
+            self._drain()
@@ -6,16 +6,26 @@ generated-members settings can be adjusted in pylint config if needed.
 """
 
 import os
-from typing import Optional
+import re
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urljoin
 
+import google_auth_httplib2
+import httplib2
 from dotenv import load_dotenv
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
 
 from src.youtube.interfaces import VideoSearcher
+from src.youtube.playlist_diff import PlaylistItem
+from src.youtube.quota import QuotaExceededError, QuotaLedger
+from src.youtube.rate_limiter import VIDEOS_PER_LIST_CALL
+from src.youtube.retry import QUOTA, TRANSPORT_ERRORS, RetryPolicy, classify
 
 load_dotenv()
 
@@ -27,106 +37,236 @@ SCOPES = ["https://www.googleapis.com/auth/youtube.force-ssl"]
 # Allow users to set custom paths via environment variables or .env
 CLIENT_SECRETS_FILE = os.getenv("CLIENT_SECRETS_PATH", "client_secrets.json")
 TOKEN_FILE = os.getenv("TOKEN_PATH", "token.json")
+# Alternative API root, e.g. a local stand-in server for tests and benchmarks
+API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT", "")
 
+_ISO_DURATION = re.compile(
+    r"P(?:(?P<days>\d+)D)?(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?"
+)
 
-class YouTubeManager(VideoSearcher):
-    """Implements the VideoSearcher abstract class using the YouTube Data API."""
 
-    def __init__(self) -> None:
-        self.credentials: Optional[Credentials] = None
-        self.youtube = None
-        self._authenticate()
+def parse_duration(value: str) -> int:
+    """Converts an ISO 8601 duration (`PT3M25S`) to milliseconds; 0 if unparsable."""
+    match = _ISO_DURATION.fullmatch(value or "")
+    if not match:
+        return 0
+    parts = {k: int(v or 0) for k, v in match.groupdict().items()}
+    seconds = ((parts["days"] * 24 + parts["hours"]) * 60 + parts["minutes"]) * 60 + parts["seconds"]
+    return seconds * 1000
 
-    def _authenticate(self) -> None:
-        """Authenticates the user and saves the token to a file."""
-        creds: Optional[Credentials] = None
 
-        # 1. Try to load existing token file
-        if os.path.exists(TOKEN_FILE):
+def load_credentials() -> Credentials:
+    """Returns OAuth credentials from `TOKEN_FILE`, refreshing or re-running
+    the browser consent flow as needed; a new token is saved back."""
+    creds: Optional[Credentials] = None
+
+    # 1. Try to load existing token file
+    if os.path.exists(TOKEN_FILE):
+        try:
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        except Exception:  # pylint: disable=broad-exception-caught
+            print("Old token is invalid, obtaining a new one.")
+            creds = None
+
+    # 2. If token is missing or invalid, get a new one
+    if not creds or not creds.valid:
+        if creds and creds.expired and creds.refresh_token:
             try:
-                creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+                creds.refresh(Request())
             except Exception:  # pylint: disable=broad-exception-caught
-                print("Old token is invalid, obtaining a new one.")
                 creds = None
 
-        # 2. If token is missing or invalid, get a new one
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                except Exception:  # pylint: disable=broad-exception-caught
-                    creds = None
-
-            if not creds:
-                # Redirect user to browser
-                if not os.path.exists(CLIENT_SECRETS_FILE):
-                    msg = (
-                        "Client secrets file not found. "
-                        f"Expected path: '{CLIENT_SECRETS_FILE}'. "
-                        "Please place your Google OAuth client_secrets.json file here "
-                        "or set a different path via CLIENT_SECRETS_PATH env."
-                    )
-                    raise FileNotFoundError(msg)
-
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    CLIENT_SECRETS_FILE, SCOPES
+        if not creds:
+            # Redirect user to browser
+            if not os.path.exists(CLIENT_SECRETS_FILE):
+                msg = (
+                    "Client secrets file not found. "
+                    f"Expected path: '{CLIENT_SECRETS_FILE}'. "
+                    "Please place your Google OAuth client_secrets.json file here "
+                    "or set a different path via CLIENT_SECRETS_PATH env."
                 )
-                creds = flow.run_local_server(port=0)
+                raise FileNotFoundError(msg)
 
-            # 3. Save new token to file
-            with open(TOKEN_FILE, "w", encoding="utf-8") as token:
-                token.write(creds.to_json())
+            flow = InstalledAppFlow.from_client_secrets_file(
+                CLIENT_SECRETS_FILE, SCOPES
+            )
+            creds = flow.run_local_server(port=0)
 
-        self.credentials = creds
-        self.youtube = build("youtube", "v3", credentials=creds)
+        # 3. Save new token to file
+        with open(TOKEN_FILE, "w", encoding="utf-8") as token:
+            token.write(creds.to_json())
 
-    def _api_call_with_retries(self, func, *args, **kwargs):
-        """Simple retry/backoff mechanism for HttpError.
+    return creds
 
-        - `func` must be a callable (e.g., `request.execute`).
-        - Applies exponential backoff up to 3 attempts.
-        - Retries on 5xx errors; raises other errors.
+
+class YouTubeManager(VideoSearcher):
+    """Implements the VideoSearcher abstract class using the YouTube Data API."""
+
+    def __init__(self, credentials: Optional[Credentials] = None,
+                 api_endpoint: Optional[str] = None,
+                 ledger: Optional[QuotaLedger] = None,
+                 retry: Optional[RetryPolicy] = None) -> None:
+        """Authenticates via the OAuth flow unless `credentials` are given.
+
+        `api_endpoint` (or `YOUTUBE_API_ENDPOINT`) points all calls, including
+        batches, at another API root. With a `ledger`, every call is charged
+        to the persisted daily budget and refused once it is spent. `retry`
+        defaults to `RetryPolicy.from_env()` and is shared by all threads.
         """
-        max_attempts = 3
+        self.credentials: Optional[Credentials] = None
+        # googleapiclient Resource (untyped); None until authenticated
+        self.youtube: Any = None
+        self.api_endpoint = api_endpoint or API_ENDPOINT
+        self.ledger = ledger
+        self.retry = retry or RetryPolicy.from_env()
+        self._local = threading.local()
+        if credentials is not None:
+            self.credentials = credentials
+            self.youtube = self._build(credentials)
+        else:
+            self._authenticate()
 
-        for attempt in range(1, max_attempts + 1):
-            try:
-                return func(*args, **kwargs)
-            except HttpError as http_err:
-                # Retry on Google API side 5xx errors
-                if http_err.resp.status >= 500:
-                    if attempt == max_attempts:
-                        raise
-                    continue
-                raise
-        return None
+    def _build(self, creds: Credentials):
+        """Builds the API client from the discovery document bundled with
+        `googleapiclient` (no discovery fetch), honouring `api_endpoint`."""
+        options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+        return build("youtube", "v3", credentials=creds, client_options=options,
+                     static_discovery=True, cache_discovery=False)
+
+    def _new_batch(self, callback) -> BatchHttpRequest:
+        """Creates a batch request; the discovery batch URI ignores `api_endpoint`."""
+        if self.api_endpoint:
+            return BatchHttpRequest(callback=callback,
+                                    batch_uri=urljoin(self.api_endpoint, "batch/youtube/v3"))
+        return self.youtube.new_batch_http_request(callback=callback)
+
+    def _authenticate(self) -> None:
+        """Authenticates the user and saves the token to a file."""
+        self.credentials = load_credentials()
+        self.youtube = self._build(self.credentials)
+
+    def _api_call_with_retries(self, func, *args, endpoint: str = "", calls: int = 1, **kwargs):
+        """Calls `func` (e.g. `request.execute`) under the retry policy.
+
+        - `endpoint`/`calls`: what each attempt costs (e.g. `"search.list"`);
+          charged to the ledger, which refuses calls the budget cannot cover.
+        - 5xx, rate limits and transport errors are retried with backoff (see
+          `src.youtube.retry`; transport errors only on idempotent endpoints); 403 `quotaExceeded` raises `QuotaExceededError`;
+          other errors are raised as they are.
+        """
+        def charge() -> None:
+            if self.ledger is not None and endpoint:
+                self.ledger.charge(endpoint, calls)
+
+        try:
+            return self.retry.call(func, *args, endpoint=endpoint, before_attempt=charge,
+                                   **kwargs)
+        except HttpError as http_err:
+            if classify(http_err).kind == QUOTA:
+                if self.ledger is not None:
+                    self.ledger.exhaust()
+                raise QuotaExceededError(f"YouTube quota exceeded ({endpoint}).") from http_err
+            raise
+
+    def _thread_http(self):
+        """Returns an authorized HTTP transport owned by the calling thread.
+
+        `httplib2.Http` is not thread-safe, so concurrent searches must not share
+        the transport created by `build`.
+        """
+        if self.credentials is None:
+            return None
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    def _execute(self, request):
+        """Executes a request on the thread's transport with retries."""
+        # methodId is e.g. "youtube.search.list"
+        endpoint = getattr(request, "methodId", "").split(".", 1)[-1]
+        return self._api_call_with_retries(request.execute, endpoint=endpoint,
+                                           http=self._thread_http())
 
     def search_video(self, query: str) -> Optional[dict]:
-        """Searches for a video on YouTube and returns the first result."""
+        """Searches for a video on YouTube and returns the first result.
+
+        Returns None only when the search has no results; API errors that
+        survive the retries are raised, so they are never cached as "not found".
+        """
         if not self.youtube:
             return None
 
-        try:
-            request = self.youtube.search().list(
-                part="snippet",
-                maxResults=1,
-                q=query,
-                type="video"
-            )
-            response = self._api_call_with_retries(request.execute)
-
-            if response and "items" in response and len(response["items"]) > 0:
-                item = response["items"][0]
-                return {
-                    "video_id": item["id"]["videoId"],
-                    "title": item["snippet"]["title"],
-                    "channel": item["snippet"]["channelTitle"]
-                }
-        except Exception as e:
-            print(f"Error searching for '{query}': {e}")
+        request = self.youtube.search().list(
+            part="snippet",
+            maxResults=1,
+            q=query,
+            type="video"
+        )
+        response = self._execute(request)
 
+        if response and "items" in response and len(response["items"]) > 0:
+            item = response["items"][0]
+            return {
+                "video_id": item["id"]["videoId"],
+                "title": item["snippet"]["title"],
+                "channel": item["snippet"]["channelTitle"]
+            }
         return None
 
+    def search_candidates(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """Returns up to `max_results` search results enriched with video details.
+
+        Costs one `search.list` call plus one `videos.list` call per 50 results.
+        Like `search_video`, API errors are raised rather than returned as `[]`.
+        """
+        if not self.youtube:
+            return []
+
+        request = self.youtube.search().list(
+            part="snippet",
+            maxResults=max(1, min(max_results, 50)),
+            q=query,
+            type="video"
+        )
+        response = self._execute(request) or {}
+        candidates = [
+            {
+                "video_id": item["id"]["videoId"],
+                "title": item["snippet"]["title"],
+                "channel": item["snippet"]["channelTitle"],
+            }
+            for item in response.get("items", [])
+        ]
+        details = self.get_video_details([c["video_id"] for c in candidates])
+        for candidate in candidates:
+            candidate.update(details.get(candidate["video_id"], {}))
+        return candidates
+
+    def get_video_details(self, video_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns duration and channel info per video ID, 50 IDs per `videos.list` call."""
+        details: Dict[str, Dict[str, Any]] = {}
+        if not self.youtube:
+            return details
+
+        for start in range(0, len(video_ids), VIDEOS_PER_LIST_CALL):
+            chunk = video_ids[start:start + VIDEOS_PER_LIST_CALL]
+            request = self.youtube.videos().list(
+                part="contentDetails,snippet",
+                id=",".join(chunk),
+                maxResults=len(chunk),
+            )
+            response = self._execute(request) or {}
+            for item in response.get("items", []):
+                snippet = item.get("snippet", {})
+                details[item["id"]] = {
+                    "duration_ms": parse_duration(item.get("contentDetails", {}).get("duration", "")),
+                    "channel": snippet.get("channelTitle", ""),
+                    "channel_id": snippet.get("channelId", ""),
+                }
+        return details
+
     def create_playlist(self, title: str, description: str = "") -> Optional[str]:
         """Creates a new playlist and returns its ID."""
         if not self.youtube:
@@ -145,23 +285,147 @@ class YouTubeManager(VideoSearcher):
                     }
                 }
             )
-            response = self._api_call_with_retries(request.execute)
+            response = self._execute(request)
             return response["id"]
         except Exception as e:
             print(f"Error creating playlist: {e}")
             return None
 
-    def add_video_to_playlist(self, playlist_id: str, video_id: str) -> bool:
-        """Adds a video to a playlist."""
+    def _playlist_item_insert(self, playlist_id: str, video_id: str,
+                              position: Optional[int] = None):
+        """Builds a `playlistItems.insert` request."""
+        snippet: Dict[str, Any] = {
+            "playlistId": playlist_id,
+            "resourceId": {
+                "kind": "youtube#video",
+                "videoId": video_id
+            }
+        }
+        if position is not None:
+            snippet["position"] = position
+        return self.youtube.playlistItems().insert(part="snippet", body={"snippet": snippet})
+
+    def add_video_to_playlist(self, playlist_id: str, video_id: str,
+                              position: Optional[int] = None) -> bool:
+        """Adds a video to a playlist (at `position` if given)."""
+        if not self.youtube:
+            return False
+
+        try:
+            self._execute(self._playlist_item_insert(playlist_id, video_id, position))
+            return True
+        except TRANSPORT_ERRORS as e:
+            print(f"Connection lost adding video {video_id} to playlist: {e}")
+            return self._landed_inserts(playlist_id, [video_id], position)[0]
+        except Exception as e:
+            print(f"Error adding video {video_id} to playlist: {e}")
+            return False
+
+    def add_videos_to_playlist(self, playlist_id: str, video_ids: List[str],
+                               start_position: Optional[int] = None) -> List[bool]:
+        """Adds several videos with one `BatchHttpRequest`.
+
+        Each insert carries an explicit position (when `start_position` is
+        given) so the server-side processing order cannot reorder the playlist.
+        Returns one success flag per video. A dropped connection is not
+        retried (the batch may have been applied); see `_landed_inserts`.
+        """
+        if not self.youtube or not video_ids:
+            return [False] * len(video_ids)
+        if len(video_ids) == 1:
+            return [self.add_video_to_playlist(playlist_id, video_ids[0], start_position)]
+
+        results = [False] * len(video_ids)
+
+        def on_response(request_id, _response, exception):
+            if exception is None:
+                results[int(request_id)] = True
+            else:
+                print(f"Error adding video {video_ids[int(request_id)]} to playlist: {exception}")
+
+        batch = self._new_batch(on_response)
+        for i, video_id in enumerate(video_ids):
+            position = None if start_position is None else start_position + i
+            batch.add(self._playlist_item_insert(playlist_id, video_id, position), request_id=str(i))
+        try:
+            self._api_call_with_retries(batch.execute, endpoint="playlistItems.insert",
+                                        calls=len(video_ids), http=self._thread_http())
+        except TRANSPORT_ERRORS as e:
+            print(f"Connection lost executing playlist batch: {e}")
+            return self._landed_inserts(playlist_id, video_ids, start_position)
+        except Exception as e:
+            print(f"Error executing playlist batch: {e}")
+        return results
+
+    def _landed_inserts(self, playlist_id: str, video_ids: List[str],
+                        start_position: Optional[int]) -> List[bool]:
+        """Re-lists the playlist after a dropped insert and reports which videos
+        sit at their intended positions.
+
+        Unpositioned inserts cannot be told apart from existing items and
+        count as failed.
+        """
+        if start_position is None:
+            return [False] * len(video_ids)
+        try:
+            at = {item.position: item.video_id for item in self.list_playlist_items(playlist_id)}
+        except Exception as e:  # pylint: disable=broad-except
+            print(f"Error listing playlist {playlist_id}: {e}")
+            return [False] * len(video_ids)
+        return [at.get(start_position + i) == video_id for i, video_id in enumerate(video_ids)]
+
+    def list_playlist_items(self, playlist_id: str) -> List[PlaylistItem]:
+        """Returns all items of a playlist, paging 50 at a time (1 unit per page)."""
+        if not self.youtube:
+            return []
+
+        items: List[PlaylistItem] = []
+        page_token = None
+        while True:
+            request = self.youtube.playlistItems().list(
+                part="snippet",
+                playlistId=playlist_id,
+                maxResults=50,
+                pageToken=page_token,
+            )
+            response = self._execute(request) or {}
+            for item in response.get("items", []):
+                snippet = item["snippet"]
+                items.append(PlaylistItem(
+                    item_id=item["id"],
+                    video_id=snippet["resourceId"]["videoId"],
+                    position=snippet.get("position", len(items)),
+                ))
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return items
+
+    def delete_playlist_item(self, item_id: str) -> bool:
+        """Removes an item from a playlist."""
+        if not self.youtube:
+            return False
+
+        try:
+            self._execute(self.youtube.playlistItems().delete(id=item_id))
+            return True
+        except Exception as e:
+            print(f"Error deleting playlist item {item_id}: {e}")
+            return False
+
+    def move_playlist_item(self, item_id: str, playlist_id: str, video_id: str,
+                           position: int) -> bool:
+        """Moves an existing playlist item to `position`."""
         if not self.youtube:
             return False
 
         try:
-            request = self.youtube.playlistItems().insert(
+            request = self.youtube.playlistItems().update(
                 part="snippet",
                 body={
+                    "id": item_id,
                     "snippet": {
                         "playlistId": playlist_id,
+                        "position": position,
                         "resourceId": {
                             "kind": "youtube#video",
                             "videoId": video_id
@@ -169,8 +433,8 @@ class YouTubeManager(VideoSearcher):
                     }
                 }
             )
-            self._api_call_with_retries(request.execute)
+            self._execute(request)
             return True
         except Exception as e:
-            print(f"Error adding video {video_id} to playlist: {e}")
+            print(f"Error moving playlist item {item_id}: {e}")
             return False
@@ -1,10 +1,12 @@
 # sync_cli.py
+# Heavy modules (FalkorDB client, Google API client) are imported inside the
+# commands that need them, so `--help` and the menu start instantly.
+import contextlib
+import json
+import os
 import sys
 import subprocess
 import click
-from datetime import datetime
-from src.db.falkordb_manager import db_manager 
-from src.youtube.youtube_manager import YouTubeManager 
 
 # Windows freeze fix
 if sys.platform == "win32":
@@ -14,7 +16,151 @@ if sys.platform == "win32":
         sys.stdout.reconfigure(encoding='utf-8')
     except: pass
 
-@click.command()
+# pylint: disable=import-outside-toplevel
+
+
+def _db():
+    """Returns the shared database manager, importing it on first use."""
+    from src.db.falkordb_manager import db_manager
+    return db_manager
+
+
+class _NullBar:
+    """Progress bar stand-in used for JSON output."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def update(self, _steps):
+        pass
+
+
+def _json_mode():
+    ctx = click.get_current_context(silent=True)
+    return bool(ctx and ctx.find_root().obj and ctx.find_root().obj.get("json"))
+
+
+def _say(message):
+    """Prints a human-readable line (suppressed with --json)."""
+    if not _json_mode():
+        click.echo(message)
+
+
+def _progress(length, label):
+    return _NullBar() if _json_mode() else click.progressbar(length=length, label=label)
+
+
+def _finish(payload):
+    """Writes the command result as JSON when --json is set."""
+    root = click.get_current_context().find_root().obj or {}
+    if root.get("json"):
+        click.echo(json.dumps(payload, default=str), file=root["stdout"])
+    return payload
+
+
+def _write_trace(path, prometheus_path):
+    from src.telemetry.tracing import tracer
+
+    tracer.write_report(path)
+    if prometheus_path:
+        tracer.write_prometheus(prometheus_path)
+
+
+def _scrape_trace_path():
+    """Report file for the scraper subprocess, next to the --trace file."""
+    root = click.get_current_context(silent=True)
+    trace = root and (root.find_root().obj or {}).get("trace")
+    if not trace:
+        return None
+    stem, ext = os.path.splitext(trace)
+    return f"{stem}.scrape{ext or '.json'}"
+
+
+@click.group(invoke_without_command=True)
+@click.option("--json", "as_json", is_flag=True,
+              help="Print one JSON result per command instead of text (for scripts and cron).")
+@click.option("--trace", type=click.Path(dir_okay=False),
+              help="Write per-stage timings (p50/p95/p99, counts) to this JSON file.")
+@click.option("--prometheus", type=click.Path(dir_okay=False),
+              help="With --trace, also write the timings in Prometheus text format.")
+@click.pass_context
+def cli(ctx, as_json, trace, prometheus):
+    """Spotify -> YouTube sync. Without a command, opens the interactive menu."""
+    ctx.obj = {"json": as_json, "stdout": sys.stdout, "trace": trace}
+    if as_json:
+        # Library prints go to stderr so stdout holds only the JSON result.
+        ctx.with_resource(contextlib.redirect_stdout(sys.stderr))
+    if trace:
+        from src.telemetry.tracing import tracer
+        tracer.enable()
+        ctx.call_on_close(lambda: _write_trace(trace, prometheus))
+    if ctx.invoked_subcommand is None:
+        main_menu()
+
+
+@cli.command(context_settings={"ignore_unknown_options": True})
+@click.argument("runner_args", nargs=-1, type=click.UNPROCESSED)
+@click.pass_context
+def scrape(ctx, runner_args):
+    """Scrape playlists: URLs and options are passed to `src.scraper.runner`."""
+    result = _finish(run_scrape(list(runner_args)))
+    if not result["ok"]:
+        ctx.exit(1)
+
+
+@cli.command()
+@click.option("--workers", type=int, default=None, help="Concurrent searches (MATCH_WORKERS).")
+@click.option("--candidates", type=int, default=None, help="Candidates per search (MATCH_CANDIDATES).")
+def match(workers, candidates):
+    """Match pending tracks to YouTube videos."""
+    _finish(run_match(workers=workers, candidates=candidates))
+
+
+@cli.command()
+@click.option("--candidates", type=int, default=None, help="Candidates per search (MATCH_CANDIDATES).")
+def plan(candidates):
+    """Estimate the quota a match + create would cost against today's budget."""
+    _finish(run_plan(candidates=candidates))
+
+
+@cli.command()
+def create():
+    """Create or update one YouTube playlist per scraped playlist."""
+    _finish(run_create_playlist())
+
+
+@cli.command(context_settings={"ignore_unknown_options": True})
+@click.argument("runner_args", nargs=-1, type=click.UNPROCESSED)
+@click.pass_context
+def sync(ctx, runner_args):
+    """Scrape, match and create in one go (URLs/options as for `scrape`; add --match to
+    match while scraping)."""
+    result = {"scrape": run_scrape(list(runner_args))}
+    if result["scrape"]["ok"]:
+        result["match"] = run_match()
+        result["create"] = run_create_playlist()
+    _finish(result)
+    if not result["scrape"]["ok"]:
+        ctx.exit(1)
+
+
+@cli.command()
+@click.option("--yes", is_flag=True, help="Do not ask for confirmation.")
+@click.pass_context
+def clean(ctx, yes):
+    """Delete scraped playlist data (the track catalog is kept)."""
+    if not yes and not click.confirm('All data will be deleted. Are you sure?'):
+        _finish({"cleared": False})
+        return
+    cleared = _db().clear_database()
+    _finish({"cleared": cleared})
+    if not cleared:
+        ctx.exit(1)
+
+
 def main_menu():
     """Spotify Sync Tool - Main Menu"""
     while True:
@@ -29,18 +175,12 @@ def main_menu():
             click.echo("4. Clean (Reset DB)")
             click.echo("0. Exit")
             click.echo("-" * 50)
-            
+
             choice = click.prompt("Your Choice", type=str)
 
             if choice == '1':
-                url = click.prompt("👉 Spotify Link", type=str)
-                click.echo(f"\n🚀 Starting scraping process...")
-                try:
-                    # Run scraping as a separate process (Prevents freezing)
-                    subprocess.run([sys.executable, "-m", "src.scraper.runner", url], check=True)
-                    click.echo("\n✅ Scraping completed.")
-                except subprocess.CalledProcessError:
-                    click.echo("\n❌ Error during scraping.")
+                urls = click.prompt("👉 Spotify Link(s) (separate with spaces)", type=str).split()
+                run_scrape(urls)
                 click.pause(info="Press any key to continue...")
 
             elif choice == '2':
@@ -50,11 +190,11 @@ def main_menu():
             elif choice == '3':
                 run_create_playlist()
                 if click.confirm('Do you want to delete temporary data?', default=True):
-                    db_manager.clear_database()
+                    _db().clear_database()
                 click.pause(info="Press any key to continue...")
 
             elif choice == '4':
-                if click.confirm('All data will be deleted. Are you sure?'): db_manager.clear_database()
+                if click.confirm('All data will be deleted. Are you sure?'): _db().clear_database()
                 click.pause()
 
             elif choice == '0':
@@ -63,60 +203,230 @@ def main_menu():
             click.echo(f"Error: {e}")
             click.pause()
 
-def run_match():
-    click.echo("\n🔄 YouTube matching started...")
-    pending_songs = db_manager.find_pending_songs()
-    
-    if not pending_songs:
-        click.echo("ℹ️ No songs to match.")
-        return
+def run_scrape(runner_args):
+    _say("\n🚀 Starting scraping process...")
+    # Run scraping as a separate process (Prevents freezing);
+    # all playlists share one browser in that process
+    env = dict(os.environ)
+    trace_path = _scrape_trace_path()
+    if trace_path:
+        # The crawl runs in its own process and writes its own report
+        env["TRACE_REPORT"] = trace_path
+    completed = subprocess.run([sys.executable, "-m", "src.scraper.runner", *runner_args],
+                               check=False, stdout=sys.stderr if _json_mode() else None, env=env)
+    ok = completed.returncode == 0
+    _say("\n✅ Scraping completed." if ok else "\n❌ Error during scraping.")
+    return {"ok": ok, "returncode": completed.returncode}
+
+def run_match(workers=None, candidates=None):
+    from src.db.match_writer import MatchWriter
+    from src.youtube.match_engine import MatchEngine
+    from src.youtube.quota import QuotaLedger, plan_sync
+    from src.youtube.rate_limiter import QuotaExhaustedError, TokenBucket
+    from src.youtube.retry import CircuitOpenError
+    from src.youtube.search_cache import CachedVideoSearcher, SearchCache
+    from src.youtube.youtube_manager import YouTubeManager
+
+    db_manager = _db()
+    _say("\n🔄 YouTube matching started...")
+    # One search per unique track, however many playlists contain it
+    pending = db_manager.count_pending_tracks()
+    summary = {"pending": pending, "matched": 0, "not_found": [], "failed": [],
+               "low_confidence": [], "quota_exhausted": False, "deferred": 0, "write_errors": 0}
+
+    if not pending:
+        _say("ℹ️ No songs to match.")
+        return summary
+    _say(f"{pending} unique tracks to match.")
+
+    ledger = QuotaLedger.from_env()
+    cache = SearchCache.from_env()
+    if os.getenv("YOUTUBE_CLIENT", "") == "async":
+        # One pooled HTTP session for all workers instead of a transport per thread
+        from src.youtube.async_searcher import AsyncVideoSearcher
+        api = AsyncVideoSearcher.from_env(ledger=ledger)
+    else:
+        api = YouTubeManager(ledger=ledger)
+    youtube = CachedVideoSearcher(api, cache)
+    limiter = TokenBucket.from_env()
+    # Never plan past what is left of today's (persisted) budget
+    limiter.daily_quota = min(limiter.daily_quota, ledger.remaining())
+    engine = MatchEngine(youtube, limiter=limiter, workers=workers, candidates=candidates)
+    plan = plan_sync(pending, ledger.remaining(), engine.candidates)
+    summary["plan"] = {"search_units": plan.search_units, "remaining": plan.remaining,
+                       "affordable_tracks": plan.affordable_tracks}
+    if plan.deferred_tracks:
+        _say(f"⏳ Today's quota covers about {plan.affordable_tracks} new searches "
+             f"({plan.remaining} units left); cached tracks are free, the rest is deferred.")
+    min_score = float(os.getenv("MATCH_MIN_SCORE", "0.5"))
+    done = set()
 
-    youtube = YouTubeManager()
-    success_count = 0
-    not_found_list = []
-    
-    with click.progressbar(pending_songs, label='Processing') as bar:
-        for song in bar:
-            query = f"{song['title']} {song['artist']}"
-            match = youtube.search_video(query)
-            if match:
-                db_manager.update_song_with_youtube_match(song['song_id'], match['video_id'], query)
-                success_count += 1
-            else:
-                not_found_list.append(f"{song['title']} - {song['artist']}")
-
-    click.echo(f"\n✨ Total {success_count} songs matched successfully.")
-    if not_found_list:
-        click.echo("\n⚠️ NOT FOUND:")
-        for item in not_found_list: click.echo(f" ❌ {item}")
+    # DB writes happen on a background thread in batches
+    with MatchWriter(db_manager) as writer, _progress(pending, 'Processing') as bar:
+        try:
+            # Tracks are read page by page while the first pages are already
+            # being searched; results arrive in catalog order
+            for result in engine.run(db_manager.iter_pending_tracks()):
+                song = result.song
+                done.add(song.track_id)
+                if result.error:
+                    # Not searched (e.g. API error): stays PENDING for the next run
+                    summary["failed"].append(f"{song.title} - {song.artist}: {result.error}")
+                elif result.match:
+                    writer.submit(song.track_id, result.match['video_id'], result.query, result.score)
+                    summary["matched"] += 1
+                    if result.score is not None and result.score < min_score:
+                        summary["low_confidence"].append(
+                            f"{song.title} - {song.artist} → {result.match['title']} ({result.score:.2f})"
+                        )
+                else:
+                    summary["not_found"].append(f"{song.title} - {song.artist}")
+                bar.update(1)
+        except QuotaExhaustedError as e:
+            summary["quota_exhausted"] = True
+            _say(f"\n⛔ {e}")
+        except CircuitOpenError as e:
+            # The API keeps failing: stop; unsearched tracks stay PENDING
+            _say(f"\n⛔ {e}")
+
+    # Only matches that reached the graph count; the others stay PENDING
+    summary["matched"] = writer.written
+    summary["write_errors"] = writer.errors
+    if writer.errors:
+        _say(f"⚠️ {writer.errors} matches could not be saved; they are searched "
+             "again (from the cache) on the next run.")
+
+    if summary["quota_exhausted"]:
+        # Everything not searched yet moves to the next quota window
+        deferred = [t.track_id for t in db_manager.iter_pending_tracks() if t.track_id not in done]
+        db_manager.defer_tracks(deferred)
+        summary["deferred"] = len(deferred)
+        _say(f"⏳ {len(deferred)} tracks DEFERRED until the quota resets "
+             f"(in {ledger.seconds_until_reset() / 3600:.1f} h).")
+
+    _say(f"\n✨ Total {summary['matched']} songs matched successfully.")
+    stats = cache.stats()
+    cache.close()
+    summary["cache"] = stats
+    summary["quota_spent"] = limiter.units_spent
+    summary["quota_remaining"] = ledger.remaining()
+    summary["retries"] = api.retry.stats()
+    if hasattr(api, "close"):
+        api.close()
+    ledger.close()
+    summary["db_pool"] = db_manager.pool_stats()
+    _say(
+        f"💾 Cache: {stats['hits']} hits, {stats['misses']} misses, "
+        f"{stats['quota_saved']} quota units saved "
+        f"({stats['lifetime_quota_saved']} total)."
+    )
+    pool = summary["db_pool"]
+    if pool:
+        _say(f"🗄️ DB pool: peak {pool['max_in_use']}/{pool['max_connections']} connections, "
+             f"avg wait {pool['wait_ms_avg']:.1f} ms.")
+    retries = summary["retries"]
+    if retries["retries"] or retries["rejected"]:
+        _say(f"🔁 API: {retries['retries']} retries ({retries['backoff_s']:.1f} s backoff), "
+             f"{retries['circuit_opened']} pauses, {retries['gave_up']} calls failed.")
+    if summary["not_found"]:
+        _say("\n⚠️ NOT FOUND:")
+        for item in summary["not_found"]: _say(f" ❌ {item}")
+    if summary["failed"]:
+        _say("\n⚠️ SEARCH FAILED (retried on the next run):")
+        for item in summary["failed"]: _say(f" ❗ {item}")
+    if summary["low_confidence"]:
+        _say("\n🔍 LOW CONFIDENCE (check these matches):")
+        for item in summary["low_confidence"]: _say(f" ⚠️ {item}")
+    return summary
+
+def run_plan(candidates=None):
+    from src.youtube.quota import QuotaLedger, plan_sync
+
+    db_manager = _db()
+    candidates = min(50, max(1, candidates or int(os.getenv("MATCH_CANDIDATES", "5"))))
+    # Inserts are counted for songs matched already; new matches add to them
+    sources = [source for source, _ in db_manager.get_playlists()]
+    inserts = sum(len(db_manager.get_pending_inserts(source)) for source in sources)
+    new_playlists = sum(1 for source in sources if not db_manager.get_sync_target(source))
+    ledger = QuotaLedger.from_env()
+    estimate = plan_sync(db_manager.count_pending_tracks(), ledger.remaining(), candidates,
+                         inserts=inserts, new_playlists=new_playlists)
+    result = {
+        "tracks": estimate.tracks, "search_units": estimate.search_units,
+        "inserts": estimate.inserts, "insert_units": estimate.insert_units,
+        "total_units": estimate.total_units, "remaining": estimate.remaining,
+        "affordable_tracks": estimate.affordable_tracks, "fits": estimate.fits,
+        "spent_today": ledger.by_endpoint(),
+        "resets_in_hours": round(ledger.seconds_until_reset() / 3600, 2),
+    }
+    ledger.close()
+    _say(f"Matching {estimate.tracks} tracks: up to {estimate.search_units} units "
+         f"(cache hits are free).")
+    _say(f"Creating/inserting {estimate.inserts} videos: {estimate.insert_units} units.")
+    _say(f"Budget left today: {estimate.remaining} units, resets in {result['resets_in_hours']} h.")
+    _say("✅ Fits today's quota." if estimate.fits else
+         f"⏳ About {estimate.affordable_tracks} tracks fit today; the rest will be deferred.")
+    return result
 
 def run_create_playlist():
-    video_ids = db_manager.get_all_matched_video_ids()
-    if not video_ids:
-        click.echo("❌ No videos to add.")
-        return
+    from src.youtube.quota import QuotaLedger
+    from src.youtube.youtube_manager import YouTubeManager
 
-    try:
-        youtube = YouTubeManager()
-        # Logic to create playlist would go here (not fully implemented in previous context, but keeping structure)
-        # Assuming youtube_manager has create_playlist and add_video_to_playlist
-        
-        playlist_name = db_manager.get_playlist_name()
-        click.echo(f"Creating playlist: {playlist_name}")
-        
-        playlist_id = youtube.create_playlist(playlist_name, "Created by Spotify-Youtube Sync")
-        
-        if playlist_id:
-            click.echo(f"Playlist created with ID: {playlist_id}")
-            with click.progressbar(video_ids, label='Adding videos') as bar:
-                for vid in bar:
-                    youtube.add_video_to_playlist(playlist_id, vid)
-            click.echo("✅ Playlist creation completed.")
-        else:
-            click.echo("❌ Failed to create playlist.")
+    playlists = _db().get_playlists()
+    if not playlists:
+        _say("❌ No videos to add.")
+        return []
 
+    results = []
+    try:
+        # Inserts beyond today's budget are refused; Create resumes them later
+        youtube = YouTubeManager(ledger=QuotaLedger.from_env())
+        # One YouTube playlist per scraped Spotify source
+        for source, playlist_name in playlists:
+            results.append(create_playlist_for_source(youtube, source, playlist_name))
     except Exception as e:
-        click.echo(f"Error: {e}")
+        _say(f"Error: {e}")
+        results.append({"error": str(e)})
+    return results
+
+def create_playlist_for_source(youtube, source, playlist_name):
+    from src.youtube.playlist_writer import PlaylistWriter
+
+    db_manager = _db()
+    result = {"source": source, "name": playlist_name}
+    pending = db_manager.get_pending_inserts(source)
+    if not pending:
+        _say(f"❌ No videos to add for {playlist_name}.")
+        return result
+
+    if db_manager.get_sync_target(source):
+        _say(f"Updating existing playlist: {playlist_name}")
+    else:
+        _say(f"Creating playlist: {playlist_name}")
+    # Resumes an interrupted run, or applies only the diff to a playlist synced before
+    writer = PlaylistWriter(youtube, db_manager)
+    with _progress(len(pending), 'Adding videos') as bar:
+        report = writer.sync(source, playlist_name, on_progress=bar.update)
+
+    result.update(playlist_id=report.playlist_id, inserted=report.inserted,
+                  failed=report.failed, already_inserted=report.already_inserted,
+                  moved=report.moved, deleted=report.deleted,
+                  seconds=round(report.seconds, 3))
+    if not report.playlist_id:
+        _say("❌ Failed to create playlist.")
+        return result
+
+    _say(f"Playlist ID: {report.playlist_id}")
+    _say(
+        f"Inserted {report.inserted} videos ({report.inserts_per_second:.1f}/s), "
+        f"{report.already_inserted} already present, "
+        f"{report.moved} moved, {report.deleted} removed."
+    )
+    if report.failed:
+        _say("⚠️ Stopped after a failed insert; run Create again to resume.")
+    else:
+        _say("✅ Playlist creation completed.")
+    return result
 
 if __name__ == "__main__":
-    main_menu()
+    cli()
@@ -0,0 +1,92 @@
+"""Tests for AsyncVideoSearcher against the local FakeYouTube server."""
+
+import asyncio
+import json
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from benchmarks.fake_youtube import FakeYouTube
+from src.youtube.async_searcher import AsyncVideoSearcher
+from src.youtube.quota import QuotaExceededError, QuotaLedger
+from src.youtube.retry import RetryPolicy
+
+class _RefreshingCredentials:
+    """Stands in for OAuth credentials whose refresh yields a new token."""
+
+    def __init__(self, token, new_token):
+        self.token = token
+        self.new_token = new_token
+        self.refresh_token = "refresh"
+        self.valid = True
+
+    def refresh(self, _request):
+        self.token = self.new_token
+
+    def to_json(self):
+        return json.dumps({"token": self.token})
+
+def _searcher(fake, credentials=None, **kwargs):
+    return AsyncVideoSearcher(credentials=credentials or Credentials(token="test"),
+                              api_endpoint=fake.url, token_file=None,
+                              retry=RetryPolicy(base=0.001, cap=0.01), **kwargs)
+
+def test_sync_methods_search_and_write():
+    """The VideoSearcher methods work from plain (worker) threads."""
+    with FakeYouTube(seed=1) as fake:
+        searcher = _searcher(fake)
+        try:
+            assert searcher.search_video("Song Artist")["title"] == "Song Artist"
+            candidates = searcher.search_candidates("Song Artist", max_results=3)
+            playlist_id = searcher.create_playlist("Mix")
+            assert searcher.add_video_to_playlist(playlist_id, candidates[0]["video_id"])
+        finally:
+            searcher.close()
+
+    assert len(candidates) == 3 and all(c["duration_ms"] > 0 for c in candidates)
+    assert fake.stats()["calls"] == {"search.list": 2, "videos.list": 1,
+                                     "playlists.insert": 1, "playlistItems.insert": 1}
+
+def test_many_searches_share_one_loop_and_pool():
+    """Concurrent searches on the caller's loop come back in query order."""
+    async def run(searcher):
+        try:
+            return await searcher.asearch_many([f"song {i}" for i in range(40)])
+        finally:
+            await searcher.aclose()
+
+    with FakeYouTube(latency=0.01, error_rate=0.2, seed=4) as fake:
+        results = asyncio.run(run(_searcher(fake, concurrency=10)))
+
+    assert [r["title"] for r in results] == [f"song {i}" for i in range(40)]
+    assert fake.errors_injected > 0
+
+def test_rejected_token_is_refreshed_once(tmp_path):
+    """A 401 refreshes the token once for all requests and saves it."""
+    credentials = _RefreshingCredentials("old", "new")
+    token_file = tmp_path / "token.json"
+    with FakeYouTube(token="new") as fake:
+        searcher = _searcher(fake, credentials)
+        searcher.token_file = str(token_file)
+        try:
+            results = searcher.search_many(["a", "b", "c", "d"])
+        finally:
+            searcher.close()
+
+    assert all(results)
+    assert searcher.refreshes == 1
+    assert json.loads(token_file.read_text()) == {"token": "new"}
+
+def test_quota_exhaustion_raises_and_spends_ledger(tmp_path):
+    """403 quotaExceeded stops the run instead of looking like "not found"."""
+    ledger = QuotaLedger(str(tmp_path / "quota.sqlite3"), daily_quota=10_000)
+    with FakeYouTube(quota=150) as fake:
+        searcher = _searcher(fake, ledger=ledger)
+        try:
+            assert searcher.search_video("first") is not None
+            with pytest.raises(QuotaExceededError):
+                searcher.search_video("second")
+        finally:
+            searcher.close()
+
+    assert ledger.remaining() == 0
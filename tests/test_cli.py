@@ -0,0 +1,117 @@
+"""Unit tests for the non-interactive CLI."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+from google.oauth2.credentials import Credentials
+
+import sync_cli
+from benchmarks.fake_graph import InMemoryGraphManager
+from benchmarks.fake_youtube import FakeYouTube
+from src.telemetry.tracing import tracer
+from src.youtube import youtube_manager
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def test_help_does_not_import_heavy_modules():
+    """--help starts without loading the FalkorDB or Google API clients."""
+    code = (
+        "import sys, runpy; sys.argv = ['sync_cli.py', '--help']\n"
+        "try:\n    runpy.run_path('sync_cli.py', run_name='__main__')\n"
+        "except SystemExit:\n    pass\n"
+        "print([m for m in ('falkordb', 'googleapiclient') if m in sys.modules])"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                               capture_output=True, text=True, check=True)
+    assert completed.stdout.strip().splitlines()[-1] == "[]"
+
+def test_clean_prints_json():
+    """`--json clean --yes` prints a single JSON result on stdout."""
+    manager = MagicMock()
+    manager.clear_database.return_value = True
+    with patch("sync_cli._db", return_value=manager):
+        result = CliRunner().invoke(sync_cli.cli, ["--json", "clean", "--yes"])
+
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {"cleared": True}
+
+def test_clean_fails_without_database():
+    """A failed clear exits non-zero for cron jobs."""
+    manager = MagicMock()
+    manager.clear_database.return_value = False
+    with patch("sync_cli._db", return_value=manager):
+        result = CliRunner().invoke(sync_cli.cli, ["--json", "clean", "--yes"])
+
+    assert result.exit_code == 1
+    assert json.loads(result.output) == {"cleared": False}
+
+def test_trace_writes_reports(tmp_path):
+    """`--trace`/`--prometheus` record the command's spans and write both reports."""
+    manager = MagicMock()
+    manager.clear_database.side_effect = lambda: tracer.observe("db.query", 0.01, "clear")
+    trace, prom = tmp_path / "trace.json", tmp_path / "trace.prom"
+    try:
+        with patch("sync_cli._db", return_value=manager):
+            result = CliRunner().invoke(sync_cli.cli, ["--trace", str(trace), "--prometheus",
+                                                       str(prom), "clean", "--yes"])
+    finally:
+        tracer.disable()
+        tracer.reset()
+
+    assert result.exit_code == 1  # the mock reports nothing cleared
+    assert json.loads(trace.read_text())["spans"]["db.query[clear]"]["count"] == 1
+    assert 'span="db.query",label="clear"' in prom.read_text()
+
+def test_match_defers_tracks_when_quota_runs_out(tmp_path, monkeypatch):
+    """Tracks left when the quota runs out are DEFERRED, not errored."""
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("YOUTUBE_QUOTA_LEDGER_PATH", str(tmp_path / "quota.sqlite3"))
+    graph = InMemoryGraphManager()
+    graph.save_songs_batch([{"title": f"Song {i}", "artist": "A", "index": i} for i in range(4)])
+
+    with FakeYouTube(quota=250, seed=1) as fake:
+        real = youtube_manager.YouTubeManager
+
+        def factory(ledger):
+            return real(credentials=Credentials(token="t"), api_endpoint=fake.url, ledger=ledger)
+
+        with patch("sync_cli._db", return_value=graph), \
+                patch.object(youtube_manager, "YouTubeManager", side_effect=factory):
+            result = CliRunner().invoke(sync_cli.cli, ["--json", "match", "--workers", "1",
+                                                       "--candidates", "1"])
+
+    summary = json.loads(result.output)
+    assert summary["matched"] == 2
+    assert summary["quota_exhausted"] is True
+    assert summary["deferred"] == 2
+    assert summary["quota_remaining"] == 0
+    statuses = sorted(t["match_status"] for t in graph.tracks.values())
+    assert statuses == ["DEFERRED", "DEFERRED", "MATCHED", "MATCHED"]
+    assert graph.count_pending_tracks() == 2
+
+def test_match_reports_matches_that_were_not_saved(tmp_path, monkeypatch):
+    """Matches lost to database errors are reported, not counted as matched."""
+    monkeypatch.setenv("SEARCH_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setenv("YOUTUBE_QUOTA_LEDGER_PATH", str(tmp_path / "quota.sqlite3"))
+    graph = InMemoryGraphManager()
+    graph.save_songs_batch([{"title": f"Song {i}", "artist": "A", "index": i} for i in range(2)])
+    graph.update_tracks_with_youtube_matches = MagicMock(side_effect=Exception("down"))
+
+    with FakeYouTube(seed=1) as fake:
+        real = youtube_manager.YouTubeManager
+
+        def factory(ledger):
+            return real(credentials=Credentials(token="t"), api_endpoint=fake.url, ledger=ledger)
+
+        with patch("sync_cli._db", return_value=graph), \
+                patch.object(youtube_manager, "YouTubeManager", side_effect=factory):
+            result = CliRunner().invoke(sync_cli.cli, ["--json", "match", "--workers", "1",
+                                                       "--candidates", "1"])
+
+    summary = json.loads(result.stdout)  # the writer error goes to stderr
+    assert (summary["matched"], summary["write_errors"]) == (0, 2)
+    assert graph.count_pending_tracks() == 2
@@ -1,13 +1,23 @@
 """Unit tests for FalkorDB Manager (Mocked)."""
 
+import os
+import threading
 from unittest.mock import MagicMock, patch
 import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
 from src.db.falkordb_manager import FalkordbManager
+from src.db.pool import InstrumentedConnectionPool
+from src.db.queries import QUERIES
+from src.db.schema import SCHEMA_VERSION, ensure_schema
+from src.models.normalize import track_key
 
 @pytest.fixture
 def mock_falkordb():
     """Mocks the FalkorDB connection."""
-    with patch('src.db.falkordb_manager.FalkorDB') as mock_db_cls:
+    with patch('falkordb.FalkorDB') as mock_db_cls, \
+            patch('src.db.schema.ensure_schema'), \
+            patch('src.db.falkordb_manager._server_reachable'):
+        FalkordbManager.close()
         mock_instance = MagicMock()
         mock_db_cls.return_value = mock_instance
         mock_instance.select_graph.return_value = MagicMock()
@@ -24,16 +34,8 @@ def test_singleton_pattern(mock_falkordb): # pylint: disable=unused-argument
     assert manager1.graph is not None
     assert manager1.graph == manager2.graph
 
-def test_sanitize_string():
-    """Test the string sanitization helper."""
-    manager = FalkordbManager()
-    # pylint: disable=protected-access
-    assert manager._sanitize("O'Reilly") == "O\\'Reilly"
-    assert manager._sanitize("Normal String") == "Normal String"
-    assert manager._sanitize("") == ""
-
 def test_save_song_info(mock_falkordb): # pylint: disable=unused-argument
-    """Test saving a song generates the correct query."""
+    """Test saving a song sends a constant template with parameters."""
     FalkordbManager._instance = None
     manager = FalkordbManager()
     manager._instance = MagicMock() # Force mock graph
@@ -43,7 +45,174 @@ def test_save_song_info(mock_falkordb): # pylint: disable=unused-argument
     # Verify query was called
     manager.graph.query.assert_called_once()
     args, _ = manager.graph.query.call_args
-    query = args[0]
+    query, params = args
     
-    assert "MERGE (s:Song {title: 'Test Song', artist: 'Test Artist'})" in query
-    assert "MERGE (art:Artist {name: 'Test Artist'})" in query
+    assert "MERGE (s:Song {source: r.source, title: r.title, artist: r.artist})" in query
+    assert "MERGE (art:Artist {name: r.artist})" in query
+    assert params["rows"] == [{
+        "title": "Test Song", "artist": "Test Artist", "index": 0,
+        "source": "", "album": "", "duration_ms": 0, "isrc": "",
+        "track_key": "name:test song|test artist",
+    }]
+
+def test_special_characters_are_not_inlined(mock_falkordb): # pylint: disable=unused-argument
+    """Quotes and backslashes travel as parameters, so the query text is constant."""
+    FalkordbManager._instance = None
+    manager = FalkordbManager()
+    manager._instance = MagicMock()
+
+    manager.save_song_info("O'Reilly \\ Blues", "Artist")
+    manager.save_song_info("Other Song", "Artist")
+
+    first, second = manager.graph.query.call_args_list
+    assert first.args[0] == second.args[0]
+    assert "O'Reilly" not in first.args[0]
+    assert first.args[1]["rows"][0]["title"] == "O'Reilly \\ Blues"
+
+def test_ensure_schema_applies_pending_migrations():
+    """Migrations run once and record the schema version."""
+    graph = MagicMock()
+    graph.query.return_value.result_set = []
+
+    assert ensure_schema(graph) == SCHEMA_VERSION
+
+    graph.create_node_range_index.assert_any_call("Track", "match_status")
+    # v4 moved match status to tracks: the Song index is dropped again
+    graph.drop_node_range_index.assert_called_once_with("Song", "match_status")
+    graph.create_node_unique_constraint.assert_any_call("Artist", "name")
+    _, params = graph.query.call_args.args
+    assert params == {"version": SCHEMA_VERSION}
+
+    graph.reset_mock()
+    graph.query.return_value.result_set = [[SCHEMA_VERSION]]
+    ensure_schema(graph)
+    graph.create_node_range_index.assert_not_called()
+    graph.drop_node_range_index.assert_not_called()
+
+def test_ensure_schema_ignores_existing_indexes():
+    """Re-creating an existing index is not an error."""
+    graph = MagicMock()
+    graph.query.return_value.result_set = []
+    graph.create_node_range_index.side_effect = Exception("Attribute 'x' is already indexed")
+
+    assert ensure_schema(graph) == SCHEMA_VERSION
+
+def test_bulk_match_update_uses_single_query(mock_falkordb): # pylint: disable=unused-argument
+    """A batch of matches is written with one UNWIND query."""
+    FalkordbManager._instance = None
+    manager = FalkordbManager()
+
+    manager.update_tracks_with_youtube_matches([(1, "a", "q1", 0.9), (2, "b", "q2", None)])
+
+    manager.graph.query.assert_called_once()
+    query, params = manager.graph.query.call_args.args
+    assert query.strip().startswith("UNWIND $rows AS r")
+    assert params["rows"][0] == {"track_id": 1, "video_id": "a", "query_used": "q1", "score": 0.9}
+
+def test_track_key_prefers_isrc():
+    """Tracks are identified by ISRC when known, else by normalized title and artist."""
+    assert track_key("Song (feat. X)", "Artist", " usum71703861 ") == "isrc:USUM71703861"
+    assert track_key("Song (feat. X)", "ARTIST") == track_key("song ft x", "artist")
+
+def test_playlist_entries_share_tracks(mock_falkordb): # pylint: disable=unused-argument
+    """The same recording in two playlists links to one Track, which outlives a clear."""
+    FalkordbManager._instance = None
+    manager = FalkordbManager()
+
+    manager.save_songs_batch([
+        {"title": "Song", "artist": "Artist", "index": 1, "source": "playlist:a"},
+        {"title": "Song", "artist": "Artist", "index": 7, "source": "playlist:b"},
+    ])
+
+    rows = manager.graph.query.call_args.args[1]["rows"]
+    assert rows[0]["track_key"] == rows[1]["track_key"]
+    assert "MERGE (s)-[:OF_TRACK]->(t)" in QUERIES["save_songs"]
+    assert "NOT n:Track" in QUERIES["clear_database"]
+
+def test_connection_is_lazy(mock_falkordb): # pylint: disable=unused-argument
+    """Creating a manager does not connect; the first use opens a shared pool."""
+    with patch('falkordb.FalkorDB') as mock_db_cls:
+        manager = FalkordbManager()
+        mock_db_cls.assert_not_called()
+
+        assert manager.graph is not None
+        assert FalkordbManager().graph is manager.graph
+        mock_db_cls.assert_called_once()
+        assert isinstance(mock_db_cls.call_args.kwargs["connection_pool"], InstrumentedConnectionPool)
+        assert manager.pool_stats()["in_use"] == 0
+
+def test_failed_connect_backs_off(mock_falkordb): # pylint: disable=unused-argument
+    """After a refused connection, calls no-op until the backoff expires."""
+    with patch('falkordb.FalkorDB', side_effect=RedisConnectionError("refused")) as mock_db_cls:
+        manager = FalkordbManager()
+        assert manager.find_pending_tracks() == []
+        assert manager.clear_database() is False
+        mock_db_cls.assert_called_once()
+
+        FalkordbManager._next_attempt = 0.0
+        assert manager.graph is None
+        assert mock_db_cls.call_count == 2
+        assert FalkordbManager._failures == 2
+
+def test_unreachable_server_skips_the_client(mock_falkordb): # pylint: disable=unused-argument
+    """A refused TCP connect fails at once, without building the FalkorDB client."""
+    with patch('src.db.falkordb_manager._server_reachable', side_effect=ConnectionRefusedError), \
+            patch('falkordb.FalkorDB') as mock_db_cls:
+        assert FalkordbManager().graph is None
+        mock_db_cls.assert_not_called()
+        assert FalkordbManager._failures == 1
+
+def _fake_connection(**_kwargs):
+    """Connection stand-in that never touches a socket."""
+    return MagicMock(pid=os.getpid(), **{"can_read.return_value": False,
+                                         "should_reconnect.return_value": False})
+
+def test_pool_reports_in_use_and_waits():
+    """A full pool blocks the next caller, and the wait is measured."""
+    pool = InstrumentedConnectionPool(max_connections=1, timeout=2, connection_class=_fake_connection)
+    first = pool.get_connection()
+    assert pool.stats()["in_use"] == 1
+
+    threading.Timer(0.05, pool.release, args=(first,)).start()
+    second = pool.get_connection()
+    pool.release(second)
+
+    stats = pool.stats()
+    assert stats["in_use"] == 0
+    assert stats["max_in_use"] == 1
+    assert stats["acquisitions"] == 2
+    assert stats["wait_ms_max"] >= 40
+
+    pool.timeout = 0.01
+    pool.get_connection()
+    with pytest.raises(RedisConnectionError):
+        pool.get_connection()
+    assert pool.stats()["failed"] == 1
+
+def test_pending_tracks_are_read_in_keyset_pages(mock_falkordb): # pylint: disable=unused-argument
+    """Each page continues after the last track ID instead of using SKIP; DEFERRED tracks come first."""
+    manager = FalkordbManager()
+    pages = [[["A", "a", 3, 1000, "name:a|a"], ["B", "b", 8, None, "name:b|b"]], [["C", "c", 12, 0, "name:c|c"]],
+             [["D", "d", 5, 0, "name:d|d"]]]
+    manager.graph.query.side_effect = [MagicMock(result_set=page) for page in pages]
+
+    tracks = manager.iter_pending_tracks(page_size=2)
+    assert next(tracks).track_id == 3
+    assert manager.graph.query.call_count == 1
+
+    assert [(t.track_id, t.track_key) for t in tracks] == [(8, "name:b|b"), (12, "name:c|c"), (5, "name:d|d")]
+    params = [c.args[1] for c in manager.graph.query.call_args_list]
+    assert params == [{"status": "DEFERRED", "after_id": -1, "limit": 2},
+                      {"status": "DEFERRED", "after_id": 8, "limit": 2},
+                      {"status": "PENDING", "after_id": -1, "limit": 2}]
+    assert "SKIP" not in QUERIES["find_pending_tracks"]
+
+def test_matched_songs_page_on_playlist_index(mock_falkordb): # pylint: disable=unused-argument
+    """Matched songs page on (playlist_index, song ID) and yield compact tuples."""
+    manager = FalkordbManager()
+    pages = [[[21, "v1", 1], [22, "v2", 2]], []]
+    manager.graph.query.side_effect = [MagicMock(result_set=page) for page in pages]
+
+    assert list(manager.iter_matched_songs("playlist:x", page_size=2)) == [(21, "v1"), (22, "v2")]
+    params = manager.graph.query.call_args.args[1]
+    assert params == {"source": "playlist:x", "after_index": 2, "after_id": 22, "limit": 2}
@@ -0,0 +1,111 @@
+"""End-to-end tests of YouTubeManager against the local FakeYouTube server."""
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from benchmarks.fake_graph import InMemoryGraphManager
+from benchmarks.fake_youtube import FakeYouTube
+from src.youtube.playlist_writer import PlaylistWriter
+from src.youtube.quota import QuotaExceededError, QuotaLedger
+from src.youtube.rate_limiter import QuotaExhaustedError
+from src.youtube.retry import RetryPolicy
+from src.youtube.youtube_manager import YouTubeManager
+
+@pytest.fixture
+def fake():
+    """Runs a FakeYouTube server for the test."""
+    with FakeYouTube(seed=1) as server:
+        yield server
+
+def _manager(fake):
+    return YouTubeManager(credentials=Credentials(token="test"), api_endpoint=fake.url,
+                          retry=RetryPolicy(base=0.001, cap=0.01))
+
+def test_candidates_and_batched_playlist_writes(fake):
+    """Searches, batch inserts, moves and deletes go through the real client."""
+    youtube = _manager(fake)
+    candidates = youtube.search_candidates("Song Artist", max_results=3)
+    assert candidates[0]["title"] == "Song Artist"
+    assert all(c["duration_ms"] > 0 for c in candidates)
+
+    graph = InMemoryGraphManager()
+    graph.save_playlist_name("Mix", source="playlist:x")
+    graph.save_songs_batch([
+        {"title": f"t{i}", "artist": "a", "index": i, "source": "playlist:x"} for i in range(12)
+    ])
+    graph.update_tracks_with_youtube_matches([
+        (t.track_id, f"v{t.title}", "q", None) for t in graph.find_pending_tracks()
+    ])
+    report = PlaylistWriter(youtube, graph, batch_size=5).sync("playlist:x", "Mix")
+
+    assert report.inserted == 12 and report.failed == 0
+    [playlist] = fake.playlists.values()
+    assert [video for _, video in playlist] == [f"vt{i}" for i in range(12)]
+    assert fake.stats()["calls"]["playlistItems.insert"] == 12
+    assert fake.stats()["http_requests"] == 2 + 1 + 3  # search + videos, create, 3 batches
+
+def test_injected_backend_errors_are_retried():
+    """Retriable 503s are absorbed by the manager's retry loop."""
+    with FakeYouTube(error_rate=0.3, seed=3) as server:
+        youtube = _manager(server)
+        results = [youtube.search_video(f"song {i}") for i in range(10)]
+
+    assert all(results)
+    assert server.errors_injected > 0
+
+def test_rate_limits_honour_retry_after():
+    """403 rateLimitExceeded is retried after the server's Retry-After."""
+    with FakeYouTube(rate_limit_rate=0.5, retry_after=0, seed=2) as server:
+        youtube = _manager(server)
+        results = [youtube.search_video(f"song {i}") for i in range(8)]
+
+    assert all(results)
+    stats = youtube.retry.stats()
+    assert stats["reasons"] == {"rateLimitExceeded": server.errors_injected}
+    assert stats["gave_up"] == 0
+
+def test_quota_exhaustion_is_reported(fake):
+    """Calls beyond the configured quota raise instead of looking like "not found"."""
+    fake.quota = 150
+    youtube = _manager(fake)
+
+    assert youtube.search_video("first") is not None
+    with pytest.raises(QuotaExceededError):
+        youtube.search_video("second")
+    assert fake.quota_spent == 100
+
+def test_ledger_charges_each_endpoint(fake, tmp_path):
+    """Every call is charged to the persisted ledger at its endpoint's cost."""
+    ledger = QuotaLedger(str(tmp_path / "quota.sqlite3"), daily_quota=10_000)
+    youtube = YouTubeManager(credentials=Credentials(token="test"), api_endpoint=fake.url,
+                             ledger=ledger)
+
+    youtube.search_candidates("Song Artist", max_results=3)
+    playlist_id = youtube.create_playlist("Mix")
+    youtube.add_videos_to_playlist(playlist_id, ["a", "b"], start_position=0)
+
+    assert ledger.by_endpoint() == {
+        "playlistItems.insert": {"units": 100, "calls": 2},
+        "playlists.insert": {"units": 50, "calls": 1},
+        "search.list": {"units": 100, "calls": 1},
+        "videos.list": {"units": 1, "calls": 1},
+    }
+    assert ledger.spent() == fake.quota_spent
+    assert QuotaLedger(ledger.path).spent() == 251  # survives the run
+
+def test_spent_ledger_refuses_calls(fake, tmp_path):
+    """Once the budget is gone no request is sent; a 403 quotaExceeded spends it."""
+    ledger = QuotaLedger(str(tmp_path / "quota.sqlite3"), daily_quota=150)
+    youtube = YouTubeManager(credentials=Credentials(token="test"), api_endpoint=fake.url,
+                             ledger=ledger)
+    youtube.search_video("first")
+    with pytest.raises(QuotaExhaustedError):
+        youtube.search_video("second")
+    assert fake.stats()["total_calls"] == 1
+
+    fake.quota = 0
+    roomy = QuotaLedger(str(tmp_path / "other.sqlite3"), daily_quota=10_000)
+    youtube.ledger = roomy
+    with pytest.raises(QuotaExceededError):
+        youtube.search_video("third")
+    assert roomy.remaining() == 0
@@ -0,0 +1,123 @@
+"""Unit tests for the concurrent matching engine and rate limiter."""
+
+import random
+import time
+
+from unittest.mock import MagicMock
+
+import pytest
+from src.models.data_classes import PendingSong
+from src.youtube.interfaces import VideoSearcher
+from src.youtube.match_engine import MatchEngine
+from src.youtube.rate_limiter import QuotaExhaustedError, TokenBucket
+from src.youtube.scoring import best_candidate, score_candidates
+
+
+class FakeSearcher(VideoSearcher):
+    """Returns a deterministic match after a random delay."""
+
+    def search_video(self, query):
+        time.sleep(random.uniform(0, 0.01))
+        if query.startswith("missing"):
+            return None
+        return {"video_id": f"vid-{query}", "title": query, "channel": "c"}
+
+    def create_playlist(self, title, description=""):
+        return None
+
+    def add_video_to_playlist(self, playlist_id, video_id):
+        return False
+
+
+def _songs(n):
+    return [PendingSong(f"t{i}", "a", track_id=i) for i in range(n)]
+
+def test_results_keep_input_order():
+    """Results are yielded in playlist order regardless of completion order."""
+    songs = _songs(50) + [PendingSong("missing", "x", track_id=50)]
+    engine = MatchEngine(FakeSearcher(), workers=8)
+
+    results = list(engine.run(songs))
+
+    assert [r.song.track_id for r in results] == list(range(51))
+    assert results[0].query == "t0 a"
+    assert results[0].match["video_id"] == "vid-t0 a"
+    assert results[-1].match is None
+
+def test_quota_exhaustion_stops_engine():
+    """The engine raises once the daily quota is used up."""
+    limiter = TokenBucket(rate=1e9, capacity=1000, daily_quota=300)
+    engine = MatchEngine(FakeSearcher(), limiter=limiter, workers=1, candidates=1)
+
+    seen = []
+    with pytest.raises(QuotaExhaustedError):
+        for result in engine.run(_songs(10)):
+            seen.append(result)
+
+    assert len(seen) == 3
+    assert limiter.units_remaining == 0
+
+def test_failed_search_does_not_stop_engine():
+    """An API error marks that song as failed; the other songs are still matched."""
+    def search(query):
+        if query == "t1 a":
+            raise ConnectionError("reset")
+        return {"video_id": query}
+
+    searcher = MagicMock(spec=VideoSearcher)
+    searcher.search_video.side_effect = search
+    engine = MatchEngine(searcher, workers=2, candidates=1)
+
+    results = list(engine.run(_songs(3)))
+
+    assert [r.match for r in results] == [{"video_id": "t0 a"}, None, {"video_id": "t2 a"}]
+    assert results[1].error == "reset"
+    assert results[0].error is None
+
+def test_token_bucket_waits_for_refill():
+    """Acquiring beyond the burst capacity sleeps for the refill time."""
+    now = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=100, capacity=200, daily_quota=None,
+                         clock=lambda: now[0], sleep=fake_sleep)
+    bucket.acquire(100)
+    bucket.acquire(100)
+    bucket.acquire(100)
+
+    assert sleeps == [pytest.approx(1.0)]
+    assert bucket.units_spent == 300
+
+def test_best_scoring_candidate_wins():
+    """A later, better matching candidate beats YouTube's first hit."""
+    searcher = MagicMock(spec=VideoSearcher)
+    searcher.search_candidates.return_value = [
+        {"video_id": "live", "title": "Song Title (Live at Wembley)", "channel": "Fan", "duration_ms": 290_000},
+        {"video_id": "orig", "title": "Artist - Song Title", "channel": "ArtistVEVO", "duration_ms": 201_000},
+        {"video_id": "other", "title": "Something Else", "channel": "Misc", "duration_ms": 200_000},
+    ]
+    limiter = TokenBucket(rate=1e9, capacity=1000, daily_quota=None)
+    song = PendingSong("Song Title", "Artist", track_id=1, duration_ms=200_000)
+
+    [result] = MatchEngine(searcher, limiter=limiter, workers=1, candidates=3).run([song])
+
+    searcher.search_candidates.assert_called_once_with("Song Title Artist", max_results=3)
+    assert result.match["video_id"] == "orig"
+    assert 0.8 < result.score <= 1.0
+    assert limiter.units_spent == 101
+
+def test_scores_rank_duration_and_renditions():
+    """Duration mismatches and unrequested renditions lower the score."""
+    song = PendingSong("Yesterday", "The Beatles", duration_ms=125_000)
+    exact, wrong_length, karaoke = score_candidates(song, [
+        {"title": "The Beatles - Yesterday", "channel": "", "duration_ms": 126_000},
+        {"title": "The Beatles - Yesterday", "channel": "", "duration_ms": 400_000},
+        {"title": "The Beatles - Yesterday (Karaoke)", "channel": "", "duration_ms": 125_000},
+    ])
+
+    assert exact > wrong_length and exact > karaoke
+    assert best_candidate(song, []) == (None, None)
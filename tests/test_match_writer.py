@@ -0,0 +1,41 @@
+"""Unit tests for the background match writer (Mocked)."""
+
+from unittest.mock import MagicMock
+
+from src.db.match_writer import MatchWriter
+
+def test_writer_batches_rows_until_close():
+    """Queued rows are written in batches and flushed on close."""
+    manager = MagicMock()
+    with MatchWriter(manager, batch_size=2, flush_interval=5) as writer:
+        for i in range(5):
+            writer.submit(i, f"vid{i}", f"q{i}")
+
+    batches = [c.args[0] for c in manager.update_tracks_with_youtube_matches.call_args_list]
+    assert [row for batch in batches for row in batch] == [
+        (i, f"vid{i}", f"q{i}", None) for i in range(5)
+    ]
+    assert max(len(b) for b in batches) == 2
+    assert writer.written == 5
+
+def test_writer_survives_database_errors():
+    """A batch failing twice is counted and later batches are still written."""
+    manager = MagicMock()
+    manager.update_tracks_with_youtube_matches.side_effect = [Exception("down"), Exception("down"),
+                                                              None]
+    with MatchWriter(manager, batch_size=1, flush_interval=5, retry_delay=0) as writer:
+        writer.submit(1, "a", "q")
+        writer.submit(2, "b", "q")
+
+    assert writer.errors == 1
+    assert writer.written == 1
+
+def test_writer_retries_a_failed_batch_once():
+    """A transient failure costs a retry, not the batch."""
+    manager = MagicMock()
+    manager.update_tracks_with_youtube_matches.side_effect = [Exception("blip"), None]
+    with MatchWriter(manager, batch_size=5, flush_interval=5, retry_delay=0) as writer:
+        writer.submit(1, "a", "q")
+
+    assert manager.update_tracks_with_youtube_matches.call_count == 2
+    assert (writer.written, writer.errors) == (1, 0)
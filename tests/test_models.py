@@ -1,6 +1,8 @@
 """Unit tests for data models."""
 
-from src.models.data_classes import SongInfo, PlaylistSource
+import sys
+
+from src.models.data_classes import PendingSong, SongInfo, PlaylistSource
 
 def test_song_info_creation():
     """Test creating a SongInfo instance."""
@@ -13,3 +15,11 @@ def test_playlist_source_creation():
     """Test creating a PlaylistSource instance."""
     playlist = PlaylistSource(name="My Awesome Playlist")
     assert playlist.name == "My Awesome Playlist"
+
+def test_records_have_no_instance_dict():
+    """Songs are slotted (Python 3.10+) and pending tracks are tuples."""
+    song = SongInfo(title="t", artist="a", album="")
+    if sys.version_info >= (3, 10):
+        assert not hasattr(song, "__dict__")
+    pending = PendingSong("Song", "Artist", track_id=7, duration_ms=1000)
+    assert isinstance(pending, tuple) and not hasattr(pending, "__dict__")
@@ -0,0 +1,122 @@
+"""Unit tests for the Scrapy FalkorDB and match-queue pipelines (Mocked)."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+from scrapy.exceptions import NotConfigured
+
+from benchmarks.fake_graph import InMemoryGraphManager
+from src.models.data_classes import PlaylistSource, SongInfo
+from src.scraper.pipelines import FalkordbPipeline, MatchQueuePipeline
+from src.youtube.match_engine import MatchEngine
+from src.youtube.rate_limiter import QuotaExhaustedError
+from src.youtube.stream_matcher import StreamingMatcher
+
+def test_songs_are_flushed_in_batches():
+    """Songs are buffered and written with one query per batch."""
+    with patch('src.scraper.pipelines.db_manager') as mock_db:
+        pipeline = FalkordbPipeline(batch_size=2, flush_interval=3600)
+        for i in range(5):
+            song = SongInfo(title=f"t{i}", artist="a", album="", index=i, source="playlist:x")
+            pipeline.process_item(song, None)
+
+        assert mock_db.save_songs_batch.call_count == 2
+        pipeline.close_spider(None)
+
+    batches = [c.args[0] for c in mock_db.save_songs_batch.call_args_list]
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert batches[0][0] == {
+        "title": "t0", "artist": "a", "album": "", "duration_ms": 0, "isrc": "",
+        "index": 0, "source": "playlist:x",
+    }
+
+def test_playlist_source_is_saved_immediately():
+    """Playlist metadata bypasses the song buffer."""
+    with patch('src.scraper.pipelines.db_manager') as mock_db:
+        pipeline = FalkordbPipeline()
+        pipeline.process_item(PlaylistSource(name="Mix"), None)
+        pipeline.close_spider(None)
+
+    mock_db.save_playlist_name.assert_called_once_with("Mix", source="")
+    mock_db.save_songs_batch.assert_not_called()
+
+def _searcher(release=None):
+    """Searcher that finds every song except 'missing', optionally after `release` is set."""
+    searcher = MagicMock()
+
+    def search(query, max_results=5):  # pylint: disable=unused-argument
+        if release is not None:
+            release.wait(5)
+        return [] if query.startswith("missing") else [{"video_id": f"v-{query}", "title": query}]
+
+    searcher.search_candidates.side_effect = search
+    return searcher
+
+def test_match_queue_matches_while_scraping():
+    """Songs are searched as they are scraped and stored with the later song rows."""
+    graph = InMemoryGraphManager()
+    release = threading.Event()
+    matcher = StreamingMatcher(MatchEngine(_searcher(release), workers=2), graph)
+    pipeline = MatchQueuePipeline(matcher)
+    store = FalkordbPipeline(batch_size=100, flush_interval=3600, manager=graph)
+
+    pipeline.open_spider(None)
+    for title in ("Song", "Song", "missing", "Other"):
+        item = SongInfo(title=title, artist="A", album="", index=1, source="playlist:x")
+        pipeline.process_item(store.process_item(item, None), None)
+    assert graph.count_pending_tracks() == 0  # songs still buffered
+
+    release.set()
+    pipeline.close_spider(None)
+    store.close_spider(None)
+
+    assert matcher.stats() == {"queued": 3, "already_matched": 0, "matched": 2,
+                               "not_found": 1, "failed": 0, "quota_exhausted": False,
+                               "deferred": 0, "write_errors": 0}
+    assert [t.title for t in graph.find_pending_tracks()] == ["missing"]
+    assert sorted(v for _, v in graph.get_matched_songs("playlist:x")) == ["v-Other A", "v-Song A"]
+
+def test_match_queue_skips_matched_tracks():
+    """Tracks the catalog already matched cost no search."""
+    graph = InMemoryGraphManager()
+    graph.save_songs_batch([{"title": "Song", "artist": "A", "index": 1}])
+    graph.update_tracks_with_youtube_matches(
+        [(t.track_id, "v", "q", None) for t in graph.find_pending_tracks()])
+    searcher = _searcher()
+    matcher = StreamingMatcher(MatchEngine(searcher, workers=1), graph)
+
+    matcher.start()
+    matcher.submit("Song", "A")
+    stats = matcher.close()
+
+    assert stats["already_matched"] == 1
+    searcher.search_candidates.assert_not_called()
+
+def test_match_queue_defers_unsearched_tracks_when_quota_runs_out():
+    """After the quota runs out, tracks not searched yet are DEFERRED like in `match`."""
+    graph = InMemoryGraphManager()
+    searcher = MagicMock()
+    searcher.search_candidates.side_effect = [
+        [{"video_id": "v1", "title": "First A"}], QuotaExhaustedError("out of quota")]
+    matcher = StreamingMatcher(MatchEngine(searcher, workers=1), graph)
+    store = FalkordbPipeline(batch_size=100, flush_interval=3600, manager=graph)
+
+    matcher.start()
+    for title in ("First", "Second", "Third"):
+        item = SongInfo(title=title, artist="A", album="", index=1, source="playlist:x")
+        store.process_item(item, None)
+        matcher.submit(title, "A")
+    store.close_spider(None)
+    stats = matcher.close()
+
+    assert stats["quota_exhausted"] and stats["matched"] == 1 and stats["deferred"] == 2
+    status = {t["title"]: t["match_status"] for t in graph.tracks.values()}
+    assert status == {"First": "MATCHED", "Second": "DEFERRED", "Third": "DEFERRED"}
+
+def test_match_queue_is_opt_in():
+    """Without MATCH_WHILE_SCRAPING the pipeline disables itself."""
+    crawler = MagicMock()
+    crawler.settings.getbool.return_value = False
+    with pytest.raises(NotConfigured):
+        MatchQueuePipeline.from_crawler(crawler)
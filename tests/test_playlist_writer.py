@@ -0,0 +1,147 @@
+"""Unit tests for resumable playlist population (Mocked)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from src.youtube.playlist_diff import PlaylistItem, PlaylistOperation, compute_playlist_diff
+from src.youtube.playlist_writer import PlaylistWriter
+from src.youtube.youtube_manager import YouTubeManager
+
+def _manager(pending, playlist_id=None, inserted=0):
+    manager = MagicMock()
+    manager.get_youtube_playlist_id.return_value = playlist_id
+    manager.count_inserted_songs.return_value = inserted
+    manager.get_pending_inserts.return_value = pending
+    return manager
+
+def test_writer_creates_playlist_and_records_positions():
+    """A new playlist is created once and each confirmed insert is recorded."""
+    youtube = MagicMock()
+    youtube.create_playlist.return_value = "PL1"
+    youtube.add_videos_to_playlist.side_effect = lambda _pid, vids, start_position: [True] * len(vids)
+    manager = _manager([(10, "a"), (11, "b"), (12, "c")])
+
+    report = PlaylistWriter(youtube, manager, batch_size=2).write("playlist:x", "Mix")
+
+    manager.set_youtube_playlist_id.assert_called_once_with("playlist:x", "PL1")
+    marked = [row for c in manager.mark_songs_inserted.call_args_list for row in c.args[0]]
+    assert marked == [(10, 0), (11, 1), (12, 2)]
+    assert report.inserted == 3 and report.failed == 0
+
+def test_writer_resumes_and_stops_on_failure():
+    """An existing playlist is reused; the run stops at the first failed insert."""
+    youtube = MagicMock()
+    youtube.add_videos_to_playlist.side_effect = [[True, False], [True, True]]
+    manager = _manager([(20, "d"), (21, "e"), (22, "f")], playlist_id="PL1", inserted=5)
+
+    report = PlaylistWriter(youtube, manager, batch_size=2).write("playlist:x", "Mix")
+
+    youtube.create_playlist.assert_not_called()
+    youtube.add_videos_to_playlist.assert_called_once_with("PL1", ["d", "e"], start_position=5)
+    manager.mark_songs_inserted.assert_called_once_with([(20, 5)])
+    assert (report.inserted, report.failed, report.already_inserted) == (1, 1, 5)
+
+def test_writer_drops_inserts_after_a_mid_chunk_failure():
+    """Inserts after a failed one are removed, so the next run restores the order."""
+    youtube = MagicMock()
+    youtube.add_videos_to_playlist.return_value = [True, False, True]
+    youtube.list_playlist_items.return_value = [
+        PlaylistItem("i0", "z", 0), PlaylistItem("i1", "d", 1), PlaylistItem("i2", "f", 2),
+    ]
+    manager = _manager([(20, "d"), (21, "e"), (22, "f")], playlist_id="PL1", inserted=1)
+
+    report = PlaylistWriter(youtube, manager, batch_size=3).write("playlist:x", "Mix")
+
+    manager.mark_songs_inserted.assert_called_once_with([(20, 1)])
+    youtube.delete_playlist_item.assert_called_once_with("i2")
+    assert (report.inserted, report.failed) == (1, 2)
+
+@pytest.fixture
+def manager_with_service():
+    """YouTubeManager backed by a mocked discovery service."""
+    with patch('src.youtube.youtube_manager.build') as mock_build, \
+            patch('src.youtube.youtube_manager.Credentials') as mock_creds, \
+            patch('os.path.exists', return_value=True):
+        mock_creds.from_authorized_user_file.return_value = MagicMock(valid=True)
+        service = MagicMock()
+        mock_build.return_value = service
+        yield YouTubeManager(), service
+
+def test_batch_insert_reports_each_item(manager_with_service):
+    """Batched inserts carry explicit positions and per-item results."""
+    manager, service = manager_with_service
+    batch = service.new_batch_http_request.return_value
+
+    def execute(**_kwargs):
+        callback = service.new_batch_http_request.call_args.kwargs["callback"]
+        callback("0", {}, None)
+        callback("1", None, Exception("409"))
+
+    batch.execute.side_effect = execute
+    results = manager.add_videos_to_playlist("PL1", ["a", "b"], start_position=3)
+
+    assert results == [True, False]
+    bodies = [c.kwargs["body"] for c in service.playlistItems.return_value.insert.call_args_list]
+    assert [b["snippet"]["position"] for b in bodies] == [3, 4]
+
+def test_batch_insert_is_not_resent_after_a_timeout(manager_with_service):
+    """A timed-out batch may have been applied: the playlist is re-listed, not re-inserted."""
+    manager, service = manager_with_service
+    batch = service.new_batch_http_request.return_value
+    batch.execute.side_effect = TimeoutError("read timed out")
+    manager.list_playlist_items = MagicMock(return_value=[
+        PlaylistItem("i0", "x", 2), PlaylistItem("i1", "a", 3)])
+
+    results = manager.add_videos_to_playlist("PL1", ["a", "b"], start_position=3)
+
+    assert results == [True, False]
+    batch.execute.assert_called_once()
+
+def test_diff_is_minimal():
+    """Only new videos are inserted and out-of-order ones moved."""
+    current = [PlaylistItem(f"i{k}", v, k) for k, v in enumerate(["c", "a", "b", "x"])]
+    diff = compute_playlist_diff(current, ["a", "b", "c", "d"])
+
+    assert diff.deletes == ["i3"]
+    assert diff.operations == [
+        PlaylistOperation("move", "c", 2, "i0"),
+        PlaylistOperation("insert", "d", 3),
+    ]
+    unchanged = [PlaylistItem(f"i{k}", v, k) for k, v in enumerate("abc")]
+    assert not compute_playlist_diff(unchanged, list("abc"))
+
+def test_diff_handles_duplicates_and_reversal():
+    """Applying the operations in order always yields the desired order."""
+    current = [PlaylistItem(f"i{k}", v, k) for k, v in enumerate("aabcd")]
+    desired = list("dcbaa")
+    diff = compute_playlist_diff(current, desired)
+
+    playlist = [(item.item_id, item.video_id) for item in current]
+    playlist = [p for p in playlist if p[0] not in diff.deletes]
+    for op in diff.operations:
+        entry = next(p for p in playlist if p[0] == op.item_id) if op.item_id else ("new", op.video_id)
+        if op.item_id:
+            playlist.remove(entry)
+        playlist.insert(op.position, entry)
+
+    assert [video for _, video in playlist] == desired
+    assert diff.moves == 3 and diff.inserts == 0
+
+def test_sync_applies_only_the_delta():
+    """A known playlist is re-synced with a single insert, not a full rebuild."""
+    youtube = MagicMock()
+    youtube.list_playlist_items.return_value = [
+        PlaylistItem(f"i{k}", v, k) for k, v in enumerate("abc")
+    ]
+    youtube.add_video_to_playlist.return_value = True
+    manager = _manager([], playlist_id=None)
+    manager.get_sync_target.return_value = "PL1"
+    manager.get_matched_songs.return_value = [(1, "a"), (2, "b"), (3, "new"), (4, "c")]
+
+    report = PlaylistWriter(youtube, manager).sync("playlist:x", "Mix")
+
+    youtube.create_playlist.assert_not_called()
+    youtube.add_video_to_playlist.assert_called_once_with("PL1", "new", 2)
+    youtube.move_playlist_item.assert_not_called()
+    assert (report.inserted, report.moved, report.deleted) == (1, 0, 0)
+    manager.mark_songs_inserted.assert_called_once_with([(1, 0), (2, 1), (3, 2), (4, 3)])
@@ -0,0 +1,71 @@
+"""Unit tests for the persisted quota ledger and the sync planner."""
+
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from src.youtube.quota import QuotaLedger, plan_sync
+from src.youtube.rate_limiter import QuotaExhaustedError
+
+# 23:59 PST on 2026-01-14
+BEFORE_MIDNIGHT = datetime(2026, 1, 15, 7, 59, tzinfo=timezone.utc).timestamp()
+
+def test_ledger_resets_at_pacific_midnight(tmp_path):
+    """Spent units belong to the Pacific day and reset when it ends."""
+    now = [BEFORE_MIDNIGHT]
+    ledger = QuotaLedger(str(tmp_path / "q.sqlite3"), daily_quota=1000, clock=lambda: now[0])
+
+    ledger.record("search.list", calls=3)
+    assert ledger.day() == "2026-01-14"
+    assert ledger.remaining() == 700
+    assert ledger.seconds_until_reset() == pytest.approx(60)
+
+    now[0] += 120
+    assert ledger.day() == "2026-01-15"
+    assert ledger.remaining() == 1000
+
+def test_ledger_refuses_calls_beyond_budget(tmp_path):
+    """A call the remaining budget cannot cover is refused before it is sent."""
+    ledger = QuotaLedger(str(tmp_path / "q.sqlite3"), daily_quota=120)
+    ledger.check("search.list")
+    ledger.record("search.list")
+
+    with pytest.raises(QuotaExhaustedError):
+        ledger.check("search.list")
+    ledger.check("videos.list", calls=20)
+
+    ledger.exhaust()
+    assert ledger.remaining() == 0
+
+def test_concurrent_charges_cannot_overspend(tmp_path):
+    """Checking and recording happen together, so threads cannot share the last units."""
+    ledger = QuotaLedger(str(tmp_path / "q.sqlite3"), daily_quota=1000)
+    charged, refused = [], []
+
+    def worker():
+        for _ in range(5):
+            try:
+                charged.append(ledger.charge("search.list"))
+            except QuotaExhaustedError:
+                refused.append(1)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(charged) == 10
+    assert len(refused) == 30
+    assert ledger.spent() == 1000
+
+def test_plan_defers_what_does_not_fit():
+    """The planner budgets searches first and reports how many tracks fit."""
+    plan = plan_sync(tracks=150, remaining=10_000, candidates=5, inserts=10, new_playlists=1)
+
+    assert plan.search_units == 150 * 101
+    assert plan.insert_units == 10 * 50 + 50
+    assert plan.affordable_tracks == 99
+    assert plan.deferred_tracks == 51
+    assert not plan.fits
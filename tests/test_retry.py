@@ -0,0 +1,151 @@
+"""Unit tests for the YouTube retry policy and circuit breaker."""
+
+import json
+import random
+import socket
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from src.youtube.retry import (
+    FATAL,
+    QUOTA,
+    RETRY,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    classify,
+    parse_retry_after,
+)
+
+def _http_error(status, reason, retry_after=None):
+    resp = httplib2.Response({"status": status})
+    if retry_after is not None:
+        resp["retry-after"] = str(retry_after)
+    content = json.dumps({"error": {"errors": [{"reason": reason}]}}).encode()
+    return HttpError(resp, content)
+
+class _Clock:
+    """Fake monotonic clock advanced by the policy's sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def _policy(clock, **kwargs):
+    return RetryPolicy(rng=random.Random(0), clock=clock, sleep=clock.sleep, **kwargs)
+
+def _failing(*errors, result="ok"):
+    pending = list(errors)
+
+    def call():
+        if pending:
+            raise pending.pop(0)
+        return result
+    return call
+
+def test_classify_by_status_reason_and_transport():
+    """Rate limits and transient errors retry; quota and forbidden do not."""
+    assert classify(_http_error(503, "backendError")).kind == RETRY
+    assert classify(_http_error(403, "rateLimitExceeded")).kind == RETRY
+    assert classify(_http_error(429, "")).reason == "http429"
+    assert classify(_http_error(403, "quotaExceeded")).kind == QUOTA
+    assert classify(_http_error(403, "forbidden")).kind == FATAL
+    assert classify(_http_error(404, "notFound")).kind == FATAL
+    assert classify(ConnectionResetError()).kind == RETRY
+    assert classify(TimeoutError()).kind == RETRY
+    assert classify(ValueError()).kind == FATAL
+    assert classify(socket.timeout()).kind == RETRY
+
+def test_transport_errors_are_only_retried_on_idempotent_endpoints():
+    """A dropped insert may have been applied, so it is not sent again."""
+    assert classify(TimeoutError(), "search.list").kind == RETRY
+    assert classify(ConnectionResetError(), "playlistItems.delete").kind == RETRY
+    assert classify(TimeoutError(), "playlistItems.insert").kind == FATAL
+    assert classify(_http_error(503, "backendError"), "playlistItems.insert").kind == RETRY
+
+    clock = _Clock()
+    policy = _policy(clock, threshold=100)
+    with pytest.raises(TimeoutError):
+        policy.call(_failing(TimeoutError()), endpoint="playlistItems.insert")
+    assert policy.stats()["retries"] == 0
+    assert classify(_http_error(503, "backendError", retry_after=7)).retry_after == 7
+
+def test_parse_retry_after_seconds_and_dates():
+    """Retry-After may be delta seconds or an HTTP date."""
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after("Thu, 01 Jan 1970 00:01:40 GMT", now=40) == 60
+    assert parse_retry_after("soon") is None and parse_retry_after(None) is None
+
+def test_backoff_is_jittered_and_capped():
+    """Delays grow with decorrelated jitter but stay within [base, cap]."""
+    clock = _Clock()
+    policy = _policy(clock, attempts=6, base=1.0, cap=8.0, threshold=100)
+    errors = [ConnectionResetError()] * 5
+
+    assert policy.call(_failing(*errors)) == "ok"
+    assert len(clock.sleeps) == 5
+    assert all(1.0 <= s <= 8.0 for s in clock.sleeps)
+    assert len(set(clock.sleeps)) > 1
+    assert policy.stats()["retries"] == 5
+    assert policy.stats()["reasons"] == {"ConnectionResetError": 5}
+
+def test_gives_up_after_attempts_and_raises_fatal_errors_at_once():
+    """The last retryable error is re-raised; fatal errors are not retried."""
+    clock = _Clock()
+    policy = _policy(clock, attempts=3, threshold=100)
+    with pytest.raises(HttpError):
+        policy.call(_failing(*[_http_error(503, "backendError")] * 3))
+    assert len(clock.sleeps) == 2 and policy.stats()["gave_up"] == 1
+
+    calls = []
+    with pytest.raises(HttpError):
+        policy.call(lambda: calls.append(1) or _failing(_http_error(403, "forbidden"))())
+    assert calls == [1]
+
+def test_retry_after_pauses_the_endpoint():
+    """A Retry-After is honoured by every caller of the endpoint."""
+    clock = _Clock()
+    policy = _policy(clock, base=0.1, threshold=100)
+
+    assert policy.call(_failing(_http_error(403, "rateLimitExceeded", retry_after=5)),
+                       endpoint="search.list") == "ok"
+    assert clock.sleeps[0] >= 5
+    assert policy.breaker("search.list").remaining() == 0
+    assert policy.breaker("videos.list").remaining() == 0
+
+def test_breaker_opens_after_consecutive_failures_and_closes_on_success():
+    """Consecutive failures open the breaker with a doubling cooldown."""
+    clock = _Clock()
+    breaker = CircuitBreaker(threshold=2, cooldown=4, max_cooldown=10, clock=clock)
+
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == "open" and breaker.remaining() == 4
+    clock.now += 4
+    assert breaker.state == "half_open"
+    assert breaker.record_failure()
+    assert breaker.remaining() == 8
+    clock.now += 8
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_long_pause_rejects_calls():
+    """Calls fail fast while the endpoint is paused longer than max_wait."""
+    clock = _Clock()
+    policy = _policy(clock, max_wait=10)
+    policy.breaker("search.list").record_failure(retry_after=60)
+    calls = []
+
+    with pytest.raises(CircuitOpenError):
+        policy.call(lambda: calls.append(1), endpoint="search.list")
+    assert not calls and policy.stats()["rejected"] == 1
+    assert policy.stats()["open_endpoints"] == ["search.list"]
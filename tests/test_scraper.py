@@ -0,0 +1,179 @@
+"""Unit tests for the Spotify spider and runner helpers (no browser)."""
+
+import asyncio
+
+from src.scraper.blocking import PROFILES
+from src.scraper.replay import SnapshotStore, recall, synthetic_tracks, write_synthetic_snapshot
+from src.scraper.runner import collect_urls
+from src.scraper.spotify_spider import SpotifyPlaylistSpider, playlist_source_id
+
+def test_playlist_source_id():
+    """Playlist and album URLs map to stable partition keys."""
+    url = "https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M?si=abc"
+    assert playlist_source_id(url) == "playlist:37i9dQZF1DXcBWIGoYBM5M"
+    assert playlist_source_id("https://open.spotify.com/album/4aawyAB9vmqN3uQ7FjRGTy") == (
+        "album:4aawyAB9vmqN3uQ7FjRGTy"
+    )
+
+def test_spider_uses_one_context_per_playlist():
+    """Each URL becomes its own request with an isolated Playwright context."""
+    spider = SpotifyPlaylistSpider(playlist_urls=["https://a/playlist/1", "https://a/playlist/2"])
+    requests = list(spider.start_requests())
+
+    assert [r.url for r in requests] == ["https://a/playlist/1", "https://a/playlist/2"]
+    assert len({r.meta["playwright_context"] for r in requests}) == 2
+
+def test_collect_urls_merges_file_and_args(tmp_path):
+    """URLs from a file are appended and duplicates removed."""
+    url_file = tmp_path / "urls.txt"
+    url_file.write_text("# comment\nhttps://a/playlist/2\n\nhttps://a/playlist/1\n")
+
+    assert collect_urls(["https://a/playlist/1"], str(url_file)) == [
+        "https://a/playlist/1",
+        "https://a/playlist/2",
+    ]
+
+class FakeVirtualizedPage:
+    """Simulates a tracklist that only renders `window` rows around the scroll position."""
+
+    def __init__(self, total, window=10, declared=True):
+        self.total = total
+        self.window = window
+        self.declared = declared
+        self.offset = 0
+        self.scrolls = 0
+
+    async def evaluate(self, script, *_args):
+        if "aria-rowcount" in script:
+            return self.total if self.declared else 0
+        if "scrollIntoView" in script:
+            self.scrolls += 1
+            self.offset = min(self.offset + self.window // 2, self.total)
+            return None
+        end = min(self.offset + self.window, self.total)
+        # aria-rowindex 1 is the header row
+        return [
+            [f"Song {i}", "A", i + 2]
+            for i in range(self.offset, end)
+        ]
+
+def _collect(page):
+    spider = SpotifyPlaylistSpider(playlist_urls=[])
+    spider.scroll_delay_ms = 0
+
+    async def run():
+        return [s async for s in spider._stream_songs(page, "Unknown", False, "playlist:x")]
+
+    return asyncio.run(run())
+
+def test_stream_songs_harvests_recycled_rows():
+    """Every row of a virtualized list is collected once, in playlist order."""
+    page = FakeVirtualizedPage(total=95)
+    songs = _collect(page)
+
+    assert [s.index for s in songs] == list(range(1, 96))
+    assert songs[0].title == "Song 0" and songs[0].source == "playlist:x"
+
+def test_stream_songs_stops_early():
+    """Short lists stop at the declared count; undeclared lists stop when growth stalls."""
+    page = FakeVirtualizedPage(total=8)
+    assert len(_collect(page)) == 8
+    assert page.scrolls == 0
+
+    page = FakeVirtualizedPage(total=30, declared=False)
+    assert len(_collect(page)) == 30
+    assert page.scrolls <= 30 // 5 + SpotifyPlaylistSpider.max_stale_scrolls
+
+def test_blocking_profiles():
+    """Profiles block assets and trackers but never the document or track API."""
+    lean = PROFILES["lean"]
+    assert lean.should_abort("https://i.scdn.co/image/ab67", "image")
+    assert lean.should_abort("https://www.googletagmanager.com/gtm.js", "script")
+    assert lean.should_abort("https://cdn.example-ads.com/x.js", "script")
+    assert lean.should_abort("https://spclient.wg.spotify.com/melody/v1/msg", "fetch")
+    assert not lean.should_abort("https://open.spotify.com/playlist/1", "document")
+    assert not lean.should_abort("https://open.spotifycdn.com/cdn/build/web-player.js", "script")
+    assert not lean.should_abort(
+        "https://api-partner.spotify.com/pathfinder/v1/query?operationName=fetchPlaylist", "fetch"
+    )
+    assert not PROFILES["default"].should_abort("https://www.googletagmanager.com/gtm.js", "script")
+
+def test_persistent_context_is_shared():
+    """With user_data_dir all playlists use one persistent context."""
+    spider = SpotifyPlaylistSpider(
+        playlist_urls=["https://a/playlist/1", "https://a/playlist/2"], user_data_dir="/tmp/p"
+    )
+    metas = [r.meta for r in spider.start_requests()]
+
+    assert {m["playwright_context"] for m in metas} == {"persistent"}
+    assert metas[0]["playwright_context_kwargs"]["user_data_dir"] == "/tmp/p"
+
+class FakeRoute:
+    """Records what a replay route handler did with one request."""
+
+    def __init__(self, url):
+        self.request = type("Request", (), {"url": url})()
+        self.outcome = None
+
+    async def fulfill(self, **kwargs):
+        self.outcome = ("fulfill", kwargs)
+
+    async def abort(self):
+        self.outcome = ("abort", None)
+
+class FakeRoutedPage:
+    """Collects `page.route` registrations; requests go to the newest matching one."""
+
+    def __init__(self):
+        self.routes = []
+        self.hars = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def route_from_har(self, path, not_found):
+        self.hars.append((path, not_found))
+
+    async def request(self, url):
+        route = FakeRoute(url)
+        for pattern, handler in reversed(self.routes):
+            if pattern in ("**/*", url):
+                await handler(route)
+                break
+        return route.outcome
+
+def test_replay_serves_snapshot_and_aborts_the_rest(tmp_path):
+    """Snapshot pages are fulfilled from disk; any other request never reaches the network."""
+    url = "https://open.spotify.com/playlist/abc"
+    write_synthetic_snapshot(str(tmp_path), url, synthetic_tracks(3))
+    (tmp_path / "recorded.har").write_text("{}")
+    store = SnapshotStore(str(tmp_path))
+    page = FakeRoutedPage()
+    asyncio.run(store.install(page))
+
+    kind, response = asyncio.run(page.request(url))
+    assert kind == "fulfill" and b'aria-rowcount="4"' in response["body"]
+    assert asyncio.run(page.request("https://cdn.example/x.js"))[0] == "abort"
+    assert page.hars == [(str(tmp_path / "recorded.har"), "fallback")]
+    assert store.served == 1 and store.aborted == ["https://cdn.example/x.js"]
+
+def test_synthetic_snapshot_manifest(tmp_path):
+    """Each synthetic playlist is listed with its expected tracks for recall."""
+    write_synthetic_snapshot(str(tmp_path), "https://a/playlist/1", synthetic_tracks(2))
+    store = write_synthetic_snapshot(str(tmp_path), "https://a/playlist/2",
+                                     [("A </script>", "B")])
+
+    assert store.urls() == ["https://a/playlist/1", "https://a/playlist/2"]
+    assert store.expected_tracks("https://a/playlist/1") == [("Track 1", "Artist 0"),
+                                                             ("Track 2", "Artist 1")]
+    assert "A </script>" not in (tmp_path / "2.html").read_text()
+    assert recall([("Track 1", "Artist 0")], store.expected_tracks("https://a/playlist/1")) == 0.5
+
+def test_replay_dir_installs_page_init_callback():
+    """With replay_dir every page is routed to the snapshot before navigation."""
+    plain = SpotifyPlaylistSpider(playlist_urls=["https://a/playlist/1"])
+    spider = SpotifyPlaylistSpider(playlist_urls=["https://a/playlist/1"], replay_dir="/tmp/r")
+
+    assert "playwright_page_init_callback" not in next(plain.start_requests()).meta
+    callback = next(spider.start_requests()).meta["playwright_page_init_callback"]
+    assert callback == spider._install_replay
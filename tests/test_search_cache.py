@@ -0,0 +1,91 @@
+"""Unit tests for query normalization and the persistent search cache."""
+
+from unittest.mock import MagicMock, patch
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from src.models.normalize import normalize_query
+from src.youtube.retry import RetryPolicy
+from src.youtube.search_cache import CachedVideoSearcher, SearchCache
+from src.youtube.youtube_manager import YouTubeManager
+
+def test_normalize_query_removes_noise():
+    """Casefolding, punctuation and feat./Remastered noise are ignored."""
+    assert normalize_query("Song - Remastered 2011 (feat. X) Artist") == "song x artist"
+    assert normalize_query("SONG (ft. X) Artist") == "song x artist"
+    assert normalize_query("") == ""
+
+def test_cached_searcher_hits_after_first_search(tmp_path):
+    """A repeated (normalized) query is served from the cache."""
+    inner = MagicMock()
+    inner.search_video.return_value = {"video_id": "abc", "title": "t", "channel": "c"}
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"))
+    searcher = CachedVideoSearcher(inner, cache)
+
+    first = searcher.search_video("Song feat. X Artist")
+    second = searcher.search_video("song (ft. x) artist")
+
+    assert first == second == {"video_id": "abc", "title": "t", "channel": "c"}
+    inner.search_video.assert_called_once()
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["quota_saved"] == 100
+
+def test_cache_ttl_and_lru_eviction(tmp_path):
+    """Expired entries miss and the least recently used entry is evicted."""
+    now = [0.0]
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SearchCache(path, ttl=10, max_entries=2, clock=lambda: now[0])
+
+    cache.put("a", {"video_id": "1"})
+    now[0] = 1
+    cache.put("b", {"video_id": "2"})
+    now[0] = 2
+    assert cache.get("a") == (True, {"video_id": "1"})
+    now[0] = 3
+    cache.put("c", {"video_id": "3"})  # evicts "b", the least recently used
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] is True
+    now[0] = 20
+    assert cache.get("c") == (False, None)
+
+    cache.close()
+    reopened = SearchCache(path)
+    assert reopened.stats()["lifetime_hits"] == 2
+
+def test_candidate_lists_are_cached_separately(tmp_path):
+    """Candidate lists live beside single results and are reused on repeat."""
+    inner = MagicMock()
+    inner.search_video.return_value = {"video_id": "abc", "title": "t", "channel": "c"}
+    inner.search_candidates.return_value = [{"video_id": "abc", "duration_ms": 1000}]
+    searcher = CachedVideoSearcher(inner, SearchCache(str(tmp_path / "cache.sqlite3")))
+
+    searcher.search_video("Song Artist")
+    assert searcher.search_candidates("Song Artist", 5) == [{"video_id": "abc", "duration_ms": 1000}]
+    assert searcher.search_candidates("song artist", 5) == [{"video_id": "abc", "duration_ms": 1000}]
+
+    inner.search_candidates.assert_called_once_with("Song Artist", 5)
+
+def test_api_errors_are_not_cached(tmp_path):
+    """A 500 that outlives the retries is raised, not cached as "not found"."""
+    with patch('src.youtube.youtube_manager.build') as mock_build:
+        manager = YouTubeManager(credentials=MagicMock(),
+                                 retry=RetryPolicy(attempts=2, base=0.001, cap=0.01))
+    request = mock_build.return_value.search.return_value.list.return_value
+    request.methodId = "youtube.search.list"
+    request.execute.side_effect = HttpError(httplib2.Response({"status": 500}), b"{}")
+    cache = SearchCache(str(tmp_path / "cache.sqlite3"))
+    searcher = CachedVideoSearcher(manager, cache)
+
+    with pytest.raises(HttpError):
+        searcher.search_video("Song Artist")
+    with pytest.raises(HttpError):
+        searcher.search_candidates("Song Artist", 5)
+
+    assert request.execute.call_count == 4
+    assert searcher.lookup("Song Artist") == (False, None)
+    assert searcher.lookup("Song Artist", 5) == (False, None)
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,107 @@
+"""Offline tests for pathfinder response parsing and network-mode scraping."""
+
+import asyncio
+import json
+import os
+from urllib.parse import parse_qs, urlsplit
+
+from src.scraper.spotify_api import is_track_list_request, parse_track_page, with_offset
+from src.scraper.spotify_spider import CapturedResponse, SpotifyPlaylistSpider
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+PLAYLIST_URL = (
+    "https://api-partner.spotify.com/pathfinder/v1/query?operationName=fetchPlaylist"
+    '&variables={"uri":"spotify:playlist:x","offset":0,"limit":2}'
+)
+
+def _load(name):
+    with open(os.path.join(FIXTURES, f"{name}.json"), encoding="utf-8") as handle:
+        return json.load(handle)
+
+def test_parse_playlist_page():
+    """Playlist payloads yield album, duration, ISRC and playlist positions."""
+    page = parse_track_page(_load("pathfinder_playlist_page1"))
+
+    assert (page.offset, page.limit, page.total) == (0, 2, 3)
+    first, second = page.tracks
+    assert first.title == "Bohemian Rhapsody - Remastered 2011"
+    assert first.album == "A Night at the Opera"
+    assert first.duration_ms == 354320
+    assert first.isrc == "GBUM71029604"
+    assert first.position == 1
+    assert second.artist == "Queen, David Bowie"
+
+def test_parse_album_page_skips_non_tracks():
+    """Album payloads use the album name; episodes in playlists are skipped."""
+    album = parse_track_page(_load("pathfinder_album"))
+    assert [t.album for t in album.tracks] == ["Abbey Road (Remastered)"] * 2
+    assert album.tracks[1].position == 2
+
+    page2 = parse_track_page(_load("pathfinder_playlist_page2"))
+    assert [t.position for t in page2.tracks] == [3]
+    assert parse_track_page({"data": {"me": {}}}) is None
+
+def test_request_detection_and_offset_rewrite():
+    """Track-list requests are recognized and replayed with a new offset."""
+    assert is_track_list_request(PLAYLIST_URL)
+    assert not is_track_list_request("https://api-partner.spotify.com/pathfinder/v1/query"
+                                     "?operationName=profileAttributes")
+    body = json.dumps({"operationName": "fetchPlaylist", "variables": {"offset": 0}})
+    assert is_track_list_request("https://api-partner.spotify.com/pathfinder/v2/query", body)
+
+    url, _ = with_offset(PLAYLIST_URL, None, 2, 2)
+    variables = json.loads(parse_qs(urlsplit(url).query)["variables"][0])
+    assert variables == {"uri": "spotify:playlist:x", "offset": 2, "limit": 2}
+
+    _, data = with_offset("https://api-partner.spotify.com/pathfinder/v2/query", body, 50, 25)
+    assert json.loads(data)["variables"] == {"offset": 50, "limit": 25}
+
+
+class FakeAPIResponse:
+    """Minimal Playwright APIResponse."""
+
+    def __init__(self, payload):
+        self.ok = payload is not None
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+
+class FakeRequestContext:
+    """Serves recorded pages for replayed offsets."""
+
+    def __init__(self):
+        self.offsets = []
+
+    async def fetch(self, url, **_kwargs):
+        variables = json.loads(parse_qs(urlsplit(url).query)["variables"][0])
+        self.offsets.append(variables["offset"])
+        if variables["offset"] == 2:
+            return FakeAPIResponse(_load("pathfinder_playlist_page2"))
+        return FakeAPIResponse(None)
+
+
+class FakePage:
+    def __init__(self):
+        self.request = FakeRequestContext()
+
+def test_network_mode_replays_missing_pages():
+    """The first intercepted page is parsed and later pages are replayed."""
+    spider = SpotifyPlaylistSpider(playlist_urls=[], scrape_mode="network")
+    page = FakePage()
+    spider._captured[page] = [CapturedResponse(
+        url=PLAYLIST_URL, method="GET", headers={"authorization": "Bearer t"},
+        post_data=None, payload=_load("pathfinder_playlist_page1"),
+    )]
+
+    async def run():
+        return [s async for s in spider._stream_network_songs(page, "playlist:x")]
+
+    songs = asyncio.run(run())
+
+    assert [s.index for s in songs] == [1, 2, 3]
+    assert songs[0].isrc == "GBUM71029604"
+    assert songs[2].album == "Ölürüm Sana"
+    assert page.request.offsets == [2]
+    assert page not in spider._captured
@@ -0,0 +1,95 @@
+"""Tests for the tracing spans, histograms and reports."""
+
+import json
+
+import pytest
+
+from src.telemetry.tracing import MAX_SAMPLES, Tracer, _percentile
+
+def test_disabled_tracer_records_nothing():
+    """While disabled, spans and counters are no-ops."""
+    tracer = Tracer()
+    with tracer.span("db.query", "save") as span:
+        span.add_bytes(10)
+    tracer.count("scrape.songs", 5)
+    tracer.observe("scrape.page", 1.0)
+
+    assert tracer.report()["spans"] == {} and tracer.report()["counters"] == {}
+
+def test_spans_record_counts_errors_and_bytes():
+    """Each span is timed per name/label; exceptions count as errors."""
+    tracer = Tracer(enabled=True)
+    for _ in range(3):
+        with tracer.span("youtube.call", "search.list") as span:
+            span.add_bytes(100)
+    with pytest.raises(ValueError):
+        with tracer.span("youtube.call", "search.list"):
+            raise ValueError("boom")
+    tracer.count("match.cache", label="hit")
+    tracer.count("match.cache", label="hit")
+
+    report = tracer.report()
+    summary = report["spans"]["youtube.call[search.list]"]
+    assert summary["count"] == 4 and summary["errors"] == 1 and summary["bytes"] == 300
+    assert report["counters"] == {"match.cache[hit]": 2}
+
+def test_percentiles_are_nearest_rank():
+    """p50/p95/p99 come from the recorded durations."""
+    tracer = Tracer(enabled=True)
+    for ms in range(1, 101):
+        tracer.observe("store.flush", ms / 1000)
+
+    summary = tracer.report()["spans"]["store.flush"]
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50, 95, 99)
+    assert summary["max_ms"] == 100
+    assert _percentile([], 0.5) == 0.0
+
+def test_histogram_samples_are_bounded():
+    """Long runs keep a fixed-size sample but exact counts and totals."""
+    tracer = Tracer(enabled=True)
+    for _ in range(MAX_SAMPLES + 500):
+        tracer.observe("db.query", 0.001)
+
+    histogram = tracer._histograms[("db.query", "")]  # pylint: disable=protected-access
+    assert len(histogram.samples) == MAX_SAMPLES
+    assert histogram.count == MAX_SAMPLES + 500
+
+def test_reports_are_written_as_json_and_prometheus(tmp_path):
+    """The JSON report and the Prometheus text hold the same spans."""
+    tracer = Tracer(enabled=True)
+    tracer.observe("db.query", 0.002, label="save_songs", nbytes=64)
+    tracer.count("scrape.songs", 3)
+
+    tracer.write_report(str(tmp_path / "trace.json"))
+    tracer.write_prometheus(str(tmp_path / "trace.prom"))
+
+    report = json.loads((tmp_path / "trace.json").read_text())
+    assert report["spans"]["db.query[save_songs]"]["count"] == 1
+    text = (tmp_path / "trace.prom").read_text()
+    assert 'spotify_sync_span_seconds_count{span="db.query",label="save_songs"} 1' in text
+    assert 'spotify_sync_span_bytes_total{span="db.query",label="save_songs"} 64' in text
+    assert 'spotify_sync_events_total{event="scrape.songs",label=""} 3' in text
+
+def test_prometheus_writes_each_family_as_one_block():
+    """Every family has one HELP/TYPE header followed by all of its samples."""
+    tracer = Tracer(enabled=True)
+    tracer.observe("db.query", 0.002, label="save_songs")
+    tracer.observe("youtube.search", 0.1)
+
+    families = []
+    for line in tracer.prometheus().splitlines():
+        if line.startswith("# TYPE "):
+            families.append(line.split()[2])
+        elif not line.startswith("#"):
+            assert line.startswith(families[-1])
+    assert families == ["spotify_sync_span_seconds", "spotify_sync_span_errors_total",
+                        "spotify_sync_span_bytes_total"]
+
+def test_prometheus_escapes_label_values():
+    """Quotes, backslashes and newlines in labels are escaped per the text format."""
+    tracer = Tracer(enabled=True)
+    tracer.observe("db.query", 0.001, label='say "hi"\\now\nthen')
+
+    text = tracer.prometheus()
+    assert 'label="say \\"hi\\"\\\\now\\nthen"' in text
+    assert len(text.splitlines()) == 13  # no sample is split across lines
@@ -58,3 +58,28 @@ def test_search_video_no_results(mock_youtube_build, mock_creds): # pylint: disa
         result = manager.search_video("Nonexistent Video")
 
     assert result is None
+
+def test_search_candidates_enriches_with_one_videos_call(mock_youtube_build, mock_creds): # pylint: disable=unused-argument
+    """Candidates get durations from a single batched videos.list call."""
+    mock_service = MagicMock()
+    mock_youtube_build.return_value = mock_service
+    mock_service.search.return_value.list.return_value.execute.return_value = {
+        "items": [
+            {"id": {"videoId": v}, "snippet": {"title": v, "channelTitle": "c"}}
+            for v in ("a", "b")
+        ]
+    }
+    mock_service.videos.return_value.list.return_value.execute.return_value = {
+        "items": [
+            {"id": "a", "contentDetails": {"duration": "PT3M25S"}, "snippet": {"channelTitle": "c"}},
+            {"id": "b", "contentDetails": {"duration": "PT1H2S"}, "snippet": {"channelTitle": "c"}},
+        ]
+    }
+
+    with patch('os.path.exists', return_value=True):
+        manager = YouTubeManager()
+        candidates = manager.search_candidates("Test Query", max_results=2)
+
+    mock_service.videos.return_value.list.assert_called_once()
+    assert mock_service.videos.return_value.list.call_args.kwargs["id"] == "a,b"
+    assert [c["duration_ms"] for c in candidates] == [205_000, 3_602_000]